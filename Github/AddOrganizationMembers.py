@@ -13,9 +13,7 @@ The "classic" Oauth does work for organizations.
 """
 
 import pandas
-import github
-from gitbulk import check_api_limit, connect
-from pathlib import Path
+from gitbulk import check_api_limit, connect, read_roster, resolve_users
 from argparse import ArgumentParser
 
 
@@ -27,18 +25,7 @@ def main():
     p.add_argument("-col", help="column for GitHub Username", type=int, required=True)
     p = p.parse_args()
 
-    fn = Path(p.fn).expanduser()
-
-    match fn.suffix:
-        case ".xls" | ".xlsx":
-            users = pandas.read_excel(fn, usecols=p.col).squeeze().dropna()
-        case ".csv":
-            users = pandas.read_csv(fn, usecols=[p.col]).squeeze().dropna()
-        case _:
-            raise ValueError(f"Unknown file type {fn}")
-
-    if not users.ndim == 1:
-        raise ValueError("need to have member names. Check that -col argument matches spreadsheet.")
+    users = read_roster(p.fn, p.col, login=0).squeeze(axis=1)
     # %%
     op, sess = connect(p.oauth, p.orgname)
     check_api_limit(sess)
@@ -46,22 +33,20 @@ def main():
     adder(users, op, sess)
 
 
-def adder(users: pandas.DataFrame, op, sess):
-    members = [m.login for m in op.get_members()]
-    invited = [m.login for m in op.invitations()]
+def adder(users: pandas.Series, op, sess):
+    members = {m.login.casefold() for m in op.get_members()}
+    invited = {m.login.casefold() for m in op.invitations()}
 
-    for u in users:
-        login = u.strip()
-        if login in members or login in invited:
-            continue
+    logins = {u.strip().casefold() for u in users}.difference(members, invited)
 
-        try:
-            user = sess.get_user(login)
-        except github.GithubException:
-            raise ValueError(f"unknown GitHub username {login}")
+    # all logins looked up at once, reporting every unknown login before changing anything
+    found, unknown = resolve_users(sess, logins)
+    if unknown:
+        raise ValueError(f"unknown GitHub usernames {' '.join(unknown)}")
 
-        op.add_to_members(user)
-        print(f"invited: {login}")
+    for login in sorted(found):
+        op.add_to_members(found[login])
+        print(f"invited: {found[login].login}")
 
 
 if __name__ == "__main__":
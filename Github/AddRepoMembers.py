@@ -13,8 +13,7 @@ https://developer.github.com/v3/repos/#oauth-scope-requirements
 
 import pandas
 import github
-from gitbulk import repo_exists, team_exists, check_api_limit, connect
-from pathlib import Path
+from gitbulk import OrgDirectory, check_api_limit, connect, read_roster, resolve_users
 from argparse import ArgumentParser
 
 USERNAME = "GitHub"
@@ -33,17 +32,9 @@ def main():
     p.add_argument("-create", help="create repo if not existing", action="store_true")
     p = p.parse_args()
 
-    fn = Path(p.fn).expanduser()
+    teams = read_roster(p.fn, p.col, login=USERNAME)
 
-    match fn.suffix:
-        case ".xls" | ".xlsx":
-            teams = pandas.read_excel(fn, usecols=p.col).squeeze().dropna()
-        case ".csv":
-            teams = pandas.read_csv(fn, usecols=p.col).squeeze().dropna()
-        case _:
-            raise ValueError(f"Unknown file type {fn}")
-
-    if not teams.ndim == 2:
+    if teams.shape[1] < 2:
         raise ValueError(
             "need to have member names and team names. Check that -col argument matches spreadsheet."
         )
@@ -55,6 +46,14 @@ def main():
 
 
 def adder(teams: pandas.DataFrame, stem: str, private: bool, create: bool, op, sess):
+    # teams and repos listed once, not once per row
+    directory = OrgDirectory(op)
+
+    # all logins looked up at once, reporting every unknown login before changing anything
+    users, unknown = resolve_users(sess, teams[USERNAME])
+    if unknown:
+        raise ValueError(f"unknown GitHub usernames {' '.join(unknown)}")
+
     for _, row in teams.iterrows():
         match row.size:
             case 3:
@@ -64,23 +63,19 @@ def adder(teams: pandas.DataFrame, stem: str, private: bool, create: bool, op, s
             case _:
                 raise ValueError("I expect team number OR team number and team name")
 
-        login = row[USERNAME].strip()
-        try:
-            user = sess.get_user(login)
-        except github.GithubException:
-            raise ValueError(f"unknown GitHub username {login}")
+        user = users[row[USERNAME].strip().casefold()]
 
         if create:
-            if not repo_exists(op, repo_name):
+            if not directory.has_repo(repo_name):
                 print("creating repository", repo_name)
-                op.create_repo(name=repo_name, private=private)
+                directory.create_repo(repo_name, private=private)
 
             # NOTE: for now, each team has one repo of same name as team
-            if not team_exists(op, repo_name):
+            if not directory.has_team(repo_name):
                 print("creating Team", repo_name)
-                op.create_team(repo_name, op.get_repo(repo_name))
+                directory.create_team(repo_name, [directory.repo(repo_name)])
 
-        team = op.get_team_by_slug(repo_name)
+        team = directory.team(repo_name)
         try:
             # raises exception if not a member at any level
             team.get_team_membership(user)
@@ -16,8 +16,7 @@ import logging
 import pandas
 import github
 
-from gitbulk import team_exists, check_api_limit, connect
-from pathlib import Path
+from gitbulk import OrgDirectory, check_api_limit, connect, read_roster, resolve_users
 from argparse import ArgumentParser
 
 USERNAME = "GitHub"
@@ -35,17 +34,9 @@ def main():
     p.add_argument("-create", help="create Team if not existing", action="store_true")
     p = p.parse_args()
 
-    fn = Path(p.fn).expanduser()
+    teams = read_roster(p.fn, p.col, login=USERNAME)
 
-    match fn.suffix:
-        case ".xls" | ".xlsx":
-            teams = pandas.read_excel(fn, usecols=p.col).squeeze().dropna()
-        case ".csv":
-            teams = pandas.read_csv(fn, usecols=p.col).squeeze().dropna()
-        case _:
-            raise ValueError(f"Unknown file type {fn}")
-
-    if not teams.ndim == 2:
+    if teams.shape[1] < 2:
         raise ValueError(
             "need to have member names and team names. Check that -col argument matches spreadsheet."
         )
@@ -59,8 +50,16 @@ def main():
         print(failed, file=sys.stderr)
 
 
-def adder(teams: pandas.DataFrame, stem: str, create: bool, op, sess) -> list[tuple[str, str, str]]:
-    failed: list[tuple[str, str, str]] = []
+def adder(teams: pandas.DataFrame, stem: str, create: bool, op, sess) -> list[tuple[str | None, str, str]]:
+    failed: list[tuple[str | None, str, str]] = []
+
+    # teams listed once, not once per row
+    directory = OrgDirectory(op)
+
+    # all logins looked up at once, reporting every unknown login before changing anything
+    users, unknown = resolve_users(sess, teams[USERNAME])
+    if unknown:
+        raise ValueError(f"unknown GitHub usernames {' '.join(unknown)}")
 
     for _, row in teams.iterrows():
         match row.size:
@@ -71,22 +70,18 @@ def adder(teams: pandas.DataFrame, stem: str, create: bool, op, sess) -> list[tu
             case _:
                 raise ValueError("I expect team number OR team number and team name")
 
-        login = row[USERNAME].strip()
-        try:
-            user = sess.get_user(login)
-        except github.GithubException:
-            raise ValueError(f"unknown GitHub username {login}")
+        user = users[row[USERNAME].strip().casefold()]
 
         if create:
-            if not team_exists(op, team_name):
+            if not directory.has_team(team_name):
                 print("creating Team", team_name)
-                op.create_team(team_name)
+                directory.create_team(team_name)
 
         try:
-            team = op.get_team_by_slug(team_name)
-        except github.GithubException as e:
-            logging.error(f"Could not add {user.name} {user.login} to {team.name}. Error: {e}")
-            failed.append((user.name, user.login, team.name))
+            team = directory.team(team_name)
+        except KeyError:
+            logging.error(f"Could not add {user.name} {user.login} to {team_name}. Team does not exist")
+            failed.append((user.name, user.login, team_name))
             continue
 
         try:
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+"""
+run a list of operations (list, archive, private, add_members, copy_files) in one process,
+sharing one session, the owner and repo listings, instead of running one script per operation
+
+    python Batch.py ~/.ssh/oauth nightly.yaml
+
+with nightly.yaml like:
+
+    - {op: archive, owner: myorg, pattern: sw2019-}
+    - {op: add_members, owner: myorg, roster: fall.xlsx, col: C, team: sw2020-01, create: true}
+    - {op: copy_files, owner: myorg, src: ci.yml, target: .github/workflows/ci.yml, language: Python}
+
+or keep a daemon running, so later batches also skip the listings:
+
+    python Batch.py ~/.ssh/oauth -serve ~/.gitbulk.sock
+
+    python Batch.py -submit ~/.gitbulk.sock nightly.yaml
+
+The daemon reloads listings older than -ttl seconds, or after an operation {op: refresh, owner: myorg}.
+
+oauth token needs the permissions of the operations, see the corresponding scripts.
+"""
+
+from argparse import ArgumentParser
+import json
+import sys
+
+import gitbulk as gb
+from gitbulk.batch import Batch, load_operations, server, submit
+
+
+def main():
+    p = ArgumentParser(description="run a queue of bulk operations with one session")
+    p.add_argument("oauth", help="Oauth file", nargs="?")
+    p.add_argument("fn", help="operations .yaml or .json", nargs="?")
+    p.add_argument("-serve", help="then answer operations on this Unix socket", metavar="SOCKET")
+    p.add_argument("-submit", help="send operations to a daemon", nargs=2, metavar=("SOCKET", "FN"))
+    p.add_argument("-ttl", help="seconds a daemon keeps listings", type=float, default=600.0)
+    p.add_argument("-n", "--dry_run", help="only show what would change", action="store_true")
+    P = p.parse_args()
+
+    if P.submit:
+        results = submit(P.submit[0], load_operations(P.submit[1]))
+    else:
+        if not P.oauth:
+            p.error("Oauth file needed, except with -submit")
+        # a daemon reloads listings after ttl seconds, to see repos and members added meanwhile
+        batch = Batch(gb.session(P.oauth), P.dry_run, P.ttl if P.serve else None)
+        results = batch.run_all(load_operations(P.fn) if P.fn else [])
+
+    failed = 0
+    for r in results:
+        print(json.dumps(r, default=str))
+        failed += "error" in r or bool(r.get("failed"))
+
+    if P.serve:
+        srv = server(batch, P.serve)
+        print("serving on", P.serve, file=sys.stderr)
+        try:
+            srv.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            srv.server_close()
+
+    if failed:
+        raise SystemExit(f"{failed} operations failed")
+
+
+if __name__ == "__main__":
+    main()
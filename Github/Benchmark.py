@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the bulk operations and scripts offline, against a fake GitHub API server.
+Records wall time, API requests and peak memory of each benchmark.
+
+    python Benchmark.py -o results.json
+
+Compare with an earlier run, exiting with an error on a regression:
+
+    python Benchmark.py -baseline results.json
+
+GitHub-sized organization (10,000 repos, 2,000 forks per repo, 500 teams), with 50 ms latency:
+
+    python Benchmark.py -scale large -latency 0.05
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+import sys
+
+import pandas
+
+from gitbulk.benchmark import SCALES, compare, read_results, run_benchmarks, write_results
+
+
+def main():
+    p = ArgumentParser(description="benchmark gitbulk against a fake GitHub API server")
+    p.add_argument("-scale", help="size of fake organization", choices=list(SCALES), default="small")
+    p.add_argument("-latency", help="seconds of latency per request", type=float, default=0.0)
+    p.add_argument("-j", "--jobs", help="worker threads", type=int, default=8)
+    p.add_argument("-k", "--select", help="only run these benchmarks", nargs="+", default=())
+    p.add_argument("-nomemory", help="don't record peak memory", action="store_true")
+    p.add_argument("-scripts", help="directory of scripts to benchmark", default=Path(__file__).parent)
+    p.add_argument("-noscripts", help="don't benchmark scripts", action="store_true")
+    p.add_argument("-o", "--out", help="write results to this .json")
+    p.add_argument("-baseline", help="compare with results .json of an earlier run")
+    p.add_argument("-tolerance", help="allowed fraction of time / memory increase", type=float, default=0.25)
+    P = p.parse_args()
+
+    results = run_benchmarks(
+        P.scale, P.latency, P.jobs, not P.nomemory, P.select, None if P.noscripts else P.scripts
+    )
+
+    pandas.set_option("display.width", 120)
+    print(results.drop(columns="routes").to_string())
+
+    if P.out:
+        write_results(results, P.out)
+
+    if P.baseline:
+        comparison = compare(results, read_results(P.baseline), P.tolerance)
+        print("\nratio to baseline")
+        print(comparison.to_string())
+        if comparison["regression"].any():
+            sys.exit(f"regressions: {' '.join(comparison.index[comparison.regression])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,9 +22,14 @@ def main():
     p.add_argument("-b", "--branch", help="branch to consider")
     p.add_argument("-stars", help="only get star count", action="store_true")
     p.add_argument("-v", "--verbose", action="store_true")
+    p.add_argument("-j", "--jobs", help="number of forks to probe concurrently", type=int, default=8)
     p = p.parse_args()
 
-    dat, ahead = gu.repo_prober(p.user, p.oauth, p.branch, p.stars, p.verbose)
+    counts, ahead = gu.repo_prober(p.user, p.oauth, p.branch, p.stars, p.verbose, p.jobs)
+
+    dat = pd.DataFrame(
+        [c[1:] for c in counts], index=[c[0] for c in counts], columns=["forks", "stars"]
+    )
 
     datnz = dat[~(dat == 0).all(axis=1)].drop_duplicates()
     # %%  Stars and Forks
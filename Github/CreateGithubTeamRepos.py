@@ -12,8 +12,7 @@ https://developer.github.com/v3/repos/#oauth-scope-requirements
 """
 
 import pandas
-from gitbulk import connect, repo_exists, check_api_limit
-from pathlib import Path
+from gitbulk import OrgDirectory, connect, check_api_limit, read_roster
 from argparse import ArgumentParser
 
 TEAMS = "Team"
@@ -21,23 +20,27 @@ NAME = "Name"
 
 
 def by_name(teams: pandas.DataFrame, stem: str, private: bool, op, sess):
+    directory = OrgDirectory(op)
+
     for _, row in teams.iterrows():
         reponame = f"{stem}{row[TEAMS]:02.0f}-{row[NAME]}"
-        if repo_exists(op, reponame):
+        if directory.has_repo(reponame):
             continue
 
         print(f"creating {op.login}/{reponame}")
-        op.create_repo(name=reponame, private=private)
+        directory.create_repo(reponame, private=private)
 
 
 def by_num(teams: pandas.DataFrame, stem: str, private: bool, op, sess):
+    directory = OrgDirectory(op)
+
     for teamnum in teams.values:
         reponame = f"{stem}{teamnum}"
-        if repo_exists(op, reponame):
+        if directory.has_repo(reponame):
             continue
 
         print("creating", reponame)
-        op.create_repo(name=reponame, private=private)
+        directory.create_repo(reponame, private=private)
 
 
 p = ArgumentParser(description="mass create repos for teams")
@@ -51,9 +54,7 @@ p.add_argument(
 p.add_argument("-private", help="create private repos", action="store_true")
 P = p.parse_args()
 
-fn = Path(P.fn).expanduser()
-
-teams = pandas.read_excel(fn, usecols=",".join(P.col)).squeeze().dropna().drop_duplicates()
+teams = read_roster(P.fn, P.col).drop_duplicates().squeeze(axis=1)
 # %%
 op, sess = connect(P.oauth, P.orgname)
 check_api_limit(sess)
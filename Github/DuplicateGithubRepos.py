@@ -20,8 +20,22 @@ p.add_argument("oauth", help="Oauth filename")
 p.add_argument("-u", "--username", help="username or organization to create duplicate under")
 p.add_argument("-s", "--stem", help="beginning of duplicated repo names")
 p.add_argument("-w", "--sheet", help="excel sheet to process", required=True)
+p.add_argument("-j", "--jobs", help="repos duplicated concurrently", type=int, default=4)
+p.add_argument(
+    "-r", "--refdiff", help="update only changed refs of existing duplicates", action="store_true"
+)
+p.add_argument(
+    "-f", "--fanout", help="clone each source once and push to all its duplicates", action="store_true"
+)
+p.add_argument("-o", "--out", help="write per-repo results to this .csv")
 P = p.parse_args()
 
 repos = gb.read_repos(P.fn, P.sheet)
 
-gu.repo_dupe(repos, P.oauth, P.username, P.stem)
+results = gu.repo_dupe(
+    repos, P.oauth, P.username, P.stem, workers=P.jobs, refdiff=P.refdiff, fanout=P.fanout
+)
+
+print(results.to_string())
+if P.out:
+    results.to_csv(P.out)
@@ -13,11 +13,9 @@ https://developer.github.com/v3/repos/#oauth-scope-requirements
 """
 
 from argparse import ArgumentParser
-import pandas
-from pathlib import Path
 import itertools
 
-from gitbulk import check_api_limit, connect, get_collabs
+from gitbulk import check_api_limit, connect, iter_collabs, read_roster, OrgIndex
 
 
 p = ArgumentParser(description="Lists collaborators for Git repo or repos starting with pattern")
@@ -30,20 +28,29 @@ p.add_argument(
     help="spreadsheet filename and column to find missing usernames (who isn't signed up)",
     nargs=2,
 )
+p.add_argument("-index", help="answer from local index (see SyncIndex.py)", action="store_true")
+p.add_argument("-j", "--jobs", help="repos fetched concurrently", type=int, default=8)
 P = p.parse_args()
 
-op, sess = connect(P.oauth, P.orgname)
-check_api_limit(sess)
+if P.index:
+    with OrgIndex(P.orgname) as index:
+        collabs = index.collabs(P.stem, P.regex)
 
-collabs = get_collabs(op, sess, P.stem, P.regex)
+    for k in sorted(collabs.keys()):
+        print(k, collabs[k])
+else:
+    op, sess = connect(P.oauth, P.orgname)
+    check_api_limit(sess)
 
-for k in sorted(collabs.keys()):
-    print(k, collabs[k])
+    # printed per repo as fetched
+    collabs = {}
+    for k, logins in iter_collabs(op, sess, P.stem, P.regex, P.jobs):
+        print(k, logins)
+        collabs[k] = logins
 
 if P.xls:
-    xlsfn = Path(P.xls[0]).expanduser()
-    required = pandas.read_excel(xlsfn, usecols=P.xls[1]).squeeze().tolist()
-    present = list(itertools.chain.from_iterable(collabs.values()))
+    required = set(read_roster(P.xls[0], P.xls[1], login=0).squeeze(axis=1))
+    present = set(itertools.chain.from_iterable(collabs.values()))
 
-    missing = set(required).difference(present)
+    missing = required - present
     print("Missing:\n", missing)
@@ -9,20 +9,24 @@ Requires GitHub Oauth login with permissions
 """
 
 import argparse
+import typing as T
 
 import gitbulk as gb
 
 
-def main(username: str, oauth: str, stem: str):
-    # %% authentication
-    sess = gb.session(P.oauth)
-    gb.check_api_limit(sess)
-    # %% get user / organization handle
-    userorg = gb.user_or_org(sess, P.user)
-    # %% prepare to loop over repos
-    repos = gb.get_repos(userorg)
+def main(username: str, oauth: str, stem: str, index: bool = False):
+    repos: T.Iterable[gb.RepoInfo]
+    if index:
+        with gb.OrgIndex(username) as idx:
+            repos = idx.repos(stem)
+    else:
+        # %% authentication
+        sess = gb.session(oauth)
+        gb.check_api_limit(sess)
+        # %% one GraphQL query per 100 repos
+        repos = gb.get_inventory(sess, username, stem)
 
-    to_act = (repo for repo in repos if repo.name.startswith(stem) and not repo.archived)
+    to_act = (repo for repo in repos if not repo.archived)
 
     for repo in to_act:
         print(repo.full_name)
@@ -33,6 +37,7 @@ if __name__ == "__main__":
     p.add_argument("user", help="GitHub username / organizations")
     p.add_argument("oauth", help="Oauth filename")
     p.add_argument("-stem", help="list repos with name starting with this string", default="")
+    p.add_argument("-index", help="answer from local index (see SyncIndex.py)", action="store_true")
     P = p.parse_args()
 
-    main(P.user, P.oauth, P.stem)
+    main(P.user, P.oauth, P.stem, P.index)
@@ -9,36 +9,36 @@ Requires GitHub Oauth login with permissions
 """
 
 import argparse
-import github.GithubException
+import typing as T
 
 import gitbulk as gb
 
 
-def main(username: str, oauth: str, stem: str):
-    # %% authentication
-    sess = gb.session(oauth)
-    gb.check_api_limit(sess)
-    # %% get user / organization handle
-    userorg = gb.user_or_org(sess, username)
-    # %% prepare to loop over repos
-    repos = gb.get_repos(userorg)
+def main(username: str, oauth: str, stem: str, index: bool = False):
+    repos: T.Iterable[gb.RepoInfo]
+    if index:
+        with gb.OrgIndex(username) as idx:
+            repos = idx.repos(stem)
+    else:
+        # %% authentication
+        sess = gb.session(oauth)
+        gb.check_api_limit(sess)
+        # %% one GraphQL pass includes license, no per-repo requests
+        repos = gb.get_inventory(sess, username, stem)
 
     # filter repos
     to_act = (
         repo
         for repo in repos
-        if repo.name.startswith(stem)
-        and repo.name != ".github"
+        if repo.name != ".github"
         and not repo.fork
         and not repo.archived
-        and repo.owner.login == userorg.login
+        and repo.owner.lower() == username.lower()
+        and not repo.license
     )
 
     for repo in to_act:
-        try:
-            repo.get_license()
-        except github.GithubException:
-            print(repo.full_name)
+        print(repo.full_name)
 
 
 if __name__ == "__main__":
@@ -46,6 +46,7 @@ if __name__ == "__main__":
     p.add_argument("user", help="GitHub username / organizations")
     p.add_argument("oauth", help="Oauth filename")
     p.add_argument("-stem", help="list repos with name starting with this string", default="")
+    p.add_argument("-index", help="answer from local index (see SyncIndex.py)", action="store_true")
     P = p.parse_args()
 
-    main(P.user, P.oauth, P.stem)
+    main(P.user, P.oauth, P.stem, P.index)
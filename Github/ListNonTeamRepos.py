@@ -9,10 +9,8 @@ oauth token must have public_repo (or repo for private) permissions
 https://developer.github.com/v3/repos/#oauth-scope-requirements
 """
 
-import typing as T
 from argparse import ArgumentParser
 
-import github
 import gitbulk as gb
 
 
@@ -22,15 +20,28 @@ def main():
     p.add_argument("orgname", help="Github Organization")
     p.add_argument("-stem", help="repos startin with this")
     p.add_argument("-put_team", help="put matching repos in this team")
+    p.add_argument("-index", help="find repos from local index (see SyncIndex.py)", action="store_true")
     p = p.parse_args()
 
-    op, sess = gb.connect_github(p.oauth, p.orgname)
-    gb.check_api_limit(sess)
+    index = gb.OrgIndex(p.orgname) if p.index else None
 
-    lister(op, sess, p.stem, p.put_team)
+    try:
+        if index and not p.put_team:
+            lister(None, None, p.stem, None, index)
+            return
 
+        op, sess = gb.connect(p.oauth, p.orgname)
+        gb.check_api_limit(sess)
 
-def lister(op, sess, stem: str | None = None, put_team: str | None = None):
+        lister(op, sess, p.stem, p.put_team, index)
+    finally:
+        if index:
+            index.close()
+
+
+def lister(
+    op, sess, stem: str | None = None, put_team: str | None = None, index: gb.OrgIndex | None = None
+):
     """
     list matching repos
     optionally, add to specified EXISTING team
@@ -39,26 +50,24 @@ def lister(op, sess, stem: str | None = None, put_team: str | None = None):
     if put_team and not gb.team_exists(op, put_team):
         raise ValueError(f"Team {put_team} does not exist in {op.login}")
 
-    # %% get user / organization handle
-    userorg = gb.user_or_org(sess, op.login)
-    # %% prepare to loop over repos
-    repos = gb.get_repos(userorg)
-
-    to_act: T.Iterable[github.Repository.Repository]
-    if stem:
-        to_act = (repo for repo in repos if repo.name.startswith(stem))
+    if index:
+        teams = index.team_repos()
+        repos = index.repos(stem or "")
     else:
-        to_act = repos
+        # %% team of each repo from walking the teams, instead of per-repo get_teams()
+        teams = gb.get_team_repos(sess, op.login)
+        repos = list(gb.get_inventory(sess, op.login, stem or ""))
+
+    to_act = (repo for repo in repos if repo.name not in teams)
+
+    team = op.get_team_by_slug(put_team) if put_team else None
 
     for repo in to_act:
-        teams = repo.get_teams()
-        if teams.totalCount == 0:
-            if put_team:
-                print(repo.name, "=>", put_team)
-                team = op.get_team_by_slug(put_team)
-                team.add_to_repos(repo)
-            else:
-                print(repo.name)
+        if team:
+            print(repo.name, "=>", put_team)
+            team.add_to_repos(gb.lazy_repo(sess, repo.full_name))
+        else:
+            print(repo.name)
 
 
 if __name__ == "__main__":
@@ -24,18 +24,23 @@ def main():
     p.add_argument("-p", "--pattern", help="only repos with name starting with this string")
     p.add_argument("-settings", help="open settings page for each repo", action="store_true")
     p.add_argument("-alerts", help="open alerts page for each repo", action="store_true")
+    p.add_argument("-index", help="answer from local index (see SyncIndex.py)", action="store_true")
     P = p.parse_args()
 
-    # %% authentication
-    sess = gb.session(P.oauth)
-    gb.check_api_limit(sess)
-    # %% get user / organization handle
-    userorg = gb.user_or_org(sess, P.user)
-    # %% prepare to loop over repos
-    repos = gb.get_repos(userorg)
-
-    if P.pattern:
-        repos = (repo for repo in repos if repo.name.startswith(P.pattern))
+    if P.index:
+        with gb.OrgIndex(P.user) as index:
+            repos = index.repos(P.pattern or "")
+    else:
+        # %% authentication
+        sess = gb.session(P.oauth)
+        gb.check_api_limit(sess)
+        # %% get user / organization handle
+        userorg = gb.user_or_org(sess, P.user)
+        # %% prepare to loop over repos
+        repos = gb.get_repos(userorg)
+
+        if P.pattern:
+            repos = (repo for repo in repos if repo.name.startswith(P.pattern))
 
     for repo in repos:
         print(repo.full_name)
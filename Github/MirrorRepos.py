@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+"""
+Keep local bare mirrors of all repos and wikis of a user / organization, for backup.
+
+    python MirrorRepos.py myorg ~/.ssh/oauth ~/backup
+
+New repos are cloned, repos pushed to since the last run are updated, others are skipped.
+Assumes you have an SSH key loaded for git clone.
+"""
+
+from argparse import ArgumentParser
+
+import gitbulk as gb
+from gitbulk.mirror import sync_mirrors
+
+
+def main():
+    p = ArgumentParser(description="local bare mirrors of user / organization repos")
+    p.add_argument("user", help="GitHub username / organization name")
+    p.add_argument("oauth", help="Oauth filename")
+    p.add_argument("root", help="directory of mirrors")
+    p.add_argument("-stem", help="only repos starting with", default="")
+    p.add_argument("-nowiki", help="don't mirror wikis", action="store_true")
+    p.add_argument("-j", "--jobs", help="concurrent git processes", type=int, default=8)
+    p.add_argument("-o", "--out", help="write per-repo results to this .csv")
+    P = p.parse_args()
+
+    sess = gb.session(P.oauth)
+    gb.check_api_limit(sess)
+
+    results = sync_mirrors(sess, P.user, P.root, P.jobs, not P.nowiki, P.stem)
+
+    print(f"{P.user}: {len(results)} repos")
+    print(results.value_counts("repo").to_string())
+    if (failed := results[results.error != ""]).size:
+        print(failed.to_string())
+    if P.out:
+        results.to_csv(P.out)
+
+
+if __name__ == "__main__":
+    main()
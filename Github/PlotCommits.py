@@ -10,8 +10,19 @@ example
 
     python PlotCommits.py myorg ~/.ssh/oauth foo-
 
+With --local, line counts come from git log of local clones instead of one API request per commit,
+and weekly lines changed per repo are also plotted.
+The commit table can be saved with --save, and plotted again later from --table without GitHub:
 
-As a first pass, just shows total LoC changed. Future: plot commit vs. time.
+    python PlotCommits.py myorg ~/.ssh/oauth foo- --local --save commits.parquet
+
+    python PlotCommits.py myorg ~/.ssh/oauth foo- --table commits.parquet
+
+With --stats, weekly per-author totals come from GitHub's statistics endpoints, one request per repo:
+
+    python PlotCommits.py myorg ~/.ssh/oauth foo- --stats
+
+Otherwise, just shows total LoC changed per author.
 """
 
 
@@ -21,9 +32,76 @@ from pathlib import Path
 from matplotlib.pyplot import figure, show
 
 import gitbulk as gb
+from gitbulk.repo_stats import contributor_stats
+from gitbulk.commits import commit_stats, commit_table, read_table, rollup, write_table
 import github.GithubException
 
 
+def plot_authors(name: str, authors: dict[str, int]) -> None:
+    ax = figure().gca()
+    ax.scatter(list(authors.keys()), list(authors.values()))
+    ax.get_yaxis().get_major_formatter().set_useOffset(False)  # type: ignore
+    ax.set_ylabel("total LoC changed")
+    ax.set_yscale("log")
+    ax.set_title(name)
+
+
+def main_local(
+    user: str,
+    oauth: Path,
+    pattern: str,
+    only_empty: bool,
+    mirrors: Path | None,
+    jobs: int,
+    table_fn: Path | None,
+    save: Path | None,
+    stats: bool = False,
+) -> list[str]:
+    empty: list[str] = []
+
+    if table_fn:
+        table = read_table(table_fn)
+        table = table[table.repo.str.split("/").str[1].str.startswith(pattern)]
+    else:
+        sess = gb.session(oauth)
+        gb.check_api_limit(sess)
+
+        names = [r.full_name for r in gb.get_inventory(sess, user, pattern)]
+
+        if stats:
+            table = contributor_stats(sess, names, jobs)
+            empty = [n.split("/")[1] for n in set(names).difference(table.repo)]
+        else:
+            commits = []
+            for full_name, c in commit_stats(names, jobs, mirrors=mirrors):
+                print(f"examined {full_name}", end="\r")
+                if c:
+                    commits.append((full_name, c))
+                else:
+                    empty.append(full_name.split("/")[1])
+            print()  # flush stdout \r
+
+            table = commit_table(commits)
+
+        if save:
+            write_table(table, save)
+
+    if only_empty:
+        return sorted(empty)
+
+    totals = rollup(table, ("repo", "author"), freq=None)
+    for repo, authors in totals[totals > 0].groupby(level="repo", observed=True):
+        plot_authors(repo.split("/")[1], authors.droplevel("repo").to_dict())
+
+    weekly = rollup(table, ("repo",), "W").unstack("repo", fill_value=0)
+    ax = figure().gca()
+    ax.plot(weekly.index, weekly.to_numpy())
+    ax.set_ylabel("LoC changed per week")
+    ax.set_title(f"{user} {pattern}")
+
+    return sorted(empty)
+
+
 def main(user: str, oauth: Path, pattern: str, only_empty: bool) -> list[str]:
     # %% authentication
     sess = gb.session(oauth)
@@ -54,12 +132,7 @@ def main(user: str, oauth: Path, pattern: str, only_empty: bool) -> list[str]:
                 else:
                     authors[commit.author.login] = commit.stats.total
             if not only_empty:
-                ax = figure().gca()
-                ax.scatter(list(authors.keys()), list(authors.values()))
-                ax.get_yaxis().get_major_formatter().set_useOffset(False)  # type: ignore
-                ax.set_ylabel("total LoC changed")
-                ax.set_yscale("log")
-                ax.set_title(repo.name)
+                plot_authors(repo.name, authors)
         except github.GithubException as exc:
             if "empty" in exc.data["message"]:
                 empty.append(repo.name)
@@ -74,10 +147,21 @@ if __name__ == "__main__":
     p.add_argument("oauth", help="Oauth filename")
     p.add_argument("pattern", help="repos with name starting with this string")
     p.add_argument("--empty", help="don't plot, just print out empty repos", action="store_true")
+    p.add_argument("--local", help="count lines with git log of local clones", action="store_true")
+    p.add_argument("--mirrors", help="with --local, use existing mirrors (see MirrorRepos.py)")
+    p.add_argument("-j", "--jobs", help="with --local, concurrent git processes", type=int, default=8)
+    p.add_argument("--save", help="with --local or --stats, save table to .parquet or .pkl")
+    p.add_argument("--table", help="plot from commit table saved by --save")
+    p.add_argument("--stats", help="weekly author totals from GitHub statistics", action="store_true")
     P = p.parse_args()
 
     only_empty = P.empty or show is None
 
-    empty = main(P.userorg, P.oauth, P.pattern, only_empty)
+    if P.local or P.mirrors or P.table or P.stats:
+        empty = main_local(
+            P.userorg, P.oauth, P.pattern, only_empty, P.mirrors, P.jobs, P.table, P.save, P.stats
+        )
+    else:
+        empty = main(P.userorg, P.oauth, P.pattern, only_empty)
     print("\n".join(empty))
     show()
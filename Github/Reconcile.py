@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""
+bring organization repos, teams and team members in line with a roster, showing the plan first
+
+    python Reconcile.py my.xlsx ~/.ssh/orgOauth -stem sw -orgname myorg -col GitHub Team
+
+    python Reconcile.py org.yaml ~/.ssh/orgOauth -orgname myorg -apply
+
+Without -apply, only the planned changes are printed.
+Nothing is removed: repos, teams and members not in the roster are left alone.
+Team permissions are only raised, unless -downgrade.
+
+oauth token must have "write:org" and public_repo (or repo for private) permissions
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+from gitbulk import connect, read_roster
+from gitbulk.reconcile import apply, fetch_state, load_spec, plan, spec_from_roster
+
+
+def main():
+    p = ArgumentParser(description="plan and apply org repos, teams and members from a roster")
+    p.add_argument("fn", help=".xlsx or .csv roster, or .yaml spec")
+    p.add_argument("oauth", help="Oauth file")
+    p.add_argument("-orgname", help="Github Organization", required=True)
+    p.add_argument("-stem", help="beginning of repo and team names", default="")
+    p.add_argument("-col", help="roster columns for Username, team number, [team name]", nargs="+")
+    p.add_argument("-private", help="create private repos", action="store_true")
+    p.add_argument("-permission", help="team permission on its repo", default="push")
+    p.add_argument("-downgrade", help="also lower team permissions above -permission", action="store_true")
+    p.add_argument("-apply", help="make the planned changes", action="store_true")
+    p.add_argument("-j", "--jobs", help="concurrent changes", type=int, default=4)
+    p = p.parse_args()
+
+    fn = Path(p.fn).expanduser()
+
+    match fn.suffix:
+        case ".yaml" | ".yml":
+            desired = load_spec(fn)
+        case _:
+            if not p.col:
+                raise SystemExit("-col Username, team number, [team name] columns needed for a roster")
+            roster = read_roster(fn, p.col, login=0)
+            if roster.shape[1] < 2:
+                raise SystemExit("-col must select Username and team number columns")
+            username, team, *name = roster.columns
+            desired = spec_from_roster(
+                roster, p.stem, p.private, p.permission, username, team, name[0] if name else None
+            )
+
+    op, sess = connect(p.oauth, p.orgname)
+
+    changes = plan(fetch_state(sess, p.orgname), desired, p.downgrade)
+
+    if not changes:
+        print(f"{p.orgname} matches {fn}")
+        return
+
+    if not p.apply:
+        for c in changes:
+            print(c)
+        print(f"{len(changes)} changes planned, use -apply to make them")
+        return
+
+    failed = apply(op, sess, changes, p.jobs)
+    for c, err in failed:
+        print(f"FAILED {c}: {err}")
+    print(f"{len(changes) - len(failed)} of {len(changes)} changes made")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+"""
+Update the local index of a user / organization used by the "-index" option of
+ListRepos.py, ListNonArchived.py, ListNonLicensed.py, ListNonTeamRepos.py and ListGithubCollab.py
+
+    python SyncIndex.py myorg ~/.ssh/oauth
+
+Only repos whose updated / pushed time moved since the last sync have their details refetched.
+Use -full to refetch all, for example after changing collaborators.
+"""
+
+from argparse import ArgumentParser
+
+import gitbulk as gb
+
+
+def main():
+    p = ArgumentParser(description="update local index of user / organization")
+    p.add_argument("user", help="GitHub username / organization name")
+    p.add_argument("oauth", help="Oauth filename")
+    p.add_argument("-index", help="index database file (default under gitbulk cache)")
+    p.add_argument("-full", help="refetch all repo details", action="store_true")
+    P = p.parse_args()
+
+    sess = gb.session(P.oauth)
+    gb.check_api_limit(sess)
+
+    with gb.OrgIndex(P.user, P.index) as index:
+        counts = index.sync(sess, P.full)
+
+    print(f"{P.user}: {counts['repos']} repos, {counts['changed']} updated, {counts['removed']} removed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""
+asyncio equivalents of the gitbulk helpers, for overlapping many requests.
+
+Requires aiohttp:
+
+    pip install gitbulk[aio]
+
+Example:
+
+    import asyncio
+    from gitbulk import aio
+
+    async def main():
+        async with aio.AsyncSession("~/.ssh/oauth") as sess:
+            names = [r.name async for r in aio.get_repos(sess, "myorg")]
+            dates = await asyncio.gather(*(aio.last_commit_date(sess, f"myorg/{n}") for n in names))
+
+    asyncio.run(main())
+
+Requests share one pooled connection, with at most `concurrency` in flight.
+Results are the same PyGithub objects the synchronous helpers return, built from the JSON
+responses; attributes not in the response are fetched synchronously on first access as usual.
+Rate limit headers pace requests: an exhausted budget waits for reset,
+and secondary rate limits are retried after Retry-After or with backoff.
+"""
+
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import typing as T
+import urllib.parse
+
+import aiohttp
+import github
+
+from .base import oauth_tokens
+
+LINK = re.compile(r'<([^>]+)>;\s*rel="(\w+)"')
+
+
+def _resource(url: str) -> str:
+    path = urllib.parse.urlsplit(url).path
+    if path.endswith("/graphql"):
+        return "graphql"
+    if "/search/" in path:
+        return "search"
+    return "core"
+
+
+def _with_page(url: str, page: int) -> str:
+    u = urllib.parse.urlsplit(url)
+    q = urllib.parse.parse_qs(u.query)
+    q["page"] = [str(page)]
+    return urllib.parse.urlunsplit(u._replace(query=urllib.parse.urlencode(q, doseq=True)))
+
+
+def _items(data: T.Any) -> list:
+    if isinstance(data, dict):
+        return data.get("items", [])
+    return data or []
+
+
+class AsyncSession:
+    """
+    asyncio GitHub REST session
+
+    Parameters
+    ----------
+    oauth : pathlib.Path or str, optional
+        file containing Oauth hash
+    base_url : str, optional
+        REST API URL, for GitHub Enterprise Server or a fake server like gitbulk.fakehub.
+        Default: environment variable GITHUB_API_URL, else https://api.github.com
+    concurrency : int, optional
+        most requests in flight at once
+    per_page : int, optional
+        items per page of listings
+    max_retries : int, optional
+        retries of a rate limited request
+    backoff : float, optional
+        first wait in seconds on a secondary rate limit without Retry-After, doubling each retry
+    """
+
+    def __init__(
+        self,
+        oauth: Path | str | None = None,
+        base_url: str | None = None,
+        concurrency: int = 16,
+        per_page: int = 100,
+        max_retries: int = 5,
+        backoff: float = 60.0,
+    ):
+        base_url = base_url or os.environ.get("GITHUB_API_URL") or github.Consts.DEFAULT_BASE_URL
+        tokens = oauth_tokens(oauth)
+        auth = github.Auth.Token(tokens[0]) if tokens else None
+
+        # builds PyGithub objects and completes them on demand
+        self.github = github.Github(auth=auth, base_url=base_url, per_page=per_page)
+        self.requester = self.github.requester
+
+        self.base_url = base_url.rstrip("/")
+        self.per_page = per_page
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self.headers = {
+            "Accept": "application/vnd.github+json",
+            "User-Agent": github.Consts.DEFAULT_USER_AGENT,
+        }
+        if tokens:
+            self.headers["Authorization"] = f"token {tokens[0]}"
+
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.http: aiohttp.ClientSession | None = None
+
+        # resource: [remaining, reset]
+        self.budgets: dict[str, list[float]] = {}
+        self.requests = 0
+
+    async def __aenter__(self) -> "AsyncSession":
+        self.http = aiohttp.ClientSession(
+            headers=self.headers, connector=aiohttp.TCPConnector(limit=self.concurrency)
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self.http:
+            await self.http.close()
+            self.http = None
+
+    async def _pace(self, res: str) -> None:
+        while (b := self.budgets.get(res)) and b[0] < 1 and (wait := b[1] - time.time()) > 0:
+            logging.warning(f"{res} rate limit exhausted, waiting {wait:.0f} s until reset")
+            await asyncio.sleep(wait + 1)
+            b[0] = 1
+
+        if b := self.budgets.get(res):
+            # reserve a request while in flight
+            b[0] -= 1
+
+    def _update(self, res: str, headers: dict[str, str]) -> None:
+        if "x-ratelimit-remaining" in headers and "x-ratelimit-reset" in headers:
+            self.budgets[res] = [
+                float(headers["x-ratelimit-remaining"]),
+                float(headers["x-ratelimit-reset"]),
+            ]
+
+    async def request(
+        self, verb: str, url: str, params: dict[str, T.Any] | None = None, body: T.Any = None
+    ) -> tuple[int, dict[str, str], T.Any]:
+        """
+        one REST request, paced and retried on rate limits
+
+        Parameters
+        ----------
+        verb : str
+            HTTP method
+        url : str
+            absolute URL, or path under base_url like /repos/owner/name
+        params : dict, optional
+            query parameters
+        body : optional
+            JSON body
+
+        Results
+        -------
+        status : int
+            HTTP status
+        headers : dict of str, str
+            response headers, lowercase keys
+        data :
+            decoded JSON response
+
+        Raises
+        ------
+        github.GithubException
+            on an error response, the same subclass PyGithub raises
+        """
+
+        if self.http is None:
+            raise RuntimeError("use AsyncSession in 'async with'")
+
+        if url.startswith("/"):
+            url = self.base_url + url
+        res = _resource(url)
+
+        attempt = 0
+        while True:
+            await self._pace(res)
+
+            async with self.semaphore:
+                async with self.http.request(verb, url, params=params, json=body) as r:
+                    status = r.status
+                    headers = {k.lower(): v for k, v in r.headers.items()}
+                    text = await r.text()
+
+            self.requests += 1
+            self._update(res, headers)
+
+            if status in {403, 429} and attempt < self.max_retries:
+                if "retry-after" in headers:
+                    wait = float(headers["retry-after"])
+                elif headers.get("x-ratelimit-remaining") == "0":
+                    wait = float(headers.get("x-ratelimit-reset", 0)) - time.time() + 1
+                elif "secondary rate limit" in text.lower():
+                    wait = self.backoff * 2**attempt
+                else:
+                    wait = -1
+
+                if wait >= 0:
+                    logging.warning(f"{status} rate limited, retry in {wait:.0f} s: {url}")
+                    await asyncio.sleep(wait)
+                    attempt += 1
+                    continue
+
+            data = json.loads(text) if text else None
+            if status >= 400:
+                raise self.requester.createException(status, headers, data or {})
+
+            return status, headers, data
+
+    async def get(self, url: str, params: dict[str, T.Any] | None = None) -> T.Any:
+        return (await self.request("GET", url, params))[2]
+
+    async def paginate(
+        self, url: str, params: dict[str, T.Any] | None = None
+    ) -> T.AsyncIterator[T.Any]:
+        """
+        items of a paginated listing, in order.
+
+        When the first page links to the last page, the remaining pages are requested
+        concurrently rather than one after another.
+        """
+
+        params = {"per_page": self.per_page, **(params or {})}
+        _, headers, data = await self.request("GET", url, params)
+        for item in _items(data):
+            yield item
+
+        links = {rel: u for u, rel in LINK.findall(headers.get("link", ""))}
+
+        if last := links.get("last"):
+            n = int(urllib.parse.parse_qs(urllib.parse.urlsplit(last).query)["page"][0])
+            pages = [asyncio.ensure_future(self.get(_with_page(last, p))) for p in range(2, n + 1)]
+            try:
+                for page in pages:
+                    for item in _items(await page):
+                        yield item
+            finally:
+                for page in pages:
+                    page.cancel()
+            return
+
+        while nxt := links.get("next"):
+            _, headers, data = await self.request("GET", nxt)
+            for item in _items(data):
+                yield item
+            links = {rel: u for u, rel in LINK.findall(headers.get("link", ""))}
+
+    def make(self, cls: T.Any, attributes: dict[str, T.Any], completed: bool = True) -> T.Any:
+        """
+        PyGithub object of class cls from a JSON response
+        """
+        return cls(self.requester, {}, attributes, completed=completed)
+
+
+async def get_repo(sess: AsyncSession, name: str) -> github.Repository.Repository:
+    """
+    Repository by full name like owner/repo
+    """
+    return sess.make(github.Repository.Repository, await sess.get(f"/repos/{name}"))
+
+
+async def user_or_org(sess: AsyncSession, user: str) -> T.Any:
+    """
+    Determines if user is a GitHub organization or standard user.
+
+    Results
+    -------
+    h: github.NamedUser.NamedUser or github.Organization.Organization
+        the handle to the Organization or Username.
+    """
+    try:
+        info = await sess.get(f"/users/{user}")
+    except github.UnknownObjectException as e:
+        raise ValueError(f"{user} not found on GitHub\n{e}")
+
+    if info.get("type") == "Organization":
+        info["url"] = f"{sess.base_url}/orgs/{info['login']}"
+        return sess.make(github.Organization.Organization, info, completed=False)
+
+    return sess.make(github.NamedUser.NamedUser, info, completed=False)
+
+
+async def get_repos(
+    sess: AsyncSession, userorg: str | github.NamedUser.NamedUser | github.Organization.Organization
+) -> T.AsyncIterator[github.Repository.Repository]:
+    """
+    Repositories of a user or organization, as gitbulk.get_repos
+
+    Parameters
+    ----------
+    userorg : str or github.NamedUser.NamedUser or github.Organization.Organization
+        username or organization, or handle from user_or_org()
+    """
+    owner = await user_or_org(sess, userorg) if isinstance(userorg, str) else userorg
+
+    if isinstance(owner, github.Organization.Organization):
+        url = f"/orgs/{owner.login}/repos"
+    else:
+        url = f"/users/{owner.login}/repos"
+
+    async for r in sess.paginate(url, {"type": "all"}):
+        yield sess.make(github.Repository.Repository, r)
+
+
+async def repo_exists(sess: AsyncSession, name: str) -> bool:
+    """
+    Does a GitHub repo owner/repo exist?
+    """
+    try:
+        await sess.get(f"/repos/{name}")
+    except github.GithubException as e:
+        logging.info(str(e))
+        return False
+
+    return True
+
+
+async def repo_isempty(sess: AsyncSession, name: str) -> bool:
+    """
+    is GitHub repo owner/repo empty?
+    """
+    try:
+        await sess.get(f"/repos/{name}/contents/")
+    except github.GithubException as e:
+        logging.info(f"{name} is empty: {e}")
+        return True
+
+    return False
+
+
+async def last_commit_date(sess: AsyncSession, name: str) -> datetime | None:
+    """
+    time of last push to GitHub repo owner/repo, None if the repo is empty
+    """
+    repo, empty = await asyncio.gather(get_repo(sess, name), repo_isempty(sess, name))
+    if empty:
+        return None
+
+    return repo.pushed_at
+
+
+async def get_collabs(
+    sess: AsyncSession,
+    orgname: str,
+    stem: str | None = None,
+    regex: str | None = None,
+) -> dict[str, list[str]]:
+    """
+    outside collaborators for each selected repo of an organization, as gitbulk.get_collabs.
+    Collaborator listings of all repos are requested concurrently.
+
+    Parameters
+    ----------
+    orgname : str
+        organization name
+    stem: str, optional
+        repo names starts with
+    regex: str, optional
+        regex pattern
+    """
+
+    rpat = re.compile(regex) if regex else None
+
+    names = []
+    async for r in sess.paginate(f"/orgs/{orgname}/repos", {"type": "all"}):
+        if rpat and not rpat.match(r["name"]):
+            continue
+        elif stem and not r["name"].startswith(stem):
+            continue
+        names.append(r["name"])
+
+    async def collabs(name: str) -> list[str]:
+        url = f"/repos/{orgname}/{name}/collaborators"
+        return [u["login"] async for u in sess.paginate(url, {"affiliation": "outside"})]
+
+    return dict(zip(names, await asyncio.gather(*(collabs(n) for n in names))))
@@ -0,0 +1,467 @@
+"""
+GitHub API utilities shared by the gitbulk modules and scripts
+"""
+
+from pathlib import Path
+from datetime import datetime
+import logging
+import os
+import time
+import typing as T
+
+import github
+
+from .cache import ResponseCache
+from .cassette import Cassette
+from .client import Middleware, Session
+from .metrics import Metrics
+from .ratelimit import RateLimiter
+from .tokens import TokenPool
+
+
+def check_api_limit(g: github.Github | None = None) -> None:
+    """
+    https://developer.github.com/v3/#rate-limiting
+    don't hammer the API, avoiding 502 errors
+
+    Uses the rate limit of the last response headers, so it makes no request.
+    If the rate limit is exhausted, waits until it resets.
+
+    Parameters
+    ----------
+    g : optional
+        GitHub session
+    """
+    if g is None:
+        g = session()
+
+    api_remaining, api_max = g.requester.rate_limiting  # remaining, limit
+    if api_remaining < 0:
+        # no response yet, the session rate limiter paces the first requests
+        return
+
+    treset = datetime.utcfromtimestamp(g.requester.rate_limiting_resettime)  # local time
+
+    if api_remaining == 0:
+        wait = g.requester.rate_limiting_resettime - time.time()
+        logging.warning(
+            f"GitHub rate limit exceeded: {api_remaining} / {api_max}. Waiting until {treset} UTC."
+        )
+        time.sleep(max(wait, 0) + 1)
+    # it's not elif !
+    elif api_remaining < 10:
+        logging.warning(
+            ResourceWarning(
+                f"approaching GitHub API limit, {api_remaining} / {api_max} remaining until {treset} UTC."
+            )
+        )
+    else:
+        logging.info(f"GitHub API limit: {api_remaining} / {api_max} remaining until {treset} UTC.")
+
+
+def api_pace(g: github.Github, reserve: int = 1) -> None:
+    """
+    pace requests from the rate limit budget of the last response headers.
+    Unlike check_api_limit() this does not raise, it waits.
+
+    When fewer than "reserve" requests remain, sleep until the rate limit resets.
+    When the budget is below 10% of the limit, spread the remaining requests evenly
+    over the time left in the rate limit window.
+
+    Sessions with a RateLimiter pace each request themselves, so this does nothing for them.
+
+    Parameters
+    ----------
+    g : github.Github
+        GitHub session
+    reserve : int, optional
+        number of requests that may be in flight at once e.g. number of worker threads
+    """
+
+    if isinstance(g, Session) and g.find_middleware(RateLimiter):
+        return
+
+    api_remaining, api_max = g.requester.rate_limiting
+    treset = g.requester.rate_limiting_resettime
+    wait = treset - time.time()
+
+    if api_remaining < 0 or wait <= 0:
+        return
+
+    if api_remaining < reserve:
+        logging.warning(f"GitHub API limit reached, waiting {wait:.0f} seconds until reset.")
+        time.sleep(wait + 1)
+    elif api_remaining < 0.1 * api_max:
+        time.sleep(wait * reserve / api_remaining)
+
+
+def cache_dir() -> Path:
+    """
+    directory of gitbulk persistent caches:
+    environment variable GITBULK_CACHE, else under XDG_CACHE_HOME or ~/.cache
+    """
+
+    if d := os.environ.get("GITBULK_CACHE"):
+        return Path(d).expanduser()
+
+    return Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser() / "gitbulk"
+
+
+def oauth_tokens(oauth: Path | str | T.Sequence[Path | str] | None) -> list[str]:
+    """
+    read Oauth tokens from one file, several files,
+    or a string of paths separated by os.pathsep
+    """
+    if isinstance(oauth, str):
+        oauth = oauth.split(os.pathsep)
+    elif isinstance(oauth, Path):
+        oauth = [oauth]
+
+    # no trailing \n allowed
+    return [Path(fn).expanduser().read_text().strip() for fn in oauth or []]
+
+
+def _metrics_env(env: str) -> bool | Path:
+    """
+    GITBULK_METRICS value: on, off, or a file to write the metrics to
+    """
+    env = env.strip()
+    if env.lower() in {"", "0", "false", "no", "off"}:
+        return False
+    if env.lower() in {"1", "true", "yes", "on"}:
+        return True
+
+    fn = Path(env).expanduser()
+    if fn.suffix or len(fn.parts) > 1:
+        return fn
+
+    logging.warning(f"GITBULK_METRICS={env} is neither on/off nor a file path like metrics.json")
+    return True
+
+
+def session(
+    oauth: Path | str | T.Sequence[Path | str] | None = None,
+    cache: bool | Path | None = None,
+    cache_size: int = 256 * 2**20,
+    pace: bool = True,
+    base_url: str | None = None,
+    metrics: bool | Path | None = None,
+    record: Path | None = None,
+    replay: Path | None = None,
+    replay_latency: float | None = None,
+) -> Session:
+    """
+    setup Git remote session
+
+    Parameters
+    ----------
+
+    oauth : pathlib.Path or list of pathlib.Path, optional
+        path to file containing Oauth hash.
+        Several files, or a string of paths separated by os.pathsep (":" or ";"),
+        make a token pool: each request uses the token with the most remaining rate limit.
+        Pooled tokens must belong to one user.
+    cache : bool or pathlib.Path, optional
+        on-disk HTTP response cache with conditional requests.
+        True: use cache_dir(). Path: cache database file.
+        Default: on if environment variable GITBULK_HTTP_CACHE is set to a cache database file.
+    cache_size : int, optional
+        size cap in bytes of the response cache
+    pace : bool, optional
+        pace requests from the rate limit headers of each response,
+        waiting out exhausted and secondary rate limits instead of failing.
+        Always on for a token pool.
+    base_url : str, optional
+        REST API URL, for GitHub Enterprise Server or a fake server like gitbulk.fakehub.
+        Default: environment variable GITHUB_API_URL, else https://api.github.com
+    metrics : bool or pathlib.Path, optional
+        record per-endpoint request metrics in a gitbulk.metrics.Metrics middleware,
+        printing a summary at exit. Path: also write them to .json or .prom (Prometheus).
+        Default: environment variable GITBULK_METRICS, 1/true/yes or a .json/.prom file for on.
+    record : pathlib.Path, optional
+        record all responses to this archive, see gitbulk.cassette.
+        Default: environment variable GITBULK_RECORD
+    replay : pathlib.Path, optional
+        answer all requests from an archive made with record, without network or tokens.
+        Default: environment variable GITBULK_REPLAY
+    replay_latency : float, optional
+        with replay, wait this fraction of the recorded response times, 1 for real time.
+        Default: environment variable GITBULK_REPLAY_LATENCY, else 0
+
+    Results
+    -------
+    g : gitbulk.client.Session
+        Git remote session handle, a github.Github
+    """
+    tokens = oauth_tokens(oauth)
+
+    if record is None and (env := os.environ.get("GITBULK_RECORD")):
+        record = Path(env)
+    if replay is None and (env := os.environ.get("GITBULK_REPLAY")):
+        replay = Path(env)
+    if replay_latency is None:
+        replay_latency = float(os.environ.get("GITBULK_REPLAY_LATENCY") or 0)
+    if record or replay:
+        # the archive has the full responses, not 304s of an HTTP cache
+        cache = False
+
+    if cache is None and (env := os.environ.get("GITBULK_HTTP_CACHE")):
+        cache = Path(env)
+    if cache is True:
+        cache = cache_dir() / "http.sqlite3"
+
+    base_url = base_url or os.environ.get("GITHUB_API_URL") or github.Consts.DEFAULT_BASE_URL
+
+    middleware: list[Middleware] = []
+    limiter = RateLimiter() if pace or len(tokens) > 1 else None
+    if limiter and len(tokens) > 1:
+        # first, so the cache keys responses by the token actually sent
+        middleware.append(TokenPool(tokens, limiter, base_url))
+    if cache:
+        middleware.append(ResponseCache(Path(cache), cache_size))
+
+    kwargs = {}
+    if limiter:
+        middleware.append(limiter)
+        # RateLimiter replaces PyGithub's fixed sleeps between requests
+        kwargs = {"seconds_between_requests": None, "seconds_between_writes": None}
+
+    if metrics is None:
+        metrics = _metrics_env(os.environ.get("GITBULK_METRICS", ""))
+    if metrics:
+        # last, to see each attempt and the real status of cached responses
+        middleware.append(Metrics(metrics))
+    # in place of the network
+    if record:
+        middleware.append(Cassette(record, "record"))
+    elif replay:
+        middleware.append(Cassette(replay, "replay", replay_latency))
+
+    return Session(
+        github.Auth.Token(tokens[0]) if tokens else None, middleware, base_url=base_url, **kwargs
+    )
+
+
+def connect(oauth: Path | str | T.Sequence[Path | str], orgname: str | None = None, **kwargs) -> tuple:
+    """
+    retrieve organizations or users
+
+    Parameters
+    ----------
+    oauth : pathlib.Path
+        file containing Oauth hash, or several for a token pool as in session()
+    orgname : str
+        organization name or username
+    kwargs :
+        passed to session()
+
+    Results
+    -------
+    op : github.AuthenticatedUser.AuthenticatedUser or github.Organization.Organization
+        handle to organization or user
+    sess : github.Github
+        Git remote session
+    """
+
+    sess = session(oauth, **kwargs)
+    guser = sess.get_user()
+
+    if orgname:
+        assert isinstance(guser, github.AuthenticatedUser.AuthenticatedUser)
+
+        for org in guser.get_orgs():
+            if org.login == orgname:
+                return org, sess
+    else:
+        assert isinstance(guser, github.Organization.Organization)
+        return guser, sess
+
+    raise ValueError(f"Organization {org} authentication could not be established")
+
+
+def repo_exists(user: github.AuthenticatedUser.AuthenticatedUser, repo_name: str) -> bool:
+    """
+    Does a particular GitHub repo exist?
+
+    Parameters
+    ----------
+    user : github.AuthenticatedUser.AuthenticatedUser or github.Organization.Organization
+        GitHub user or organizaition handle
+    repo_name : str
+        repo_name under user
+
+    Results
+    -------
+    exists : bool
+        GitHub repo exists
+    """
+    exists = False
+    try:
+        repo = user.get_repo(repo_name)
+        if repo.name:
+            exists = True
+    except github.GithubException as e:
+        logging.info(str(e))
+
+    return exists
+
+
+def team_exists(user: github.AuthenticatedUser.AuthenticatedUser, team_name: str) -> bool:
+    """
+    Does a particular GitHub team exist?
+
+    Parameters
+    ----------
+    user : github.AuthenticatedUser.AuthenticatedUser or github.Organization.Organization
+        GitHub user or organizaition handle
+    team_name : str
+        team name
+
+    Results
+    -------
+    exists : bool
+        GitHub team exists
+    """
+    exists = False
+    try:
+        teams = user.get_teams()
+        names = [t.name for t in teams]
+        exists = team_name in names
+    except github.GithubException as e:
+        logging.info(str(e))
+
+    return exists
+
+
+def lazy_repo(sess: github.Github, full_name: str) -> github.Repository.Repository:
+    """
+    Repository handle by full name like owner/repo, without a request.
+    Attributes are fetched on first access; get_repo(lazy=True) is deprecated.
+    """
+    return github.Repository.Repository(
+        sess.requester.withLazy(True), url=f"/repos/{full_name}"
+    )
+
+
+def last_commit_date(sess: github.Github, name: str) -> datetime | None:
+    """
+    What is the last commit date to this repo.
+
+    Equivalent to:
+
+        git show -s --format=%cI HEAD
+
+
+    Parameters
+    ----------
+    sess : github.Github
+        GitHub session
+    name : str
+        name of GitHub repo e.g. pymap3d
+
+    Results
+    -------
+    time : datetime.datetime
+        time of last repo modification
+    """
+
+    repo = sess.get_repo(name)
+    if not repo_isempty(repo):
+        return repo.pushed_at
+
+    return None
+
+
+def repo_isempty(repo: github.Repository.Repository) -> bool:
+    """
+    is a GitHub repo empty?
+
+    Parameters
+    ----------
+    repo : github.Repository
+        handle to GitHub repo
+
+    Results
+    -------
+    empty : bool
+        GitHub repo empty
+    """
+    try:
+        repo.get_contents("/")
+        empty = False
+    except github.GithubException as e:
+        logging.error(f"{repo.name} is empty. \n")
+        empty = True
+        logging.info(str(e))
+
+    return empty
+
+
+def user_or_org(g: github.Github, user: str, cache: bool | Path = True) -> T.Any:
+    """
+    Determines if user is a GitHub organization or standard user.
+    This is relevant to getting private repos.
+    One GraphQL request, none if cached from a recent run, see gitbulk.users.resolve_owner().
+
+    Parameters
+    ----------
+    g: github.Github
+        Github session handle
+    user: str
+        username or organization name
+    cache: bool or pathlib.Path, optional
+        JSON cache of resolved owners. True: under gitbulk.cache_dir()
+
+    Returns
+    -------
+    h: github.NamedUser.NamedUser or github.Organization.Organization
+        the handle to the Organization or Username.
+    """
+
+    from .users import resolve_owner
+
+    return resolve_owner(g, user, cache)
+
+
+def read_repos(fn: Path, sheet: str) -> dict[str, str]:
+    """
+    make pandas.Series of email/id, Git url from spreadsheet
+
+    Parameters
+    ----------
+    fn : pathlib.Path
+        path to Excel spreadsheet listing usernames and repos to duplicate
+    sheet : str
+        name of Excel sheet to use
+
+    Results
+    -------
+    repos : dict
+        all the repos to duplicate
+    """
+
+    from .roster import read_roster
+
+    # %% get list of repos to duplicate
+    repos = read_roster(fn, "A, D", sheet)
+
+    return dict(zip(repos.iloc[:, 0], repos.iloc[:, 1]))
+
+
+def get_repos(userorg: github.NamedUser.NamedUser) -> T.Iterable[github.Repository.Repository]:
+    """
+    get list of Repositories for a user or organization
+
+    Parameters
+    ----------
+    userorg: github.NamedUser.NamedUser or github.Organization.Organization
+        username or organization handle
+
+    Returns
+    -------
+    repos: list of github.Repository
+        all repos for a username / orgname
+
+    https://docs.github.com/en/free-pro-team@latest/rest/reference/repos#list-repositories-for-the-authenticated-user--parameters
+    """
+    return userorg.get_repos(type="all")
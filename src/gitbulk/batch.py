@@ -0,0 +1,398 @@
+"""
+Run a queue of bulk operations in one process, sharing one session and its caches.
+
+Each Github/*.py script is its own process that imports pandas and PyGithub,
+authenticates, resolves the owner and lists all the owner's repos.
+A Batch does that once for all its operations: they share the session
+(connection pool, HTTP cache, token pool and rate limiter), owner handles,
+the GraphQL repo inventory, organization members and team directory of each owner.
+Operations that change repos update the cached inventory instead of listing again.
+
+An operation is a dict like {"op": "archive", "owner": "myorg", "pattern": "sw2019-"}.
+A batch file is a YAML or JSON list of them. A long-running daemon keeps the caches warm
+between batches: server() answers operations sent by submit() over a Unix socket.
+"""
+
+from dataclasses import replace
+from pathlib import Path
+import inspect
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+import typing as T
+
+import github
+
+from .base import lazy_repo, user_or_org
+from .directory import OrgDirectory
+from .graphql import RepoInfo, get_inventory
+from .template import sync_templates, template_files
+from .users import resolve_users
+
+OPERATIONS = ("list", "archive", "private", "add_members", "copy_files", "refresh")
+
+
+def load_operations(fn: Path) -> list[dict[str, T.Any]]:
+    """
+    operations from a .json file, or .yaml (requires PyYAML), holding a list like:
+
+        - {op: list, owner: myorg, pattern: sw2019-}
+        - {op: archive, owner: myorg, pattern: sw2019-}
+        - {op: add_members, owner: myorg, logins: [alice, bob], team: sw2020-01}
+        - {op: copy_files, owner: myorg, src: ci.yml, target: .github/workflows/ci.yml,
+           language: Python}
+        - {op: refresh, owner: myorg}
+
+    refresh reloads the owner's listings on next use, as after changes made outside the batch.
+    """
+
+    fn = Path(fn).expanduser()
+
+    if fn.suffix in {".yaml", ".yml"}:
+        import yaml
+
+        ops = yaml.safe_load(fn.read_text()) or []
+    else:
+        ops = json.loads(fn.read_text())
+
+    if not isinstance(ops, list) or not all(isinstance(op, dict) and "op" in op for op in ops):
+        raise ValueError(f"{fn} must be a list of operations like {{op: list, owner: myorg}}")
+
+    return ops
+
+
+class Batch:
+    """
+    runs operations on one session, caching owners, repo inventories and team directories
+
+    Parameters
+    ----------
+    sess : github.Github
+        GitHub session shared by all operations
+    dry_run : bool, optional
+        report the changes operations would make, without making them
+    ttl : float, optional
+        seconds after which cached inventories, members and directories are reloaded.
+        None: never expires.
+    """
+
+    def __init__(self, sess: github.Github, dry_run: bool = False, ttl: float | None = 600.0):
+        self.sess = sess
+        self.dry_run = dry_run
+        self.ttl = ttl
+
+        # operations run one at a time, also when submitted by several daemon clients
+        self._lock = threading.Lock()
+        self._owners: dict[str, T.Any] = {}
+        self._inventory: dict[str, tuple[float, dict[str, RepoInfo]]] = {}
+        self._members: dict[str, tuple[float, set[str]]] = {}
+        self._directories: dict[str, OrgDirectory] = {}
+
+    def _fresh(self, loaded: float) -> bool:
+        return self.ttl is None or time.monotonic() - loaded < self.ttl
+
+    # %% shared caches
+    def owner(self, login: str) -> T.Any:
+        """
+        user or organization handle, resolved once
+        """
+        key = login.casefold()
+        if key not in self._owners:
+            self._owners[key] = user_or_org(self.sess, login)
+        return self._owners[key]
+
+    def inventory(self, login: str) -> dict[str, RepoInfo]:
+        """
+        repos of a user or organization by name, listed once per ttl
+        """
+        key = login.casefold()
+        if not (cached := self._inventory.get(key)) or not self._fresh(cached[0]):
+            repos = {r.name: r for r in get_inventory(self.sess, login)}
+            cached = self._inventory[key] = (time.monotonic(), repos)
+        return cached[1]
+
+    def repos(self, login: str, pattern: str = "", **where: T.Any) -> list[RepoInfo]:
+        """
+        repos with name starting with pattern, and attributes equal to where if not None
+        """
+        return [
+            r
+            for r in self.inventory(login).values()
+            if r.name.startswith(pattern)
+            and all(v is None or getattr(r, k) == v for k, v in where.items())
+        ]
+
+    def members(self, org: str) -> set[str]:
+        """
+        casefolded logins of members and invited members of an organization
+        """
+        key = org.casefold()
+        if not (cached := self._members.get(key)) or not self._fresh(cached[0]):
+            op = self.owner(org)
+            logins = {m.login.casefold() for m in op.get_members()}
+            logins.update(m.login.casefold() for m in op.invitations())
+            cached = self._members[key] = (time.monotonic(), logins)
+        return cached[1]
+
+    def directory(self, org: str) -> OrgDirectory:
+        key = org.casefold()
+        if key not in self._directories:
+            self._directories[key] = OrgDirectory(self.owner(org), self.ttl)
+        return self._directories[key]
+
+    def forget(self, login: str) -> None:
+        """
+        drop the cached inventory, members and directory of an owner, as after outside changes
+        """
+        key = login.casefold()
+        for cache in (self._inventory, self._members, self._directories):
+            cache.pop(key, None)
+
+    # %% running
+    def run(self, operation: dict[str, T.Any]) -> dict[str, T.Any]:
+        """
+        run one operation
+
+        Results
+        -------
+        result : dict
+            the operation, with its results, or "error" if it failed
+        """
+
+        args = dict(operation)
+        name = args.pop("op", None)
+
+        tic = time.monotonic()
+        with self._lock:
+            try:
+                if name not in OPERATIONS:
+                    raise ValueError(f"unknown operation {name}, one of {' '.join(OPERATIONS)}")
+                func = getattr(self, f"_{name}")
+                try:
+                    inspect.signature(func).bind(**args)
+                except TypeError as e:
+                    raise ValueError(f"bad arguments for {name}: {e}")
+                result = func(**args)
+            except (github.GithubException, ValueError, KeyError, OSError) as e:
+                result = {"error": str(e)}
+
+        if "error" in result:
+            logging.error(f"{name}: {result['error']}")
+
+        return operation | result | {"seconds": round(time.monotonic() - tic, 3)}
+
+    def run_all(self, operations: T.Iterable[dict[str, T.Any]]) -> T.Iterator[dict[str, T.Any]]:
+        """
+        run operations in order, yielding each result. A failed operation doesn't stop the rest.
+        """
+        for op in operations:
+            yield self.run(op)
+
+    # %% operations
+    def _list(
+        self,
+        owner: str,
+        pattern: str = "",
+        archived: bool | None = None,
+        private: bool | None = None,
+        language: str | None = None,
+    ) -> dict[str, T.Any]:
+        repos = self.repos(owner, pattern, archived=archived, private=private)
+        if language:
+            repos = [r for r in repos if r.languages.get(language)]
+
+        return {"repos": [r.full_name for r in repos]}
+
+    def _refresh(self, owner: str) -> dict[str, T.Any]:
+        self.forget(owner)
+        return {}
+
+    def _edit(self, owner: str, pattern: str, attr: str) -> dict[str, T.Any]:
+        change: dict[str, T.Any] = {attr: True}
+        to_act = self.repos(owner, pattern, **{attr: False})
+
+        changed = []
+        failed: dict[str, str] = {}
+        for info in to_act:
+            if not self.dry_run:
+                try:
+                    lazy_repo(self.sess, info.full_name).edit(**change)
+                except github.GithubException as e:
+                    logging.error(f"{info.full_name}: {e}")
+                    failed[info.full_name] = str(e)
+                    continue
+                self.inventory(owner)[info.name] = replace(info, **change)
+            changed.append(info.full_name)
+
+        return {"changed": changed, "failed": failed}
+
+    def _archive(self, owner: str, pattern: str) -> dict[str, T.Any]:
+        return self._edit(owner, pattern, "archived")
+
+    def _private(self, owner: str, pattern: str) -> dict[str, T.Any]:
+        return self._edit(owner, pattern, "private")
+
+    def _add_members(
+        self,
+        owner: str,
+        logins: list[str] | None = None,
+        roster: str | None = None,
+        col: T.Any = None,
+        team: str | None = None,
+        create: bool = False,
+    ) -> dict[str, T.Any]:
+        """
+        invite logins, or the logins in column col of a roster spreadsheet, to the organization,
+        or add them to team
+        """
+        if roster:
+            from .roster import read_roster
+
+            logins = list(read_roster(Path(roster), col, login=0).iloc[:, 0])
+        if not logins:
+            raise ValueError("add_members needs logins or roster")
+
+        wanted = {u.strip().casefold() for u in logins}
+        if not team:
+            wanted -= self.members(owner)
+
+        # all logins looked up at once, reporting every unknown login before changing anything
+        users, unknown = resolve_users(self.sess, wanted)
+        if unknown:
+            raise ValueError(f"unknown GitHub usernames {' '.join(unknown)}")
+
+        if not team:
+            for login in sorted(users):
+                if not self.dry_run:
+                    self.owner(owner).add_to_members(users[login])
+                    self.members(owner).add(login)
+            return {"invited": sorted(u.login for u in users.values())}
+
+        directory = self.directory(owner)
+        if not directory.has_team(team):
+            if not create:
+                raise KeyError(f"team {team} does not exist in {owner}")
+            if self.dry_run:
+                return {"created": team, "added": sorted(u.login for u in users.values())}
+            directory.create_team(team)
+        t = directory.team(team)
+
+        added = []
+        for login in sorted(users):
+            try:
+                # raises exception if not a member at any level
+                t.get_team_membership(users[login])
+            except github.GithubException:
+                if not self.dry_run:
+                    t.add_membership(users[login], role="member")
+                added.append(users[login].login)
+
+        return {"added": added}
+
+    def _copy_files(
+        self,
+        owner: str,
+        src: str,
+        target: str,
+        pattern: str = "",
+        language: str | None = None,
+        message: str = "update files",
+        jobs: int = 4,
+    ) -> dict[str, T.Any]:
+        files = template_files(Path(src), target)
+        if not files:
+            raise FileNotFoundError(src)
+
+        repos = [
+            r
+            for r in self.repos(owner, pattern, archived=False)
+            if r.default_branch and (not language or r.languages.get(language))
+        ]
+        if self.dry_run:
+            return {"repos": [r.full_name for r in repos]}
+
+        to_act = ((r.full_name, r.default_branch) for r in repos)
+        changed = {
+            name: status
+            for name, status in sync_templates(self.sess, to_act, files, message, jobs)  # type: ignore
+            if status != "up to date"
+        }
+
+        return {"changed": changed}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: T.Any
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                operation = json.loads(line)
+                result = self.server.batch.run(operation)
+            except (ValueError, AttributeError, TypeError) as e:
+                result = {"error": f"bad operation {line[:100]!r}: {e}"}
+            self.wfile.write(json.dumps(result, default=str).encode() + b"\n")
+            self.wfile.flush()
+
+
+def server(batch: Batch, path: Path) -> socketserver.BaseServer:
+    """
+    daemon answering operations sent by submit() on a Unix socket, with one shared Batch.
+    Each connection sends operations as JSON lines, and gets a JSON result line for each.
+    Start with server(...).serve_forever().
+
+    Parameters
+    ----------
+    batch : Batch
+        runs the operations, keeping its caches between connections
+    path : pathlib.Path
+        Unix socket file, usable only by this user as the daemon acts with its tokens.
+        A stale socket is replaced; an existing file or running daemon raises FileExistsError.
+    """
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("the batch daemon requires Unix domain sockets")
+
+    path = Path(path).expanduser()
+    if path.is_socket():
+        # a stale socket of a daemon that exited is replaced, a running daemon's is not
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            try:
+                s.connect(str(path))
+            except OSError:
+                path.unlink()
+            else:
+                raise FileExistsError(f"a daemon is already serving on {path}")
+    elif path.exists():
+        raise FileExistsError(f"{path} exists and isn't a socket")
+
+    # created with permissions for this user only, without a window before a chmod
+    umask = os.umask(0o077)
+    try:
+        srv = socketserver.ThreadingUnixStreamServer(str(path), _Handler)
+    finally:
+        os.umask(umask)
+    srv.batch = batch  # type: ignore[attr-defined]
+    srv.daemon_threads = True
+
+    return srv
+
+
+def submit(path: Path, operations: T.Iterable[dict[str, T.Any]]) -> T.Iterator[dict[str, T.Any]]:
+    """
+    send operations to a server() daemon, yielding each result as it completes
+    """
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(str(Path(path).expanduser()))
+        with s.makefile("rwb") as f:
+            for op in operations:
+                f.write(json.dumps(op).encode() + b"\n")
+                f.flush()
+                yield json.loads(f.readline())
@@ -0,0 +1,303 @@
+"""
+Benchmarks of the bulk operations and scripts against the offline fake GitHub server
+of gitbulk.fakehub, recording wall time, API requests and peak memory per benchmark.
+
+Each benchmark gets a fresh fake server in its own process, so the server's work
+isn't counted toward the client's time and memory.
+Scripts of the Github/ directory, if given, run in-process with GITHUB_API_URL pointing at the server.
+Peak memory is of Python allocations (tracemalloc), which slows the run somewhat,
+so compare wall times only between runs with the same memory setting.
+
+Writes are paced by the session RateLimiter to one per second as on GitHub,
+so the benchmarks mostly exercise reads: rosters list existing team members,
+and only repo_dupe creates repos.
+"""
+
+from pathlib import Path
+import contextlib
+import functools
+import io
+import json
+import os
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing as T
+
+import pandas
+
+from . import fakehub
+from .fakehub import FakeOrg
+
+SCALES: dict[str, dict[str, T.Any]] = {
+    "small": {
+        "org": FakeOrg(repos=300, forks=20, teams=20, members=400),
+        "prober": FakeOrg(repos=10, forks=50),
+        "dupe": 3,
+    },
+    "large": {
+        "org": FakeOrg(repos=10_000, forks=2_000, teams=500, members=5_000),
+        "prober": FakeOrg(repos=20, forks=2_000),
+        "dupe": 20,
+    },
+}
+
+
+@contextlib.contextmanager
+def environ(**kwargs: str) -> T.Iterator[None]:
+    """
+    temporarily set environment variables
+    """
+    old = {k: os.environ.get(k) for k in kwargs}
+    os.environ.update(kwargs)
+    try:
+        yield
+    finally:
+        for k, v in old.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def measure(name: str, url: str, func: T.Callable[[], T.Any], memory: bool = True) -> dict:
+    """
+    run one benchmark
+
+    Results
+    -------
+    result : dict
+        benchmark, seconds, calls (API requests), peak_mib, routes (requests per route)
+    """
+
+    fakehub.reset(url)
+    if memory:
+        tracemalloc.start()
+
+    tic = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    seconds = time.perf_counter() - tic
+
+    peak = 0
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    routes = fakehub.calls(url)
+
+    return {
+        "benchmark": name,
+        "seconds": round(seconds, 3),
+        "calls": sum(routes.values()),
+        "peak_mib": round(peak / 2**20, 2),
+        "routes": routes,
+    }
+
+
+def run_script(script: Path, *args: str) -> None:
+    """
+    run a Github/ script in-process, as from the command line
+    """
+    argv = sys.argv
+    sys.argv = [str(script), *args]
+    try:
+        runpy.run_path(str(script), run_name="__main__")
+    except SystemExit as e:
+        if e.code:
+            raise RuntimeError(f"{script.name} exited with {e.code}") from e
+    finally:
+        sys.argv = argv
+
+
+def source_repos(root: Path, org: str, names: T.Iterable[str]) -> None:
+    """
+    bare git repos with one commit, standing in for organization repos to duplicate
+    """
+
+    env = os.environ | {
+        "GIT_AUTHOR_NAME": "bench",
+        "GIT_AUTHOR_EMAIL": "bench@example.invalid",
+        "GIT_COMMITTER_NAME": "bench",
+        "GIT_COMMITTER_EMAIL": "bench@example.invalid",
+    }
+
+    for name in names:
+        work = root / "work" / name
+        subprocess.run(["git", "init", "--quiet", "-b", "main", str(work)], check=True)
+        (work / "README.md").write_text(f"# {name}\n")
+        subprocess.run(["git", "add", "README.md"], cwd=work, check=True)
+        subprocess.run(["git", "commit", "--quiet", "-m", "init"], cwd=work, check=True, env=env)
+        subprocess.run(
+            ["git", "clone", "--bare", "--quiet", str(work), str(root / org / name)], check=True
+        )
+
+
+def benchmarks(
+    scale: str, work: Path, oauth: Path, jobs: int, scripts: Path | None
+) -> T.Iterator[tuple[str, FakeOrg, dict[str, T.Any], T.Callable[[], T.Any]]]:
+    """
+    name, organization, fake server options and function to time, per benchmark
+    """
+
+    from .base import connect, session
+    from .duplicator import repo_dupe
+    from .get import get_collabs
+    from .graphql import get_inventory, get_team_repos
+    from .repo_stats import repo_prober
+
+    org: FakeOrg = SCALES[scale]["org"]
+    prober: FakeOrg = SCALES[scale]["prober"]
+    login = org.login
+
+    # members already in their teams: the roster flows look everything up and change nothing
+    roster = work / "roster.csv"
+    pandas.DataFrame(
+        {
+            "GitHub": [f"user{m}" for m in range(org.members)],
+            "Team": [m % org.teams for m in range(org.members)],
+        }
+    ).to_csv(roster, index=False)
+
+    yield "inventory", org, {}, lambda: list(get_inventory(session(oauth), login))
+    yield "team_repos", org, {}, lambda: get_team_repos(session(oauth), login)
+    yield "repo_prober", prober, {}, lambda: repo_prober(login, oauth, workers=jobs)
+
+    def collabs() -> None:
+        op, sess = connect(oauth, login)
+        get_collabs(op, sess, workers=jobs)
+
+    yield "get_collabs", org, {}, collabs
+
+    n = SCALES[scale]["dupe"]
+    git_root = work / "git"
+    source_repos(git_root, login, [f"{org.stem}{i:05d}" for i in range(n)])
+    dupes = {f"student{i}": f"https://github.com/{login}/{org.stem}{i:05d}" for i in range(n)}
+
+    def dupe() -> None:
+        with environ(
+            GIT_CONFIG_COUNT="1",
+            GIT_CONFIG_KEY_0=f"url.{git_root.as_posix()}/.insteadOf",
+            GIT_CONFIG_VALUE_0="ssh://github.com/",
+        ):
+            results = repo_dupe(dupes, oauth, login, "dupe-", workers=jobs)
+        if (results["error"] != "").any():
+            raise RuntimeError(results[results["error"] != ""].to_string())
+
+    yield "repo_dupe", org, {"git_root": git_root}, dupe
+
+    if scripts is None:
+        return
+    if not scripts.is_dir():
+        print(f"skipping script benchmarks: {scripts} is not a directory", file=sys.stderr)
+        return
+
+    teams = [str(roster), str(oauth), "-orgname", login, "-stem", "team", "-col", "GitHub", "Team"]
+    flows = [
+        ("ListNonArchived.py", [login, str(oauth)]),
+        ("ListNonLicensed.py", [login, str(oauth)]),
+        ("ListNonTeamRepos.py", [str(oauth), login]),
+        ("ListGithubCollab.py", [str(oauth), login, "-j", str(jobs)]),
+        ("CountGithubStars.py", [login, "-i", str(oauth)]),
+        ("AddTeamMembers.py", teams),
+        ("Reconcile.py", teams),
+    ]
+    for script, args in flows:
+        if (scripts / script).is_file():
+            yield script, org, {}, functools.partial(run_script, scripts / script, *args)
+
+
+def run_benchmarks(
+    scale: str = "small",
+    latency: float = 0.0,
+    jobs: int = 8,
+    memory: bool = True,
+    select: T.Sequence[str] = (),
+    scripts: Path | None = None,
+) -> pandas.DataFrame:
+    """
+    run the benchmark suite against fake GitHub servers
+
+    Parameters
+    ----------
+    scale : str, optional
+        "small" (seconds, for CI) or "large" (10,000 repos, 2,000 forks per repo, 500 teams)
+    latency : float, optional
+        seconds of fake server latency per request
+    jobs : int, optional
+        worker threads of the operations that take them
+    memory : bool, optional
+        record peak memory
+    select : sequence of str, optional
+        run only benchmarks with these names
+    scripts : pathlib.Path, optional
+        directory of the Github/ scripts to benchmark, skipped if not given or missing
+
+    Results
+    -------
+    results : pandas.DataFrame
+        indexed by benchmark: seconds, calls, peak_mib, routes
+    """
+
+    if scripts is not None:
+        scripts = Path(scripts).expanduser()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as d:
+        work = Path(d)
+        oauth = work / "oauth"
+        oauth.write_text("fake-token")
+
+        # private caches, so every run starts cold
+        with environ(GITBULK_CACHE=str(work / "cache"), GITBULK_HTTP_CACHE=""):
+            for name, org, options, func in benchmarks(scale, work, oauth, jobs, scripts):
+                if select and name not in select:
+                    continue
+
+                with fakehub.serve(org, process=True, latency=latency, **options) as url:
+                    with environ(GITHUB_API_URL=url):
+                        rows.append(measure(name, url, func, memory))
+
+                r = rows[-1]
+                print(f"{name}: {r['seconds']} s  {r['calls']} calls", file=sys.stderr)
+
+    return pandas.DataFrame(rows).set_index("benchmark")
+
+
+def compare(
+    results: pandas.DataFrame, baseline: pandas.DataFrame, tolerance: float = 0.25
+) -> pandas.DataFrame:
+    """
+    compare benchmark results with a baseline run
+
+    Any increase in API calls is a regression, as calls are deterministic,
+    while time and memory regress when more than "tolerance" (fraction) above baseline.
+
+    Results
+    -------
+    comparison : pandas.DataFrame
+        per benchmark in both: ratios of seconds, calls and peak_mib, and "regression"
+    """
+
+    cols = ["seconds", "calls", "peak_mib"]
+    common = results.index.intersection(baseline.index)
+    ratio = results.loc[common, cols] / baseline.loc[common, cols].replace(0, float("nan"))
+
+    ratio["regression"] = (results.loc[common, "calls"] > baseline.loc[common, "calls"]) | (
+        ratio[["seconds", "peak_mib"]] > 1 + tolerance
+    ).any(axis=1)
+
+    return ratio
+
+
+def write_results(results: pandas.DataFrame, fn: Path) -> None:
+    fn = Path(fn).expanduser()
+    fn.parent.mkdir(parents=True, exist_ok=True)
+    fn.write_text(json.dumps(results.reset_index().to_dict(orient="records"), indent=2))
+
+
+def read_results(fn: Path) -> pandas.DataFrame:
+    return pandas.DataFrame(json.loads(Path(fn).expanduser().read_text())).set_index("benchmark")
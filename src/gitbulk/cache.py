@@ -0,0 +1,154 @@
+"""
+On-disk HTTP response cache with conditional requests.
+
+GitHub answers a request with "If-None-Match" / "If-Modified-Since" by 304 Not Modified
+when nothing changed, and 304 responses don't count against the rate limit.
+Bodies are stored zlib-compressed in SQLite, keyed by URL, Accept header and
+a hash of the Authorization header, so different tokens don't share responses.
+The least recently used responses are evicted beyond a size cap.
+"""
+
+from pathlib import Path
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import typing as T
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# headers describing the stored, already decoded body of the original response
+DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class ResponseCache:
+    """
+    session middleware caching GET responses on disk
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        SQLite database file
+    max_bytes : int, optional
+        size cap of the compressed bodies
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 256 * 2**20):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, url TEXT, headers TEXT, body BLOB, size INTEGER, atime REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_atime ON responses (atime)")
+
+    @staticmethod
+    def key(request: requests.PreparedRequest) -> str:
+        auth = request.headers.get("Authorization", "")
+        accept = request.headers.get("Accept", "")
+        return hashlib.sha256(f"{auth}\n{accept}\n{request.url}".encode()).hexdigest()
+
+    def send(self, request, send_next) -> requests.Response:
+        if request.method != "GET":
+            return send_next(request)
+
+        # conditional headers are for this attempt only, e.g. a TokenPool retries with another token
+        request = request.copy()
+        key = self.key(request)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT headers, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row:
+            headers = json.loads(row[0])
+            if etag := headers.get("etag"):
+                request.headers["If-None-Match"] = etag
+            if modified := headers.get("last-modified"):
+                request.headers["If-Modified-Since"] = modified
+
+        response = send_next(request)
+
+        if row and response.status_code == 304:
+            self.hits += 1
+            with self._lock:
+                self._db.execute("UPDATE responses SET atime = ? WHERE key = ?", (time.time(), key))
+            return self.replay(request, response, headers, zlib.decompress(row[1]))
+
+        self.misses += 1
+        if response.status_code == 200 and (
+            "etag" in response.headers or "last-modified" in response.headers
+        ):
+            self.store(key, request.url, response)
+
+        return response
+
+    def replay(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+        headers: dict[str, str],
+        body: bytes,
+    ) -> requests.Response:
+        """
+        200 response with the stored body, and the current headers e.g. rate limit of the 304 response
+        """
+
+        r = requests.Response()
+        r.status_code = 200
+        r.reason = "OK"
+        r.url = response.url
+        r.request = request
+        r.headers = CaseInsensitiveDict(headers)
+        r.headers.update(response.headers)
+        r._content = body
+        r.encoding = response.encoding or requests.utils.get_encoding_from_headers(r.headers)
+        r.elapsed = response.elapsed
+        r.connection = response.connection
+
+        return r
+
+    def store(self, key: str, url: T.Any, response: requests.Response) -> None:
+        headers = {k.lower(): v for k, v in response.headers.items() if k.lower() not in DROP_HEADERS}
+        body = zlib.compress(response.content)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, json.dumps(headers), body, len(body), time.time()),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        drop least recently used responses until 90% of size cap
+        """
+
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - 0.9 * self.max_bytes
+        dropped = 0
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY atime").fetchall():
+            if dropped >= excess:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            dropped += size
+
+        logging.info(f"HTTP cache {self.path}: evicted {dropped} bytes")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
@@ -0,0 +1,139 @@
+"""
+Record and replay the HTTP traffic of a session, to reproduce and profile runs offline.
+
+Recording stores each request's response (status, headers including rate limit and
+pagination Link, and zlib-compressed body) in a SQLite archive indexed by request.
+Replaying answers the same requests from the archive without network or tokens,
+optionally waiting as long as the recorded response took.
+
+Requests are matched by method, path with query, and a hash of the body (GraphQL queries),
+not by host or Authorization header. A request made several times, like polling
+/stats/contributors while GitHub answers 202, is replayed in recorded order;
+after the last recorded answer, that answer is repeated.
+"""
+
+from http import HTTPStatus
+from pathlib import Path
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import urllib.parse
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .cache import DROP_HEADERS
+
+
+def request_key(request: requests.PreparedRequest) -> str:
+    u = urllib.parse.urlsplit(request.url or "")
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode()
+
+    digest = hashlib.sha256(body).hexdigest()[:16] if body else ""
+    path = f"{u.path}?{u.query}" if u.query else u.path
+
+    return f"{request.method} {path} {digest}".rstrip()
+
+
+class Cassette:
+    """
+    session middleware recording responses to, or replaying them from, an archive
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        SQLite archive file
+    mode : str, optional
+        "record": send requests and store the responses, replacing an existing archive.
+        "replay": answer requests from the archive only.
+    latency : float, optional
+        with replay, wait this fraction of each response's recorded time, 1 is real time
+    """
+
+    def __init__(self, path: Path, mode: str = "replay", latency: float = 0.0):
+        if mode not in {"record", "replay"}:
+            raise ValueError(f"cassette mode must be record or replay, not {mode}")
+
+        self.path = Path(path).expanduser()
+        self.mode = mode
+        self.latency = latency
+
+        if mode == "replay" and not self.path.is_file():
+            raise FileNotFoundError(self.path)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._seq: dict[str, int] = {}
+
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        if mode == "record":
+            self._db.execute("DROP TABLE IF EXISTS responses")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT, seq INTEGER, url TEXT, status INTEGER, headers TEXT, body BLOB, "
+            "seconds REAL, PRIMARY KEY (key, seq))"
+        )
+
+    def _next(self, key: str) -> int:
+        with self._lock:
+            seq = self._seq.get(key, 0)
+            self._seq[key] = seq + 1
+        return seq
+
+    def send(self, request, send_next) -> requests.Response:
+        key = request_key(request)
+
+        if self.mode == "record":
+            tic = time.perf_counter()
+            response = send_next(request)
+            self.store(key, request.url, response, time.perf_counter() - tic)
+            return response
+
+        return self.replay(request, key)
+
+    def store(self, key: str, url: str, response: requests.Response, seconds: float) -> None:
+        headers = {k.lower(): v for k, v in response.headers.items() if k.lower() not in DROP_HEADERS}
+        body = zlib.compress(response.content or b"")
+
+        seq = self._next(key)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, seq, url, response.status_code, json.dumps(headers), body, seconds),
+            )
+
+    def replay(self, request: requests.PreparedRequest, key: str) -> requests.Response:
+        seq = self._next(key)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, seconds FROM responses "
+                "WHERE key = ? AND seq <= ? ORDER BY seq DESC LIMIT 1",
+                (key, seq),
+            ).fetchone()
+
+        if row is None:
+            raise KeyError(f"{key} not recorded in {self.path}")
+
+        status, headers, body, seconds = row
+        if self.latency:
+            time.sleep(seconds * self.latency)
+
+        r = requests.Response()
+        r.status_code = status
+        r.reason = HTTPStatus(status).phrase
+        r.url = request.url or ""
+        r.request = request
+        r.headers = CaseInsensitiveDict(json.loads(headers))
+        r._content = zlib.decompress(body)
+        r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+
+        return r
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
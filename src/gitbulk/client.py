@@ -0,0 +1,197 @@
+"""
+GitHub session whose HTTP requests pass through gitbulk middleware,
+e.g. the on-disk response cache.
+
+A middleware is any object with a method
+
+    send(request: requests.PreparedRequest, send_next) -> requests.Response
+
+that may modify the request, call send_next(request) zero or more times,
+and return a response.
+Middleware run in list order, the last one closest to the network.
+
+PyGithub hands its retry object to every HTTP connection it makes,
+including those of the Requester copies behind lazy objects,
+so the middleware list travels with the retry object to reach them all.
+Only Session requesters and their copies use the middleware connection classes;
+other github.Github instances in the process are left as they are.
+"""
+
+import contextlib
+import threading
+import typing as T
+
+import github
+import github.MainClass
+import requests
+import requests.adapters
+from github.GithubRetry import GithubRetry
+from github.Requester import HTTPRequestsConnectionClass, HTTPSRequestsConnectionClass, Requester
+
+
+class Middleware(T.Protocol):
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        send_next: T.Callable[[requests.PreparedRequest], requests.Response],
+    ) -> requests.Response: ...
+
+
+class SessionRetry(GithubRetry):
+    """
+    GithubRetry that carries the session middleware to the connections
+    """
+
+    middleware: list[Middleware]
+
+    def new(self, **kw: T.Any) -> T.Any:
+        r = super().new(**kw)
+        r.middleware = self.middleware
+        return r
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        # leave rate limit responses to the middleware that handles them
+        if status_code in {403, 429} and any(
+            getattr(m, "handles_rate_limit", False) for m in self.middleware
+        ):
+            return False
+
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class Transport(requests.adapters.HTTPAdapter):
+    """
+    requests adapter running each request through the middleware
+    """
+
+    def __init__(self, middleware: list[Middleware], **kwargs):
+        super().__init__(**kwargs)
+        self.middleware = middleware
+
+    def send(self, request, **kwargs) -> requests.Response:  # type: ignore[override]
+        def send_at(i: int, req: requests.PreparedRequest) -> requests.Response:
+            if i == len(self.middleware):
+                return super(Transport, self).send(req, **kwargs)
+
+            return self.middleware[i].send(req, lambda r: send_at(i + 1, r))
+
+        return send_at(0, request)
+
+
+class _MiddlewareConnection:
+    """
+    mounts a Transport on PyGithub's requests.Session when the retry object carries middleware
+    """
+
+    retry: T.Any
+    pool_size: int
+    protocol: str
+    session: requests.Session
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if (middleware := getattr(self.retry, "middleware", None)) is not None:
+            self.adapter = Transport(
+                middleware,
+                max_retries=self.retry,
+                pool_connections=self.pool_size,
+                pool_maxsize=self.pool_size,
+            )
+            self.session.mount(f"{self.protocol}://", self.adapter)
+
+
+class HTTPSConnection(_MiddlewareConnection, HTTPSRequestsConnectionClass):
+    pass
+
+
+class HTTPConnection(_MiddlewareConnection, HTTPRequestsConnectionClass):
+    pass
+
+
+# PyGithub picks the connection classes class-wide, when a Requester is made
+_making = threading.RLock()
+
+
+@contextlib.contextmanager
+def _connection_classes() -> T.Iterator[None]:
+    """
+    install the middleware connection classes while a session requester is made.
+
+    Resetting afterwards also turns PyGithub's reuse of connections back on,
+    which injecting turns off for its test recorder.
+    A plain Requester made meanwhile by another thread behaves exactly as PyGithub's own,
+    as connections without middleware don't mount a Transport.
+    """
+    with _making:
+        Requester.injectConnectionClasses(HTTPConnection, HTTPSConnection)  # type: ignore[arg-type]
+        try:
+            yield
+        finally:
+            Requester.resetConnectionClasses()
+
+
+class SessionRequester(Requester):
+    """
+    Requester with the middleware connection classes, as are its lazy and other copies
+    """
+
+    def __init__(self, *args, **kwargs):
+        with _connection_classes():
+            super().__init__(*args, **kwargs)
+
+    def _copy(self, r: Requester) -> Requester:
+        return r if r is self else SessionRequester(**r.kwargs)
+
+    def withAuth(self, auth: T.Any) -> Requester:
+        return self._copy(super().withAuth(auth))
+
+    def withLazy(self, lazy: T.Any) -> Requester:
+        return self._copy(super().withLazy(lazy))
+
+    def withApiVersion(self, api_version: str | None) -> Requester:
+        return self._copy(super().withApiVersion(api_version))
+
+
+class Session(github.Github):
+    """
+    github.Github session with gitbulk middleware on its HTTP requests
+
+    Parameters
+    ----------
+    auth : github.Auth.Auth, optional
+        authentication
+    middleware : list, optional
+        middleware to run each request through, first is outermost
+    kwargs :
+        passed to github.Github
+    """
+
+    def __init__(
+        self,
+        auth: github.Auth.Auth | None = None,
+        middleware: T.Sequence[Middleware] = (),
+        **kwargs,
+    ):
+        self.middleware: list[Middleware] = list(middleware)
+
+        retry = SessionRetry()
+        retry.middleware = self.middleware
+
+        # github.Github makes its Requester by this module name
+        with _making:
+            github.MainClass.Requester = SessionRequester  # type: ignore[misc]
+            try:
+                super().__init__(auth=auth, retry=retry, **kwargs)
+            finally:
+                github.MainClass.Requester = Requester  # type: ignore[misc]
+
+    def find_middleware(self, kind: type) -> T.Any:
+        """
+        the session middleware of a given type, or None
+        """
+        for m in self.middleware:
+            if isinstance(m, kind):
+                return m
+
+        return None
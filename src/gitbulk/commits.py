@@ -0,0 +1,248 @@
+"""
+Commit statistics from local git instead of one REST request per commit.
+
+For each repo, additions and deletions per commit come from git log --numstat
+on a local bare clone: either an existing mirror from gitbulk.mirror,
+or a clone kept under cache_dir()/clones and fetched incrementally.
+A full clone is used because --numstat diffs every blob, which a blobless clone
+would fetch lazily one at a time.
+
+Results per repo are cached under cache_dir()/commits keyed by the HEAD commit,
+so re-runs only fetch and process repos with new commits.
+
+commit_table() collects commits of many repos into one columnar DataFrame,
+saved as Parquet (requires pyarrow) for slicing later without re-fetching,
+and rollup() sums it per author, repo and period with pandas groupby.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import json
+import logging
+import subprocess
+import typing as T
+
+import pandas
+
+from .base import cache_dir
+from .duplicator import git
+from .mirror import URL, update_mirror, mirror_path
+
+COLUMNS = ["repo", "sha", "author", "email", "time", "additions", "deletions"]
+
+# git log record: NUL, then header fields separated by unit separator
+LOG_FORMAT = "%x00%H%x1f%aN%x1f%aE%x1f%aI"
+
+
+def parse_log(out: str) -> list[dict[str, T.Any]]:
+    """
+    commits from git log --numstat --format=LOG_FORMAT
+
+    Binary files count as no lines changed.
+    """
+
+    commits = []
+    for record in out.split("\0")[1:]:
+        header, *lines = record.splitlines()
+        sha, author, email, time = header.split("\x1f")
+        additions = deletions = 0
+        for line in lines:
+            if not line:
+                continue
+            a, d, _ = line.split("\t", 2)
+            if a != "-":
+                additions += int(a)
+                deletions += int(d)
+        commits.append(
+            {
+                "sha": sha,
+                "author": author,
+                "email": email,
+                "time": time,
+                "additions": additions,
+                "deletions": deletions,
+            }
+        )
+
+    return commits
+
+
+def _head(url: str, path: Path | None) -> str:
+    """
+    HEAD commit of a local mirror, else of the remote
+    """
+    if path:
+        try:
+            return git(["rev-parse", "HEAD"], cwd=path).strip()
+        except subprocess.CalledProcessError:
+            return ""
+
+    out = git(["ls-remote", url, "HEAD"]).split()
+    return out[0] if out else ""
+
+
+def repo_commits(
+    full_name: str,
+    url: str = URL,
+    mirrors: Path | None = None,
+    cache: Path | None = None,
+) -> list[dict[str, T.Any]]:
+    """
+    non-merge commits of a repo's default branch, with lines added and deleted
+
+    Parameters
+    ----------
+    full_name : str
+        owner/name
+    url : str, optional
+        clone URL template, formatted with owner/name
+    mirrors : pathlib.Path, optional
+        root of existing mirrors from gitbulk.mirror.sync_mirrors, used as-is
+    cache : pathlib.Path, optional
+        directory of cached results and clones, default under cache_dir()
+
+    Results
+    -------
+    commits : list of dict
+        sha, author, email, time (ISO 8601), additions, deletions. Empty for an empty repo.
+    """
+
+    cache = Path(cache).expanduser() if cache else cache_dir()
+    mirror = mirror_path(mirrors, full_name) if mirrors else None
+    fn = cache / "commits" / f"{full_name}.json"
+
+    if not (head := _head(url.format(full_name), mirror)):
+        return []
+
+    if fn.is_file() and (cached := json.loads(fn.read_text()))["head"] == head:
+        return cached["commits"]
+
+    path = mirror or mirror_path(cache / "clones", full_name)
+    if not mirror:
+        update_mirror(url.format(full_name), path)
+
+    log = git(["log", "--no-merges", "--numstat", f"--format={LOG_FORMAT}", head], cwd=path)
+    commits = parse_log(log)
+
+    fn.parent.mkdir(parents=True, exist_ok=True)
+    fn.write_text(json.dumps({"head": head, "commits": commits}))
+
+    return commits
+
+
+def commit_stats(
+    repos: T.Iterable[str],
+    workers: int = 8,
+    url: str = URL,
+    mirrors: Path | None = None,
+    cache: Path | None = None,
+) -> T.Iterator[tuple[str, list[dict[str, T.Any]]]]:
+    """
+    repo_commits() of many repos, with git run concurrently.
+    Yields each repo as it completes; repos that fail are logged and skipped.
+
+    Parameters
+    ----------
+    repos : iterable of str
+        owner/name of repos
+    workers : int, optional
+        git processes run concurrently
+    """
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(repo_commits, r, url, mirrors, cache): r for r in repos}
+        for f in as_completed(futures):
+            try:
+                yield futures[f], f.result()
+            except subprocess.CalledProcessError as e:
+                logging.error(f"{futures[f]}: {(e.stderr or str(e)).strip()}")
+
+
+def commit_table(stats: T.Iterable[tuple[str, list[dict[str, T.Any]]]]) -> pandas.DataFrame:
+    """
+    columnar table of commits of many repos
+
+    Parameters
+    ----------
+    stats : iterable of tuple of str, list of dict
+        repo and its commits, as from commit_stats()
+
+    Results
+    -------
+    table : pandas.DataFrame
+        one row per commit: repo, sha, author, email, time (UTC), additions, deletions
+    """
+
+    records = [dict(c, repo=repo) for repo, commits in stats for c in commits]
+    table = pandas.DataFrame.from_records(records, columns=COLUMNS)
+
+    table["time"] = pandas.to_datetime(table["time"], utc=True)
+
+    return table.astype(
+        {
+            "repo": "category",
+            "author": "category",
+            "email": "category",
+            "additions": "int64",
+            "deletions": "int64",
+        }
+    )
+
+
+def rollup(
+    table: pandas.DataFrame,
+    by: T.Sequence[str] = ("author",),
+    freq: str | None = "W",
+    value: str = "lines",
+) -> pandas.Series:
+    """
+    sum commit activity per group and period
+
+    Parameters
+    ----------
+    table : pandas.DataFrame
+        from commit_table() or repo_stats.contributor_stats()
+    by : sequence of str, optional
+        columns to group by, such as author, repo, email
+    freq : str, optional
+        pandas period like "D", "W", "MS". None: totals over all time.
+    value : str, optional
+        "lines" (added + deleted), "additions", "deletions" or "commits"
+
+    Results
+    -------
+    activity : pandas.Series
+        indexed by time period (unless freq is None) and the by columns.
+        Use .unstack() for a table with one column per group.
+    """
+
+    t = table.assign(lines=table["additions"] + table["deletions"])
+    if "commits" not in t:
+        # one row per commit, unlike weekly tables such as repo_stats.contributor_stats()
+        t["commits"] = 1
+
+    keys: list[T.Any] = list(by)
+    if freq:
+        keys.insert(0, pandas.Grouper(key="time", freq=freq))
+
+    return t.groupby(keys, observed=True)[value].sum()
+
+
+def write_table(table: pandas.DataFrame, fn: Path) -> None:
+    """
+    save commit table: .parquet requires pyarrow, other suffixes are pickled
+    """
+    fn = Path(fn).expanduser()
+    fn.parent.mkdir(parents=True, exist_ok=True)
+
+    if fn.suffix == ".parquet":
+        table.to_parquet(fn, index=False)
+    else:
+        table.to_pickle(fn)
+
+
+def read_table(fn: Path) -> pandas.DataFrame:
+    fn = Path(fn).expanduser()
+    if fn.suffix == ".parquet":
+        return pandas.read_parquet(fn)
+    return pandas.read_pickle(fn)
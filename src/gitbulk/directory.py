@@ -0,0 +1,97 @@
+"""
+Memoized directory of an organization's teams and repos.
+
+team_exists() lists all teams and repo_exists() makes a request on each call,
+which adds up when called once per spreadsheet row.
+OrgDirectory lists teams and repos once, answers existence checks from sets,
+and records teams and repos created through it.
+GitHub team and repo names are case-insensitive, so lookups are too.
+"""
+
+import time
+import typing as T
+
+import github
+
+
+class OrgDirectory:
+    """
+    teams and repos of a user or organization, loaded once
+
+    Parameters
+    ----------
+    op : github.Organization.Organization or github.AuthenticatedUser.AuthenticatedUser
+        organization or user handle
+    ttl : float, optional
+        seconds after which the directory is reloaded. None: never expires.
+    """
+
+    def __init__(self, op: T.Any, ttl: float | None = 600.0):
+        self.op = op
+        self.ttl = ttl
+
+        self.teams: dict[str, github.Team.Team] = {}
+        self.repos: dict[str, github.Repository.Repository] = {}
+        self.loaded = 0.0
+
+    def refresh(self) -> None:
+        """
+        reload teams and repos from GitHub
+        """
+
+        if isinstance(self.op, github.Organization.Organization):
+            self.teams = {t.name.casefold(): t for t in self.op.get_teams()}
+        self.repos = {r.name.casefold(): r for r in self.op.get_repos()}
+        self.loaded = time.monotonic()
+
+    def _current(self) -> None:
+        if not self.loaded or (self.ttl is not None and time.monotonic() - self.loaded > self.ttl):
+            self.refresh()
+
+    def has_team(self, name: str) -> bool:
+        self._current()
+        return name.casefold() in self.teams
+
+    def has_repo(self, name: str) -> bool:
+        self._current()
+        return name.casefold() in self.repos
+
+    def team(self, name: str) -> github.Team.Team:
+        """
+        Team handle by name, without a request
+
+        Raises
+        ------
+        KeyError
+            if the team doesn't exist
+        """
+        self._current()
+        return self.teams[name.casefold()]
+
+    def repo(self, name: str) -> github.Repository.Repository:
+        """
+        Repository handle by name, without a request
+
+        Raises
+        ------
+        KeyError
+            if the repo doesn't exist
+        """
+        self._current()
+        return self.repos[name.casefold()]
+
+    def create_team(self, name: str, *args, **kwargs) -> github.Team.Team:
+        """
+        create team, arguments as github.Organization.Organization.create_team
+        """
+        team = self.op.create_team(name, *args, **kwargs)
+        self.teams[name.casefold()] = team
+        return team
+
+    def create_repo(self, name: str, **kwargs) -> github.Repository.Repository:
+        """
+        create repo, arguments as github.Organization.Organization.create_repo
+        """
+        repo = self.op.create_repo(name=name, **kwargs)
+        self.repos[name.casefold()] = repo
+        return repo
@@ -1,14 +1,22 @@
-from time import sleep
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+import contextlib
 import subprocess
 import logging
 import tempfile
+import threading
+import time
 from datetime import datetime
 import webbrowser
 import shutil
 import functools
+import typing as T
+
+import github
+import pandas
 
 from .base import connect, check_api_limit, last_commit_date, repo_exists
+from .directory import OrgDirectory
 
 
 @functools.cache
@@ -22,10 +30,37 @@ def git_exe() -> str:
     return git
 
 
-def repo_dupe(repos: dict[str, str], oauth: Path, orgname: str | None = None, stem: str = ""):
+def git(args: list[str], cwd: Path | None = None) -> str:
+    """
+    run git quietly, so concurrent runs don't interleave output
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        with git's stderr
+    """
+    return subprocess.run(
+        [git_exe()] + args, cwd=cwd, capture_output=True, text=True, check=True
+    ).stdout
+
+
+def repo_dupe(
+    repos: dict[str, str],
+    oauth: Path,
+    orgname: str | None = None,
+    stem: str = "",
+    workers: int = 4,
+    api_workers: int = 2,
+    refdiff: bool = False,
+    fanout: bool = False,
+) -> pandas.DataFrame:
     """
     Duplicate GitHub repos AND their wikis
 
+    Rows are processed concurrently: git clone and push run on a pool of workers,
+    while GitHub API calls are limited to api_workers at once.
+    Progress is printed as each row completes.
+
     Parameters
     ----------
     repos: dict of str, str
@@ -36,29 +71,285 @@ def repo_dupe(repos: dict[str, str], oauth: Path, orgname: str | None = None, st
         create repos under Organization instead of username
     stem: str
         what to start new repo name with
+    workers: int, optional
+        rows duplicated concurrently
+    api_workers: int, optional
+        GitHub API calls made concurrently
+    refdiff: bool, optional
+        compare source and destination refs with git ls-remote instead of push times,
+        skipping unchanged repos without cloning and transferring only the refs that differ
+    fanout: bool, optional
+        clone each distinct source once and push it to all its destinations, see fan_out()
+
+    Results
+    -------
+    results: pandas.DataFrame
+        per row: source, dest, repo and wiki outcome, error, seconds
     """
     # %% authenticate
     op, sess = connect(oauth, orgname)
+    check_api_limit(sess)
 
     username = op.login
+    api = threading.Semaphore(api_workers)
+
+    if fanout:
+        results = fan_out(repos, op, sess, stem, workers, api, refdiff)
+        return pandas.DataFrame.from_dict(results, orient="index").rename_axis("email")
 
-    # %% prepare to loop over repos
-    for email, oldurl in repos.items():
-        check_api_limit(sess)
+    def dupe(email: str, oldurl: str) -> dict[str, T.Any]:
+        tic = time.monotonic()
 
         oldurl = oldurl.replace("https", "ssh")
         oldname = "/".join(oldurl.split("/")[-2:]).split(".")[0]
+        mirrorname = stem + email
 
-        oldtime = last_commit_date(sess, oldname)
-        if oldtime is None:
-            continue
+        row: dict[str, T.Any] = {
+            "source": oldname,
+            "dest": f"{username}/{mirrorname}",
+            "repo": "",
+            "wiki": "",
+            "error": "",
+        }
+        try:
+            if refdiff:
+                row["repo"] = gitdupe(oldurl, None, username, mirrorname, op, api=api, refdiff=True)
+            else:
+                with api:
+                    oldtime = last_commit_date(sess, oldname)
+                if oldtime is None:
+                    row["repo"] = "empty"
+                else:
+                    row["repo"] = gitdupe(oldurl, oldtime, username, mirrorname, op, api=api)
 
-        mirrorname = stem + email
+            if row["repo"] != "empty":
+                row["wiki"] = gitdupe(
+                    oldurl, None, username, mirrorname, op, iswiki=True, api=api, refdiff=refdiff
+                )
+        except Exception as e:
+            # e.g. OSError from git or the filesystem: recorded, the other repos go on
+            row["error"] = _error(e)
+
+        row["seconds"] = round(time.monotonic() - tic, 1)
+        return row
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(dupe, email, url): email for email, url in repos.items()}
+        for i, f in enumerate(as_completed(futures), start=1):
+            email = futures[f]
+            results[email] = f.result()
+            _progress(i, len(futures), email, results[email])
+
+    return pandas.DataFrame.from_dict(
+        {email: results[email] for email in repos}, orient="index"
+    ).rename_axis("email")
+
+
+def _error(e: Exception) -> str:
+    if isinstance(e, subprocess.CalledProcessError):
+        return (e.stderr or str(e)).strip().splitlines()[-1]
+    return str(e)
+
+
+def _progress(i: int, n: int, email: str, row: dict[str, T.Any]) -> None:
+    print(f"{i}/{n} {email} {row['source']}: {row['repo']} {row['wiki']} {row['error']}")
+
+
+def fan_out(
+    repos: dict[str, str],
+    op,
+    sess: github.Github,
+    stem: str = "",
+    workers: int = 4,
+    api: T.ContextManager | None = None,
+    refdiff: bool = False,
+) -> dict[str, dict[str, T.Any]]:
+    """
+    Duplicate repos and wikis where many rows share a source, as for a class template.
+
+    1. one push time lookup per distinct source,
+       or with refdiff, one listing of the refs of each source and its destinations
+    2. all missing destination repos are created up front, from one listing of existing repos
+    3. each distinct source and its wiki are bare-cloned once, unless all its destinations
+       are already current
+    4. each clone is pushed to all its destinations in parallel
+
+    Clone traffic scales with the number of distinct sources rather than rows.
+
+    Parameters
+    ----------
+    repos: dict of str, str
+        GitHub username, reponame to duplicate
+    op: github.Organization.Organization or github.AuthenticatedUser.AuthenticatedUser
+        owner of the new repos
+    sess: github.Github
+        GitHub session
+    stem: str
+        what to start new repo name with
+    workers: int, optional
+        git clones and pushes run concurrently
+    api: context manager, optional
+        held around GitHub API calls, to limit their concurrency
+    refdiff: bool, optional
+        update only the refs that differ, see sync_refs()
+
+    Results
+    -------
+    results: dict of str, dict
+        per row: source, dest, repo and wiki outcome, error, seconds
+    """
+    api = api or contextlib.nullcontext()
+    username = op.login
+
+    rows: dict[str, dict[str, T.Any]] = {}
+    sources: dict[str, list[str]] = {}
+    for email, url in repos.items():
+        oldurl = url.replace("https", "ssh")
+        rows[email] = {
+            "source": "/".join(oldurl.split("/")[-2:]).split(".")[0],
+            "dest": f"{username}/{stem}{email}",
+            "repo": "",
+            "wiki": "",
+            "error": "",
+            "seconds": 0.0,
+        }
+        sources.setdefault(oldurl, []).append(email)
+
+    directory = OrgDirectory(op, ttl=None)
+    with api:
+        directory.refresh()
+    created: set[str] = set()
+
+    def source_time(oldurl: str) -> datetime | None:
+        with api:
+            return last_commit_date(sess, rows[sources[oldurl][0]]["source"])
+
+    def listed(url: str) -> dict[str, str] | None:
+        try:
+            return ls_remote(url)
+        except subprocess.CalledProcessError:
+            return None
+
+    def current(oldurl: str) -> None:
+        """
+        refdiff: mark the destinations that already have the source's refs, without cloning
+        """
+        emails = sources[oldurl]
+        try:
+            src = ls_remote(oldurl)
+        except subprocess.CalledProcessError as e:
+            for email in emails:
+                rows[email]["error"] = _error(e)
+            return
+        if not src:
+            for email in emails:
+                rows[email]["repo"] = "empty"
+            return
+
+        wiki = listed(oldurl + ".wiki.git")
+        for email in emails:
+            newurl = f"ssh://github.com/{username}/{stem}{email}"
+            if listed(newurl) == src and (wiki is None or listed(newurl + ".wiki.git") == wiki):
+                rows[email]["repo"] = "up to date"
+                rows[email]["wiki"] = "up to date" if wiki is not None else "no wiki"
+
+    def create(email: str) -> None:
+        name = stem + email
+        if directory.has_repo(name):
+            return
+        try:
+            with api:
+                directory.create_repo(name, private=True, has_wiki=True)
+            created.add(email)
+        except github.GithubException as e:
+            rows[email]["error"] = _error(e)
+
+    def clone(oldurl: str, d: Path) -> tuple[Path | None, Path | None]:
+        repo = d / "repo.git"
+        wiki = d / "wiki.git"
+        try:
+            git(["clone", "--bare", "--quiet", oldurl, str(repo)])
+        except subprocess.CalledProcessError as e:
+            for email in sources[oldurl]:
+                rows[email]["error"] = _error(e)
+            return None, None
+        try:
+            git(["clone", "--bare", "--quiet", oldurl + ".wiki.git", str(wiki)])
+        except subprocess.CalledProcessError:
+            logging.info(f"{oldurl} has no Wiki")
+            return repo, None
+        return repo, wiki
+
+    def push(email: str, oldtime: datetime | None, repo: Path, wiki: Path | None) -> None:
+        tic = time.monotonic()
+        row = rows[email]
+        newurl = f"ssh://github.com/{username}/{stem}{email}"
+        try:
+            if refdiff and (status := sync_refs(str(repo), newurl)):
+                row["repo"] = status
+            elif (
+                not refdiff
+                and email not in created
+                and oldtime is not None
+                and directory.repo(stem + email).pushed_at >= oldtime
+            ):
+                row["repo"] = "up to date"
+            else:
+                git(["push", "--mirror", "--quiet", newurl], cwd=repo)
+                row["repo"] = "duplicated"
+
+            if wiki is None:
+                row["wiki"] = "no wiki"
+            else:
+                newwiki = newurl + ".wiki.git"
+                if refdiff and (status := sync_refs(str(wiki), newwiki)):
+                    row["wiki"] = status
+                elif not refdiff and remote_exists(newwiki):
+                    row["wiki"] = "up to date"
+                else:
+                    open_wiki(newwiki)
+                    git(["push", "--force", "--all", newwiki], cwd=wiki)
+                    row["wiki"] = "duplicated"
+        except (subprocess.CalledProcessError, github.GithubException) as e:
+            row["error"] = _error(e)
+        row["seconds"] = round(time.monotonic() - tic, 1)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool, tempfile.TemporaryDirectory() as d:
+        if refdiff:
+            times: dict[str, datetime | None] = {}
+            list(pool.map(current, sources))
+        else:
+            times = dict(zip(sources, pool.map(source_time, sources)))
+            for oldurl, t in times.items():
+                if t is None:
+                    for email in sources[oldurl]:
+                        rows[email]["repo"] = "empty"
+
+        # empty sources and current destinations are done, so are not cloned
+        sources = {
+            u: pending
+            for u, emails in sources.items()
+            if (pending := [e for e in emails if not rows[e]["repo"] and not rows[e]["error"]])
+        }
+
+        list(pool.map(create, [e for emails in sources.values() for e in emails]))
 
-        gitdupe(oldurl, oldtime, username, mirrorname, op)
-        gitdupe(oldurl, None, username, mirrorname, op, iswiki=True)
+        dirs = [Path(d) / str(i) for i in range(len(sources))]
+        clones = dict(zip(sources, pool.map(clone, sources, dirs)))
 
-        sleep(0.1)
+        futures = {
+            pool.submit(push, email, times.get(oldurl), repo, wiki): email
+            for oldurl, (repo, wiki) in clones.items()
+            if repo
+            for email in sources[oldurl]
+            if not rows[email]["error"]
+        }
+        for i, f in enumerate(as_completed(futures), start=1):
+            f.result()
+            _progress(i, len(futures), futures[f], rows[futures[f]])
+
+    return rows
 
 
 def gitdupe(
@@ -68,50 +359,68 @@ def gitdupe(
     mirrorname: str,
     op,
     iswiki: bool = False,
-):
+    api: T.ContextManager | None = None,
+    refdiff: bool = False,
+) -> str:
+    """
+    duplicate one repo or its wiki
+
+    Parameters
+    ----------
+    api: context manager, optional
+        held around GitHub API calls, to limit their concurrency
+    refdiff: bool, optional
+        if the destination exists, update only the refs that differ, see sync_refs()
+
+    Results
+    -------
+    status: str
+        "no wiki", "empty", "up to date", "updated N refs" or "duplicated"
+    """
+    api = api or contextlib.nullcontext()
+
     if iswiki:
         oldurl += ".wiki.git"
         mirrorname += ".wiki.git"
         try:
-            subprocess.check_call(
-                [git_exe(), "ls-remote", "--exit-code", oldurl], stdout=subprocess.DEVNULL
-            )
+            git(["ls-remote", "--exit-code", oldurl])
         except subprocess.CalledProcessError:
-            logging.error(f"{oldurl} has no Wiki")
-            return
+            logging.info(f"{oldurl} has no Wiki")
+            return "no wiki"
 
     newname = f"{username}/{mirrorname}"
     newurl = f"ssh://github.com/{newname}"
 
+    if refdiff and (status := sync_refs(oldurl, newurl)):
+        return status
+    # otherwise the destination doesn't exist yet
+
     if not iswiki:
-        exists = repo_exists(op, mirrorname)
-        if exists:
-            newrepo = op.get_repo(mirrorname)
-            if newrepo.pushed_at >= oldtime:
-                return
+        with api:
+            exists = repo_exists(op, mirrorname)
+            if exists and oldtime is not None:
+                newrepo = op.get_repo(mirrorname)
+                if newrepo.pushed_at >= oldtime:
+                    return "up to date"
 
     else:
         try:
-            subprocess.check_call(
-                [git_exe(), "ls-remote", "--exit-code", newurl],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-            return
+            git(["ls-remote", "--exit-code", newurl])
+            return "up to date"
         except subprocess.CalledProcessError:
             exists = True
 
-    print("\n", oldurl, "\n")
+    logging.info(f"duplicating {oldurl}")
 
     with tempfile.TemporaryDirectory() as d:
         tmprepo = Path(d)
         # 1. bare clone
-        cmd = [git_exe(), "clone", oldurl] if iswiki else ["git", "clone", "--bare", oldurl]
-        subprocess.check_call(cmd, stdout=subprocess.DEVNULL, cwd=tmprepo)
+        git(["clone", oldurl] if iswiki else ["clone", "--bare", oldurl], cwd=tmprepo)
 
         # 2. create new repo
         if not exists:
-            op.create_repo(name=mirrorname, private=True, has_wiki=True)
+            with api:
+                op.create_repo(name=mirrorname, private=True, has_wiki=True)
 
         # 3. mirror to new repo
 
@@ -121,23 +430,101 @@ def gitdupe(
             pwd = tmprepo / (oldurl.split("/")[-1])
             pwd = pwd.with_suffix(".git")
 
-            cmd = [git_exe(), "push", "--mirror", newurl]
-            subprocess.check_call(cmd, cwd=pwd)
+            git(["push", "--mirror", newurl], cwd=pwd)
+
+    return "duplicated"
 
 
-def dupewiki(prepo: Path, oldurl: str, newurl: str):
+def ls_remote(url: str) -> dict[str, str]:
     """
-    Note: GitLab API has Wiki included, but at this time, GitHub API does not cover Wiki
+    branch and tag refs of a remote repo, without cloning
+
+    Results
+    -------
+    refs: dict of str, str
+        ref name: commit SHA
+    """
+    refs = {}
+    for line in git(["ls-remote", "--heads", "--tags", url]).splitlines():
+        sha, ref = line.split("\t")
+        if not ref.endswith("^{}"):
+            refs[ref] = sha
+
+    return refs
+
+
+def sync_refs(oldurl: str, newurl: str) -> str | None:
+    """
+    make the destination's branches and tags match the source's,
+    transferring only the refs that differ.
+
+    Results
+    -------
+    status: str or None
+        "empty" if the source has no refs, "up to date" or "updated N refs".
+        None if the destination can't be listed, that is, it doesn't exist yet.
+    """
+    if not (src := ls_remote(oldurl)):
+        return "empty"
+
+    try:
+        dst = ls_remote(newurl)
+    except subprocess.CalledProcessError:
+        return None
+
+    changed = [ref for ref, sha in src.items() if dst.get(ref) != sha]
+    deleted = [ref for ref in dst if ref not in src]
+    if not changed and not deleted:
+        return "up to date"
+
+    logging.info(f"{oldurl}: updating {len(changed)} refs, deleting {len(deleted)}")
+
+    with tempfile.TemporaryDirectory() as d:
+        git(["init", "--bare", "--quiet", d])
+        if changed:
+            git(["fetch", "--no-tags", oldurl] + [f"+{ref}:{ref}" for ref in changed], cwd=Path(d))
+        git(
+            ["push", "--force", newurl]
+            + [f"{ref}:{ref}" for ref in changed]
+            + [f":{ref}" for ref in deleted],
+            cwd=Path(d),
+        )
+
+    return f"updated {len(changed) + len(deleted)} refs"
+
+
+def dupewiki(prepo: Path, oldurl: str, newurl: str, timeout: float = 10.0):
+    """
+    Note: GitLab API has Wiki included, but at this time, GitHub API does not cover Wiki.
+    A GitHub wiki repo exists only once its first page is made in the browser,
+    so this waits up to timeout seconds for it before pushing.
     """
     pwd = prepo / (oldurl.split("/")[-1]).split(".git")[0]
 
-    subprocess.check_call(
-        [git_exe(), "remote", "set-url", "origin", newurl], cwd=pwd, stdout=subprocess.DEVNULL
-    )
+    git(["remote", "set-url", "origin", newurl], cwd=pwd)
+
+    open_wiki(newurl, timeout)
 
+    git(["push", "-f"], cwd=pwd)
+
+
+def remote_exists(url: str) -> bool:
+    try:
+        git(["ls-remote", "--exit-code", url])
+    except subprocess.CalledProcessError:
+        return False
+    return True
+
+
+def open_wiki(newurl: str, timeout: float = 10.0) -> None:
+    """
+    open the new wiki in the browser to make its first page,
+    and wait up to timeout seconds for the wiki repo to exist
+    """
     browseurl = newurl
     browseurl = browseurl.replace("ssh", "https").replace(".wiki.git", "/wiki")
     webbrowser.open_new_tab(browseurl)
-    sleep(10.0)  # TODO: use suprocess.run() instead of webbrowser
 
-    subprocess.check_call([git_exe(), "push", "-f"], cwd=pwd)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and not remote_exists(newurl):
+        time.sleep(1.0)
@@ -0,0 +1,829 @@
+"""
+Offline fake GitHub REST and GraphQL API, for tests and benchmarks.
+
+An organization of any size is synthesized on demand from its index numbers,
+so 10,000 repos with 2,000 forks each cost no memory until listed,
+and only created repos, teams and memberships are stored.
+Responses carry GitHub's pagination Link and rate limit headers,
+with optional latency per request and an exhaustible rate limit.
+
+Synthesized organization, for FakeOrg(login="fakeorg", stem="repo", ...):
+
+* repos repo00000, repo00001, ... with default branch "main".
+  Every 10th is archived, every 4th has no license, every 5th is in no team.
+* forks user0/repo00000, user1/repo00000, ... of each repo, ahead by 0-3 commits
+* teams team0, team1, ...: repo i is in team i % teams, user m is in team m % teams
+* users user0, user1, ...: the first "members" are organization members.
+  Any login of that form exists, as do "admin" (the authenticated user) and the organization.
+
+With git_root, created repos are also bare git repos git_root/owner/name,
+for git remotes rewritten with url.<git_root>/.insteadOf=ssh://github.com/
+
+The requests per route template, like "GET /repos/{owner}/{repo}/forks",
+are returned by calls() and cleared by reset().
+
+    with serve(FakeOrg(repos=10_000)) as url:
+        sess = gitbulk.session(oauth, base_url=url)
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import re
+import subprocess
+import threading
+import time
+import typing as T
+import urllib.parse
+import urllib.request
+
+EPOCH = "2024-01-01T00:00:00Z"
+LICENSES = ["MIT", "Apache-2.0", "BSD-3-Clause"]
+LANGUAGES = ["Python", "C", "Fortran", "Julia", "Matlab"]
+
+Response = tuple[int, T.Any, dict[str, str]]
+
+
+@dataclass
+class FakeOrg:
+    """
+    size of the synthesized organization
+    """
+
+    login: str = "fakeorg"
+    stem: str = "repo"
+    repos: int = 100
+    forks: int = 0  # per repo
+    teams: int = 10
+    members: int = 100
+    collaborators: int = 2  # outside collaborators per repo
+
+
+@dataclass
+class Request:
+    base: str
+    params: dict[str, str]
+    query: dict[str, str]
+    body: T.Any
+
+
+def _sha(*parts: T.Any) -> str:
+    return hashlib.sha1("/".join(map(str, parts)).encode()).hexdigest()
+
+
+def _route(template: str) -> re.Pattern:
+    """
+    regex of a route template: {name} matches one path segment, {+name} the rest of the path
+    """
+    pat = re.sub(r"\{\+(\w+)\}", r"(?P<\1>.*)", template)
+    pat = re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pat)
+    return re.compile(pat + "$")
+
+
+class FakeGitHub:
+    """
+    state and request handlers of the fake API
+
+    Parameters
+    ----------
+    org : FakeOrg
+        organization to synthesize
+    latency : float, optional
+        seconds to wait before each response
+    rate_limit : int, optional
+        requests per rate limit window, counted separately for REST and GraphQL
+    window : float, optional
+        seconds until the rate limit resets
+    git_root : pathlib.Path, optional
+        directory to make bare git repos of created repos in
+    """
+
+    ROUTES = [
+        ("GET", "/rate_limit", "rate_limit"),
+        ("GET", "/user", "auth_user"),
+        ("GET", "/user/orgs", "user_orgs"),
+        ("GET", "/users/{login}", "user"),
+        ("GET", "/users/{login}/repos", "user_repos"),
+        ("GET", "/search/users", "search_users"),
+        ("GET", "/orgs/{org}", "org"),
+        ("GET", "/orgs/{org}/repos", "org_repos"),
+        ("POST", "/orgs/{org}/repos", "create_repo"),
+        ("GET", "/orgs/{org}/members", "members"),
+        ("GET", "/orgs/{org}/invitations", "invitations"),
+        ("PUT", "/orgs/{org}/memberships/{login}", "invite"),
+        ("GET", "/orgs/{org}/teams", "teams"),
+        ("POST", "/orgs/{org}/teams", "create_team"),
+        ("GET", "/orgs/{org}/teams/{slug}", "team"),
+        ("GET", "/orgs/{org}/teams/{slug}/memberships/{login}", "team_membership"),
+        ("PUT", "/orgs/{org}/teams/{slug}/memberships/{login}", "add_team_member"),
+        ("PUT", "/orgs/{org}/teams/{slug}/repos/{owner}/{repo}", "add_team_repo"),
+        ("GET", "/repos/{owner}/{repo}", "repo"),
+        ("PATCH", "/repos/{owner}/{repo}", "edit_repo"),
+        ("GET", "/repos/{owner}/{repo}/forks", "forks"),
+        ("GET", "/repos/{owner}/{repo}/branches/{branch}", "branch"),
+        ("GET", "/repos/{owner}/{repo}/compare/{basehead}", "compare"),
+        ("GET", "/repos/{owner}/{repo}/collaborators", "collaborators"),
+        ("GET", "/repos/{owner}/{repo}/contents{+path}", "contents"),
+        ("POST", "/graphql", "graphql"),
+    ]
+
+    def __init__(
+        self,
+        org: FakeOrg,
+        latency: float = 0.0,
+        rate_limit: int = 5000,
+        window: float = 3600.0,
+        git_root: Path | None = None,
+    ):
+        self.org = org
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.window = window
+        self.git_root = Path(git_root).expanduser() if git_root else None
+
+        self.routes = [(m, t, _route(t), getattr(self, f"_{h}")) for m, t, h in self.ROUTES]
+        self.lock = threading.Lock()
+        self.counts: dict[str, int] = {}
+        self.used: dict[str, int] = {}
+        self.reset_time = time.time() + window
+
+        self.created: dict[str, dict[str, T.Any]] = {}  # repo name: repo
+        self.edited: dict[str, dict[str, T.Any]] = {}  # repo name: changed attributes
+        self.created_teams: dict[str, str] = {}  # slug: name
+        self.team_members: set[tuple[str, str]] = set()  # (slug, login)
+        self.team_repos: set[tuple[str, str]] = set()  # (slug, repo name)
+        self.invited: list[str] = []
+        self.connections = 0
+
+    # %% request dispatch
+    def handle(self, method: str, url: str, base: str, body: T.Any) -> Response:
+        u = urllib.parse.urlsplit(url)
+        query = dict(urllib.parse.parse_qsl(u.query))
+        path = urllib.parse.unquote(u.path).rstrip("/") or "/"
+
+        key, handler, params = f"{method} {path}", None, {}
+        for m, template, pat, h in self.routes:
+            if m == method and (match := pat.match(path)):
+                key, handler, params = f"{method} {template}", h, match.groupdict()
+                break
+
+        resource = "graphql" if path == "/graphql" else "core"
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+            if time.time() >= self.reset_time:
+                self.used.clear()
+                self.reset_time = time.time() + self.window
+            used = self.used[resource] = self.used.get(resource, 0) + 1
+
+        headers = {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(self.rate_limit - used, 0)),
+            "X-RateLimit-Reset": str(int(self.reset_time) + 1),
+            "X-RateLimit-Used": str(min(used, self.rate_limit)),
+            "X-RateLimit-Resource": resource,
+        }
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if used > self.rate_limit:
+            return 403, {"message": "API rate limit exceeded"}, headers
+        if not handler:
+            return 404, {"message": "Not Found"}, headers
+
+        status, data, extra = handler(Request(base, params, query, body))
+
+        return status, data, headers | extra
+
+    def _page(
+        self, req: Request, path: str, total: int, item: T.Callable[[int], T.Any]
+    ) -> Response:
+        """
+        one page of a REST listing, with Link header
+        """
+        per_page = min(int(req.query.get("per_page", 30)), 100)
+        page = int(req.query.get("page", 1))
+        last = max((total + per_page - 1) // per_page, 1)
+
+        start = (page - 1) * per_page
+        items = [item(i) for i in range(start, min(start + per_page, total))]
+
+        q = {k: v for k, v in req.query.items() if k != "page"}
+        links = []
+        if page < last:
+            links.append((page + 1, "next"))
+            links.append((last, "last"))
+        if page > 1:
+            links.append((1, "first"))
+            links.append((page - 1, "prev"))
+        link = ", ".join(
+            f'<{req.base}{path}?{urllib.parse.urlencode(q | {"page": p})}>; rel="{rel}"'
+            for p, rel in links
+        )
+
+        return 200, items, {"Link": link} if link else {}
+
+    # %% synthesized data
+    def repo_index(self, name: str) -> int | None:
+        """
+        index of a synthesized org repo, None if not one
+        """
+        stem = re.escape(self.org.stem)
+        if (m := re.fullmatch(stem + r"(\d{5})", name)) and int(m[1]) < self.org.repos:
+            return int(m[1])
+        return None
+
+    def user_exists(self, login: str) -> bool:
+        return login in {"admin", self.org.login} or re.fullmatch(r"user\d+", login) is not None
+
+    def user_json(self, base: str, login: str) -> dict[str, T.Any]:
+        org = login == self.org.login
+        return {
+            "login": login,
+            "id": int(_sha(login)[:8], 16),
+            "type": "Organization" if org else "User",
+            "name": login.capitalize() if org else f"User {login[4:] or login}",
+            "url": f"{base}/{'orgs' if org else 'users'}/{login}",
+            "repos_url": f"{base}/{'orgs' if org else 'users'}/{login}/repos",
+        }
+
+    def repo_json(self, base: str, owner: str, name: str) -> dict[str, T.Any] | None:
+        edits = self.edited.get(name, {}) if owner == self.org.login else {}
+        if owner == self.org.login and name in self.created:
+            return self.created[name] | edits
+
+        i = self.repo_index(name)
+        if i is None:
+            return None
+
+        fork = owner != self.org.login
+        if fork and not (re.fullmatch(r"user\d+", owner) and int(owner[4:]) < self.org.forks):
+            return None
+
+        return {
+            "id": int(_sha(owner, name)[:8], 16),
+            "name": name,
+            "full_name": f"{owner}/{name}",
+            "owner": self.user_json(base, owner),
+            "private": i % 3 == 0,
+            "fork": fork,
+            "archived": i % 10 == 0,
+            "has_wiki": True,
+            "default_branch": "main",
+            "forks_count": 0 if fork else self.org.forks,
+            "stargazers_count": 0 if fork else i % 50,
+            "license": None if i % 4 == 0 else {"spdx_id": LICENSES[i % len(LICENSES)]},
+            "language": LANGUAGES[i % len(LANGUAGES)],
+            "created_at": EPOCH,
+            "updated_at": EPOCH,
+            "pushed_at": EPOCH,
+            "url": f"{base}/repos/{owner}/{name}",
+            "html_url": f"https://github.com/{owner}/{name}",
+        } | edits
+
+    def org_repo(self, base: str, i: int) -> dict[str, T.Any]:
+        """
+        i-th org repo: synthesized, then created ones
+        """
+        if i < self.org.repos:
+            return self.repo_json(base, self.org.login, f"{self.org.stem}{i:05d}")  # type: ignore
+        return self.repo_json(base, self.org.login, list(self.created)[i - self.org.repos])  # type: ignore
+
+    def team_slugs(self) -> list[str]:
+        return [f"team{k}" for k in range(self.org.teams)] + list(self.created_teams)
+
+    def team_json(self, base: str, slug: str) -> dict[str, T.Any]:
+        return {
+            "id": int(_sha(slug)[:8], 16),
+            "name": self.created_teams.get(slug, slug),
+            "slug": slug,
+            "permission": "pull",
+            "privacy": "closed",
+            "url": f"{base}/orgs/{self.org.login}/teams/{slug}",
+        }
+
+    def team_member_logins(self, slug: str) -> list[str]:
+        logins = []
+        if slug not in self.created_teams:
+            k = int(slug[4:])
+            logins = [f"user{m}" for m in range(k, self.org.members, self.org.teams)]
+        return logins + sorted(login for s, login in self.team_members if s == slug)
+
+    def team_repo_names(self, slug: str) -> list[str]:
+        names = []
+        if slug not in self.created_teams:
+            k = int(slug[4:])
+            names = [
+                f"{self.org.stem}{i:05d}"
+                for i in range(k, self.org.repos, self.org.teams)
+                if i % 5 != 0
+            ]
+        return names + sorted(r for s, r in self.team_repos if s == slug)
+
+    def has_team(self, slug: str) -> bool:
+        return slug in self.created_teams or (
+            re.fullmatch(r"team\d+", slug) is not None and int(slug[4:]) < self.org.teams
+        )
+
+    # %% REST handlers
+    def _rate_limit(self, req: Request) -> Response:
+        def resource(name: str) -> dict[str, int]:
+            used = self.used.get(name, 0)
+            return {
+                "limit": self.rate_limit,
+                "remaining": max(self.rate_limit - used, 0),
+                "reset": int(self.reset_time) + 1,
+                "used": used,
+            }
+
+        res = {r: resource(r) for r in ("core", "graphql", "search")}
+        return 200, {"resources": res, "rate": res["core"]}, {}
+
+    def _auth_user(self, req: Request) -> Response:
+        return 200, self.user_json(req.base, "admin"), {}
+
+    def _user_orgs(self, req: Request) -> Response:
+        return 200, [self.user_json(req.base, self.org.login)], {}
+
+    def _user(self, req: Request) -> Response:
+        if not self.user_exists(login := req.params["login"]):
+            return 404, {"message": "Not Found"}, {}
+        return 200, self.user_json(req.base, login), {}
+
+    def _user_repos(self, req: Request) -> Response:
+        if req.params["login"] == self.org.login:
+            return self._org_repos(req)
+        return 200, [], {}
+
+    def _search_users(self, req: Request) -> Response:
+        login = req.query.get("q", "").removeprefix("user:")
+        items = [self.user_json(req.base, login)] if self.user_exists(login) else []
+        return 200, {"total_count": len(items), "incomplete_results": False, "items": items}, {}
+
+    def _org(self, req: Request) -> Response:
+        if req.params["org"] != self.org.login:
+            return 404, {"message": "Not Found"}, {}
+        return 200, self.user_json(req.base, self.org.login), {}
+
+    def _org_repos(self, req: Request) -> Response:
+        total = self.org.repos + len(self.created)
+        return self._page(
+            req, f"/orgs/{self.org.login}/repos", total, lambda i: self.org_repo(req.base, i)
+        )
+
+    def _create_repo(self, req: Request) -> Response:
+        name = req.body["name"]
+        if self.repo_json(req.base, self.org.login, name):
+            return 422, {"message": "Repository creation failed.", "errors": ["name exists"]}, {}
+
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        repo = {
+            "id": int(_sha(self.org.login, name)[:8], 16),
+            "name": name,
+            "full_name": f"{self.org.login}/{name}",
+            "owner": self.user_json(req.base, self.org.login),
+            "private": req.body.get("private", False),
+            "fork": False,
+            "archived": False,
+            "has_wiki": req.body.get("has_wiki", True),
+            "default_branch": "main",
+            "forks_count": 0,
+            "stargazers_count": 0,
+            "license": None,
+            "language": None,
+            "created_at": now,
+            "updated_at": now,
+            "pushed_at": now,
+            "url": f"{req.base}/repos/{self.org.login}/{name}",
+            "html_url": f"https://github.com/{self.org.login}/{name}",
+            "empty": True,
+        }
+
+        if self.git_root:
+            path = self.git_root / self.org.login / name
+            subprocess.run(["git", "init", "--bare", "--quiet", str(path)], check=True)
+
+        with self.lock:
+            self.created[name] = repo
+
+        return 201, repo, {}
+
+    def _members(self, req: Request) -> Response:
+        return self._page(
+            req,
+            f"/orgs/{self.org.login}/members",
+            self.org.members,
+            lambda m: self.user_json(req.base, f"user{m}"),
+        )
+
+    def _invitations(self, req: Request) -> Response:
+        invited = list(self.invited)
+        return self._page(
+            req,
+            f"/orgs/{self.org.login}/invitations",
+            len(invited),
+            lambda i: {"id": i, "login": invited[i], "role": "direct_member"},
+        )
+
+    def _invite(self, req: Request) -> Response:
+        with self.lock:
+            self.invited.append(req.params["login"])
+        user = {"login": req.params["login"]}
+        return 200, {"state": "pending", "role": "member", "user": user}, {}
+
+    def _teams(self, req: Request) -> Response:
+        slugs = self.team_slugs()
+        return self._page(
+            req,
+            f"/orgs/{self.org.login}/teams",
+            len(slugs),
+            lambda i: self.team_json(req.base, slugs[i]),
+        )
+
+    def _create_team(self, req: Request) -> Response:
+        name = req.body["name"]
+        slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+        if self.has_team(slug):
+            return 422, {"message": "Validation Failed", "errors": ["Name must be unique"]}, {}
+
+        with self.lock:
+            self.created_teams[slug] = name
+            self.team_repos.update((slug, r.split("/")[-1]) for r in req.body.get("repo_names", []))
+
+        return 201, self.team_json(req.base, slug), {}
+
+    def _team(self, req: Request) -> Response:
+        if not self.has_team(slug := req.params["slug"]):
+            return 404, {"message": "Not Found"}, {}
+        return 200, self.team_json(req.base, slug), {}
+
+    def _team_membership(self, req: Request) -> Response:
+        slug, login = req.params["slug"], req.params["login"]
+        if not self.has_team(slug) or login not in self.team_member_logins(slug):
+            return 404, {"message": "Not Found"}, {}
+        url = f"{self.team_json(req.base, slug)['url']}/memberships/{login}"
+        return 200, {"state": "active", "role": "member", "url": url}, {}
+
+    def _add_team_member(self, req: Request) -> Response:
+        slug, login = req.params["slug"], req.params["login"]
+        if not self.has_team(slug) or not self.user_exists(login):
+            return 404, {"message": "Not Found"}, {}
+        with self.lock:
+            self.team_members.add((slug, login))
+        url = f"{self.team_json(req.base, slug)['url']}/memberships/{login}"
+        return 200, {"state": "active", "role": "member", "url": url}, {}
+
+    def _add_team_repo(self, req: Request) -> Response:
+        if not self.has_team(slug := req.params["slug"]):
+            return 404, {"message": "Not Found"}, {}
+        with self.lock:
+            self.team_repos.add((slug, req.params["repo"]))
+        return 204, None, {}
+
+    def _repo(self, req: Request) -> Response:
+        if not (repo := self.repo_json(req.base, req.params["owner"], req.params["repo"])):
+            return 404, {"message": "Not Found"}, {}
+        return 200, repo, {}
+
+    def _edit_repo(self, req: Request) -> Response:
+        owner, name = req.params["owner"], req.params["repo"]
+        if not self.repo_json(req.base, owner, name) or owner != self.org.login:
+            return 404, {"message": "Not Found"}, {}
+
+        edits = {k: req.body[k] for k in ("private", "archived", "has_wiki") if k in req.body}
+        with self.lock:
+            self.edited[name] = self.edited.get(name, {}) | edits
+        return 200, self.repo_json(req.base, owner, name), {}
+
+    def _forks(self, req: Request) -> Response:
+        owner, name = req.params["owner"], req.params["repo"]
+        if owner != self.org.login or self.repo_index(name) is None:
+            return 404, {"message": "Not Found"}, {}
+        return self._page(
+            req,
+            f"/repos/{owner}/{name}/forks",
+            self.org.forks,
+            lambda j: self.repo_json(req.base, f"user{j}", name),
+        )
+
+    def _branch(self, req: Request) -> Response:
+        owner, name, branch = req.params["owner"], req.params["repo"], req.params["branch"]
+        repo = self.repo_json(req.base, owner, name)
+        if not repo or repo.get("empty") or branch != "main":
+            return 404, {"message": "Branch not found"}, {}
+
+        sha = _sha(owner, name, branch)
+        url = f"{req.base}/repos/{owner}/{name}/commits/{sha}"
+        return 200, {"name": branch, "commit": {"sha": sha, "url": url}, "protected": False}, {}
+
+    def _compare(self, req: Request) -> Response:
+        owner, name = req.params["owner"], req.params["repo"]
+        base, _, head = req.params["basehead"].partition("...")
+        ahead = int(head[-2:], 16) % 4 if base != head else 0
+        data: dict[str, T.Any] = {
+            "status": "ahead" if ahead else "identical",
+            "ahead_by": ahead,
+            "behind_by": int(head[-4:-2], 16) % 3 if ahead else 0,
+            "total_commits": ahead,
+            "commits": [],
+            "files": [],
+            "url": f"{req.base}/repos/{owner}/{name}/compare/{base}...{head}",
+        }
+        return 200, data, {}
+
+    def _collaborators(self, req: Request) -> Response:
+        owner, name = req.params["owner"], req.params["repo"]
+        if not self.repo_json(req.base, owner, name):
+            return 404, {"message": "Not Found"}, {}
+
+        i = self.repo_index(name) or 0
+        n = self.org.collaborators if name not in self.created else 0
+        return self._page(
+            req,
+            f"/repos/{owner}/{name}/collaborators",
+            n,
+            lambda k: self.user_json(req.base, f"user{self.org.members + i * n + k}"),
+        )
+
+    def _contents(self, req: Request) -> Response:
+        owner, name = req.params["owner"], req.params["repo"]
+        if not (repo := self.repo_json(req.base, owner, name)):
+            return 404, {"message": "Not Found"}, {}
+        if repo.get("empty"):
+            return 404, {"message": "This repository is empty."}, {}
+
+        url = f"{req.base}/repos/{owner}/{name}/contents/README.md"
+        readme = {"type": "file", "name": "README.md", "path": "README.md", "sha": _sha(name)}
+        return 200, [readme | {"url": url, "size": 100}], {}
+
+    # %% GraphQL
+    def _graphql(self, req: Request) -> Response:
+        query = req.body["query"]
+        variables = req.body.get("variables") or {}
+
+        if "repositoryOwner" in query and "repositories" in query:
+            data = {"repositoryOwner": self.gql_inventory(variables)}
+        elif "repositoryOwner" in query:
+            data = {"repositoryOwner": self.gql_owner(variables["login"])}
+        elif "team(slug:" in query:
+            data = {"organization": self.gql_team_repos(variables)}
+        elif "teams(" in query:
+            first = int(m[1]) if (m := re.search(r"teams\(first: (\d+)", query)) else 100
+            data = {"organization": self.gql_teams(variables, first)}
+        elif aliases := re.findall(r"(\w+): user\(login: \$(\w+)\)", query):
+            data = {a: self.gql_user(variables[v]) for a, v in aliases}
+        else:
+            return 200, {"data": None, "errors": [{"message": "query not supported by fake"}]}, {}
+
+        return 200, {"data": data}, {}
+
+    @staticmethod
+    def _cursor(variables: dict[str, T.Any]) -> int:
+        return int(variables.get("cursor") or 0)
+
+    def _connection(self, names: list[str], start: int, first: int) -> dict[str, T.Any]:
+        stop = min(start + first, len(names))
+        return {
+            "pageInfo": {"hasNextPage": stop < len(names), "endCursor": str(stop)},
+            "nodes": [{"name": n} for n in names[start:stop]],
+            "edges": [{"permission": "WRITE", "node": {"name": n}} for n in names[start:stop]],
+        }
+
+    def gql_inventory(self, variables: dict[str, T.Any]) -> dict[str, T.Any] | None:
+        login = variables["login"]
+        if not self.user_exists(login):
+            return None
+
+        total = self.org.repos + len(self.created) if login == self.org.login else 0
+        start = self._cursor(variables)
+        stop = min(start + 100, total)
+
+        nodes = []
+        for i in range(start, stop):
+            r = self.org_repo("", i)
+            lang = [{"size": 1000, "node": {"name": r["language"]}}] if r["language"] else []
+            nodes.append(
+                {
+                    "name": r["name"],
+                    "nameWithOwner": r["full_name"],
+                    "owner": {"login": r["owner"]["login"]},
+                    "isArchived": r["archived"],
+                    "isPrivate": r["private"],
+                    "isFork": r["fork"],
+                    "licenseInfo": {"spdxId": r["license"]["spdx_id"]} if r["license"] else None,
+                    "stargazerCount": r["stargazers_count"],
+                    "forkCount": r["forks_count"],
+                    "pushedAt": r["pushed_at"],
+                    "updatedAt": r["updated_at"],
+                    "defaultBranchRef": None if r.get("empty") else {"name": "main"},
+                    "languages": {"edges": lang},
+                }
+            )
+
+        return {
+            "login": login,
+            "repositories": {
+                "pageInfo": {"hasNextPage": stop < total, "endCursor": str(stop)},
+                "nodes": nodes,
+            },
+        }
+
+    def gql_teams(self, variables: dict[str, T.Any], first: int) -> dict[str, T.Any] | None:
+        if variables["login"] != self.org.login:
+            return None
+
+        slugs = self.team_slugs()
+        start = self._cursor(variables)
+        stop = min(start + first, len(slugs))
+
+        nodes = []
+        for slug in slugs[start:stop]:
+            members = self.team_member_logins(slug)
+            nodes.append(
+                {
+                    "name": self.created_teams.get(slug, slug),
+                    "slug": slug,
+                    "members": {
+                        "pageInfo": {"hasNextPage": len(members) > 100},
+                        "nodes": [{"login": m} for m in members[:100]],
+                    },
+                    # memberships are added directly, without invitations
+                    "invitations": {"pageInfo": {"hasNextPage": False}, "nodes": []},
+                    "repositories": self._connection(self.team_repo_names(slug), 0, 100),
+                }
+            )
+
+        return {
+            "teams": {
+                "pageInfo": {"hasNextPage": stop < len(slugs), "endCursor": str(stop)},
+                "nodes": nodes,
+            }
+        }
+
+    def gql_team_repos(self, variables: dict[str, T.Any]) -> dict[str, T.Any] | None:
+        if variables["login"] != self.org.login:
+            return None
+        if not self.has_team(slug := variables["slug"]):
+            return {"team": None}
+
+        names = self.team_repo_names(slug)
+        return {"team": {"repositories": self._connection(names, self._cursor(variables), 100)}}
+
+    def gql_user(self, login: str) -> dict[str, T.Any] | None:
+        if not self.user_exists(login):
+            return None
+        u = self.user_json("", login)
+        return {"login": login, "databaseId": u["id"], "name": u["name"]}
+
+    def gql_owner(self, login: str) -> dict[str, T.Any] | None:
+        if not self.user_exists(login):
+            return None
+        u = self.user_json("", login)
+        return {"__typename": u["type"], "login": login, "databaseId": u["id"]}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are separate writes, which Nagle delays on a kept-alive connection
+    disable_nagle_algorithm = True
+    server: T.Any
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.fake.lock:
+            self.server.fake.connections += 1
+
+    def _respond(self, method: str) -> None:
+        fake: FakeGitHub = self.server.fake
+
+        n = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(n)) if n else {}
+
+        headers: dict[str, str] = {}
+        if self.path.startswith("/_fakehub/calls"):
+            with fake.lock:
+                data: T.Any = dict(fake.counts)
+                if method == "DELETE":
+                    fake.counts.clear()
+                    fake.used.clear()
+            status = 200
+        elif self.path.startswith("/_fakehub/connections"):
+            data, status = fake.connections, 200
+        else:
+            base = f"http://{self.headers['Host']}"
+            status, data, headers = fake.handle(method, self.path, base, body)
+
+        out = b"" if data is None else json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(out)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(out)
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def do_POST(self):
+        self._respond("POST")
+
+    def do_PUT(self):
+        self._respond("PUT")
+
+    def do_PATCH(self):
+        self._respond("PATCH")
+
+    def do_DELETE(self):
+        self._respond("DELETE")
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+def _server(kwargs: dict[str, T.Any]) -> ThreadingHTTPServer:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    httpd.fake = FakeGitHub(**kwargs)  # type: ignore[attr-defined]
+    return httpd
+
+
+def _serve_forever(kwargs: dict[str, T.Any], port: T.Any) -> None:
+    httpd = _server(kwargs)
+    port.put(httpd.server_port)
+    httpd.serve_forever()
+
+
+@contextlib.contextmanager
+def serve(org: FakeOrg | None = None, process: bool = False, **kwargs) -> T.Iterator[str]:
+    """
+    run a fake GitHub API server on localhost
+
+    Parameters
+    ----------
+    org : FakeOrg, optional
+        organization to synthesize
+    process : bool, optional
+        serve from a separate process, so the server's CPU time and memory
+        don't count toward measurements of the client
+    kwargs :
+        passed to FakeGitHub: latency, rate_limit, window, git_root
+
+    Yields
+    ------
+    base_url : str
+        for gitbulk.session(base_url=...) or environment variable GITHUB_API_URL
+    """
+
+    kwargs["org"] = org or FakeOrg()
+
+    if not process:
+        httpd = _server(kwargs)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        try:
+            yield f"http://127.0.0.1:{httpd.server_port}"
+        finally:
+            httpd.shutdown()
+            httpd.server_close()
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    port = ctx.Queue()
+    proc = ctx.Process(target=_serve_forever, args=(kwargs, port), daemon=True)
+    proc.start()
+    try:
+        yield f"http://127.0.0.1:{port.get(timeout=60)}"
+    finally:
+        proc.terminate()
+        proc.join()
+
+
+def calls(base_url: str) -> dict[str, int]:
+    """
+    requests made to the fake server per route template, like "GET /repos/{owner}/{repo}"
+    """
+    with urllib.request.urlopen(f"{base_url}/_fakehub/calls") as f:
+        return json.load(f)
+
+
+def reset(base_url: str) -> None:
+    """
+    clear the request counts and rate limit usage of the fake server
+    """
+    req = urllib.request.Request(f"{base_url}/_fakehub/calls", method="DELETE")
+    with urllib.request.urlopen(req):
+        pass
+
+
+def connections(base_url: str) -> int:
+    """
+    TCP connections accepted by the fake server, including the one asking
+    """
+    with urllib.request.urlopen(f"{base_url}/_fakehub/connections") as f:
+        return json.load(f)
@@ -1,13 +1,72 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 import re
+import typing as T
 
 import github
 
 
+def iter_collabs(
+    op: github.Organization.Organization,
+    sess: github.Github,
+    stem: str | None = None,
+    regex: str | None = None,
+    workers: int = 8,
+) -> T.Iterator[tuple[str, list[str]]]:
+    """
+    outside collaborators of organization repos, yielded per repo as each is fetched.
+
+    GitHub filters to outside collaborators (affiliation=outside), so organization members
+    aren't listed or transferred. Repos are fetched concurrently as the repo listing arrives,
+    with at most twice `workers` submitted ahead of the results.
+
+    Parameters
+    ----------
+
+    stem: str, optional
+        repo names starts with
+    regex: str, optional
+        regex pattern
+    workers: int, optional
+        number of repos fetched concurrently
+
+    Yields
+    ------
+
+    name, logins: str, list of str
+        repo name and its outside collaborators, in order of completion
+    """
+
+    rpat = re.compile(regex) if regex else None
+
+    def probe(repo: github.Repository.Repository) -> tuple[str, list[str]]:
+        return repo.name, [u.login for u in repo.get_collaborators(affiliation="outside")]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: set[Future[tuple[str, list[str]]]] = set()
+        for repo in op.get_repos():
+            if rpat and not rpat.match(repo.name):
+                continue
+            elif stem and not repo.name.startswith(stem):
+                continue
+
+            pending.add(pool.submit(probe, repo))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    yield f.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                yield f.result()
+
+
 def get_collabs(
     op: github.Organization.Organization,
     sess: github.Github,
     stem: str | None = None,
     regex: str | None = None,
+    workers: int = 8,
 ) -> dict[str, list[str]]:
     """
     get collaborators of a GitHub repo
@@ -19,26 +78,14 @@ def get_collabs(
         repo names starts with
     regex: str, optional
         regex pattern
+    workers: int, optional
+        number of repos fetched concurrently
 
     Return
     ------
 
     collabs: dict of list of str
-        collaborators on all repos selected in organization
+        outside collaborators on all repos selected in organization
     """
-    orgmembers = [u.login for u in op.get_members()]
-
-    collabs = {}
-    rpat = re.compile(regex) if regex else None
-
-    for repo in op.get_repos():
-        if rpat and not rpat.match(repo.name):
-            continue
-        elif stem and not repo.name.startswith(stem):
-            continue
-
-        collabs[repo.name] = [
-            u.login for u in repo.get_collaborators() if u.login not in orgmembers
-        ]
 
-    return collabs
+    return dict(sorted(iter_collabs(op, sess, stem, regex, workers)))
@@ -0,0 +1,236 @@
+"""
+GitHub v4 GraphQL API queries that replace many per-repo v3 REST calls.
+
+One GraphQL query returns 100 repos with the attributes the scripts filter on,
+so a 10,000 repo organization is listed in about 100 requests.
+"""
+
+import typing as T
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import github
+
+INVENTORY_QUERY = """
+query($login: String!, $cursor: String) {
+  repositoryOwner(login: $login) {
+    repositories(first: 100, after: $cursor, orderBy: {field: NAME, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        nameWithOwner
+        owner { login }
+        isArchived
+        isPrivate
+        isFork
+        licenseInfo { spdxId }
+        stargazerCount
+        forkCount
+        pushedAt
+        updatedAt
+        defaultBranchRef { name }
+        languages(first: 100, orderBy: {field: SIZE, direction: DESC}) {
+          edges { size node { name } }
+        }
+      }
+    }
+  }
+}
+"""
+
+TEAMS_QUERY = """
+query($login: String!, $cursor: String) {
+  organization(login: $login) {
+    teams(first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        slug
+        repositories(first: 100) {
+          pageInfo { hasNextPage endCursor }
+          nodes { name }
+        }
+      }
+    }
+  }
+}
+"""
+
+TEAM_REPOS_QUERY = """
+query($login: String!, $slug: String!, $cursor: String) {
+  organization(login: $login) {
+    team(slug: $slug) {
+      repositories(first: 100, after: $cursor) {
+        pageInfo { hasNextPage endCursor }
+        nodes { name }
+      }
+    }
+  }
+}
+"""
+
+
+@dataclass(frozen=True)
+class RepoInfo:
+    """
+    repo attributes from one GraphQL inventory pass.
+    Attribute names follow github.Repository.Repository where one exists.
+    """
+
+    name: str
+    full_name: str
+    owner: str
+    archived: bool
+    private: bool
+    fork: bool
+    license: str | None  # noqa: A003
+    stargazers_count: int
+    forks_count: int
+    pushed_at: datetime | None
+    updated_at: datetime | None
+    default_branch: str | None
+    languages: dict[str, int] = field(default_factory=dict)
+
+
+def graphql(sess: github.Github, query: str, variables: dict[str, T.Any] | None = None) -> dict:
+    """
+    run a GitHub GraphQL query through the session, so it shares the session authentication
+
+    Parameters
+    ----------
+    sess : github.Github
+        GitHub session
+    query : str
+        GraphQL query
+    variables : dict, optional
+        GraphQL query variables
+
+    Results
+    -------
+    data : dict
+        the "data" of the response
+
+    Raises
+    ------
+    github.GithubException
+        if the query returned errors and no data
+    """
+
+    req = sess.requester
+    headers, resp = req.requestJsonAndCheck(
+        "POST", req.graphql_url, input={"query": query, "variables": variables or {}}
+    )
+
+    if resp.get("errors") and not resp.get("data"):
+        raise github.GithubException(400, resp, headers)
+
+    return resp["data"]
+
+
+def _time(t: str | None) -> datetime | None:
+    return datetime.fromisoformat(t.replace("Z", "+00:00")) if t else None
+
+
+def _repo_info(n: dict[str, T.Any]) -> RepoInfo:
+    lic = n["licenseInfo"]
+    branch = n["defaultBranchRef"]
+
+    return RepoInfo(
+        name=n["name"],
+        full_name=n["nameWithOwner"],
+        owner=n["owner"]["login"],
+        archived=n["isArchived"],
+        private=n["isPrivate"],
+        fork=n["isFork"],
+        license=lic["spdxId"] if lic else None,
+        stargazers_count=n["stargazerCount"],
+        forks_count=n["forkCount"],
+        pushed_at=_time(n["pushedAt"]),
+        updated_at=_time(n["updatedAt"]),
+        default_branch=branch["name"] if branch else None,
+        languages={e["node"]["name"]: e["size"] for e in n["languages"]["edges"]},
+    )
+
+
+def get_inventory(sess: github.Github, login: str, stem: str = "") -> T.Iterator[RepoInfo]:
+    """
+    list repos of a user or organization, 100 repos per GraphQL query
+
+    Parameters
+    ----------
+    sess : github.Github
+        GitHub session
+    login : str
+        username or organization name
+    stem : str, optional
+        only repos with name starting with this string
+
+    Results
+    -------
+    repos : iterator of RepoInfo
+        repos in order of name
+    """
+
+    cursor = None
+    while True:
+        data = graphql(sess, INVENTORY_QUERY, {"login": login, "cursor": cursor})
+        if not data["repositoryOwner"]:
+            raise ValueError(f"{login} not found on GitHub")
+
+        page = data["repositoryOwner"]["repositories"]
+        for n in page["nodes"]:
+            if n["name"].startswith(stem):
+                yield _repo_info(n)
+
+        if not page["pageInfo"]["hasNextPage"]:
+            break
+        cursor = page["pageInfo"]["endCursor"]
+
+
+def get_team_repos(sess: github.Github, orgname: str) -> dict[str, set[str]]:
+    """
+    which teams each organization repo belongs to.
+
+    GraphQL repositories don't list their teams, so this walks the teams instead:
+    one query per 100 teams, plus one query per extra 100 repos of a team.
+
+    Parameters
+    ----------
+    sess : github.Github
+        GitHub session
+    orgname : str
+        organization name
+
+    Results
+    -------
+    teams : dict of str, set of str
+        repo name: team slugs. Repos without a team are absent.
+    """
+
+    teams: dict[str, set[str]] = {}
+
+    cursor = None
+    while True:
+        data = graphql(sess, TEAMS_QUERY, {"login": orgname, "cursor": cursor})
+        if not data["organization"]:
+            raise ValueError(f"organization {orgname} not found on GitHub")
+
+        page = data["organization"]["teams"]
+        for t in page["nodes"]:
+            repos = t["repositories"]
+            while True:
+                for r in repos["nodes"]:
+                    teams.setdefault(r["name"], set()).add(t["slug"])
+
+                if not repos["pageInfo"]["hasNextPage"]:
+                    break
+                repos = graphql(
+                    sess,
+                    TEAM_REPOS_QUERY,
+                    {"login": orgname, "slug": t["slug"], "cursor": repos["pageInfo"]["endCursor"]},
+                )["organization"]["team"]["repositories"]
+
+        if not page["pageInfo"]["hasNextPage"]:
+            break
+        cursor = page["pageInfo"]["endCursor"]
+
+    return teams
@@ -0,0 +1,269 @@
+"""
+Local SQLite index of a GitHub user or organization, for listing and reports without the network.
+
+OrgIndex.sync() lists repos with the GraphQL inventory (one query per 100 repos),
+and refetches per-repo details (collaborators) only for repos whose
+updated_at / pushed_at moved since the last sync.
+Organization teams, team repos, members and outside collaborators are bulk listings,
+so they are refreshed on every sync.
+
+Changes that don't move a repo's updated_at or pushed_at, such as adding a collaborator,
+are picked up by sync(full=True).
+"""
+
+from pathlib import Path
+from datetime import datetime, timezone
+import json
+import logging
+import re
+import sqlite3
+import typing as T
+
+import github
+
+from .base import cache_dir, lazy_repo
+from .graphql import RepoInfo, get_inventory, get_team_repos
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    name TEXT PRIMARY KEY, full_name TEXT, owner TEXT,
+    archived INTEGER, private INTEGER, fork INTEGER, license TEXT,
+    stargazers_count INTEGER, forks_count INTEGER,
+    pushed_at TEXT, updated_at TEXT, default_branch TEXT, languages TEXT);
+CREATE TABLE IF NOT EXISTS teams (slug TEXT PRIMARY KEY, name TEXT);
+CREATE TABLE IF NOT EXISTS team_repos (team TEXT, repo TEXT, PRIMARY KEY (team, repo));
+CREATE TABLE IF NOT EXISTS members (login TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS outside_collaborators (login TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS collaborators (repo TEXT, login TEXT, PRIMARY KEY (repo, login));
+CREATE TABLE IF NOT EXISTS sync (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _iso(t: datetime | None) -> str | None:
+    return t.isoformat() if t else None
+
+
+class OrgIndex:
+    """
+    SQLite snapshot of one GitHub user or organization
+
+    Parameters
+    ----------
+    login : str
+        username or organization name
+    path : pathlib.Path, optional
+        SQLite database file, default under gitbulk.cache_dir()
+    """
+
+    def __init__(self, login: str, path: Path | None = None):
+        self.login = login
+        self.path = Path(path).expanduser() if path else cache_dir() / "index" / f"{login}.sqlite3"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.db = sqlite3.connect(self.path)
+        self.db.executescript(SCHEMA)
+
+    @property
+    def last_sync(self) -> datetime | None:
+        row = self.db.execute("SELECT value FROM sync WHERE key = 'last_sync'").fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def sync(self, sess: github.Github, full: bool = False) -> dict[str, int]:
+        """
+        update the index from GitHub
+
+        Parameters
+        ----------
+        sess : github.Github
+            GitHub session
+        full : bool, optional
+            refetch details of all repos, not just those that changed
+
+        Results
+        -------
+        counts : dict of str, int
+            number of repos listed, changed and removed
+        """
+
+        started = datetime.now(timezone.utc)
+        stored = {
+            name: (updated, pushed)
+            for name, updated, pushed in self.db.execute(
+                "SELECT name, updated_at, pushed_at FROM repos"
+            )
+        }
+
+        repos = list(get_inventory(sess, self.login))
+        changed = [
+            r
+            for r in repos
+            if full or stored.get(r.name) != (_iso(r.updated_at), _iso(r.pushed_at))
+        ]
+        removed = set(stored).difference(r.name for r in repos)
+
+        with self.db:
+            for table in ("repos", "collaborators"):
+                col = "name" if table == "repos" else "repo"
+                self.db.executemany(f"DELETE FROM {table} WHERE {col} = ?", ((n,) for n in removed))
+
+        try:
+            org = sess.get_organization(self.login)
+            org.login
+        except github.UnknownObjectException:
+            org = None
+
+        if org is not None:
+            self._sync_org(sess, org)
+
+        # a repo whose details failed keeps its old row, so the next sync tries it again
+        for r in changed:
+            self._sync_repo(sess, r)
+
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO sync VALUES ('last_sync', ?)", (started.isoformat(),)
+            )
+
+        counts = {"repos": len(repos), "changed": len(changed), "removed": len(removed)}
+        logging.info(f"{self.login} index {self.path}: {counts}")
+
+        return counts
+
+    def _sync_org(self, sess: github.Github, org: github.Organization.Organization) -> None:
+        teams = [(t.slug, t.name) for t in org.get_teams()]
+        team_repos = get_team_repos(sess, self.login)
+        members = [(m.login,) for m in org.get_members()]
+        outside = [(m.login,) for m in org.get_outside_collaborators()]
+
+        with self.db:
+            for table in ("teams", "team_repos", "members", "outside_collaborators"):
+                self.db.execute(f"DELETE FROM {table}")
+
+            self.db.executemany("INSERT INTO teams VALUES (?, ?)", teams)
+            self.db.executemany(
+                "INSERT INTO team_repos VALUES (?, ?)",
+                ((t, r) for r, slugs in team_repos.items() for t in slugs),
+            )
+            self.db.executemany("INSERT INTO members VALUES (?)", members)
+            self.db.executemany("INSERT INTO outside_collaborators VALUES (?)", outside)
+
+    def _sync_repo(self, sess: github.Github, r: RepoInfo) -> None:
+        """
+        store a changed repo with its collaborators, only once they were fetched
+        """
+        repo = lazy_repo(sess, r.full_name)
+        try:
+            logins = [(r.name, u.login) for u in repo.get_collaborators(affiliation="direct")]
+        except github.GithubException as e:
+            logging.error(f"{r.full_name} collaborators: {e}")
+            return
+
+        row = (
+            r.name,
+            r.full_name,
+            r.owner,
+            r.archived,
+            r.private,
+            r.fork,
+            r.license,
+            r.stargazers_count,
+            r.forks_count,
+            _iso(r.pushed_at),
+            _iso(r.updated_at),
+            r.default_branch,
+            json.dumps(r.languages),
+        )
+
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO repos VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)", row)
+            self.db.execute("DELETE FROM collaborators WHERE repo = ?", (r.name,))
+            self.db.executemany("INSERT INTO collaborators VALUES (?, ?)", logins)
+
+    def _check(self) -> None:
+        if self.last_sync is None:
+            raise FileNotFoundError(f"{self.login} index {self.path} was never synced")
+
+    def repos(self, stem: str = "") -> list[RepoInfo]:
+        """
+        repos in order of name
+
+        Parameters
+        ----------
+        stem : str, optional
+            only repos with name starting with this string
+        """
+        self._check()
+
+        rows = self.db.execute(
+            "SELECT * FROM repos WHERE substr(name, 1, ?) = ? ORDER BY name", (len(stem), stem)
+        )
+
+        return [
+            RepoInfo(
+                name=n,
+                full_name=fn,
+                owner=owner,
+                archived=bool(archived),
+                private=bool(private),
+                fork=bool(fork),
+                license=lic,
+                stargazers_count=stars,
+                forks_count=forks,
+                pushed_at=datetime.fromisoformat(pushed) if pushed else None,
+                updated_at=datetime.fromisoformat(updated) if updated else None,
+                default_branch=branch,
+                languages=json.loads(langs),
+            )
+            for n, fn, owner, archived, private, fork, lic, stars, forks, pushed, updated, branch, langs in rows
+        ]
+
+    def team_repos(self) -> dict[str, set[str]]:
+        """
+        repo name: team slugs, as gitbulk.get_team_repos()
+        """
+        self._check()
+
+        teams: dict[str, set[str]] = {}
+        for t, r in self.db.execute("SELECT team, repo FROM team_repos"):
+            teams.setdefault(r, set()).add(t)
+
+        return teams
+
+    def collabs(self, stem: str | None = None, regex: str | None = None) -> dict[str, list[str]]:
+        """
+        collaborators that aren't organization members, as gitbulk.get_collabs()
+
+        Parameters
+        ----------
+        stem: str, optional
+            repo names starts with
+        regex: str, optional
+            regex pattern
+        """
+        self._check()
+
+        rpat = re.compile(regex) if regex else None
+
+        collabs: dict[str, list[str]] = {}
+        for r in self.repos(stem or ""):
+            if rpat and not rpat.match(r.name):
+                continue
+            collabs[r.name] = []
+
+        for repo, login in self.db.execute(
+            "SELECT repo, login FROM collaborators "
+            "WHERE login NOT IN (SELECT login FROM members) ORDER BY repo, login"
+        ):
+            if repo in collabs:
+                collabs[repo].append(login)
+
+        return collabs
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "OrgIndex":
+        return self
+
+    def __exit__(self, *args: T.Any) -> None:
+        self.close()
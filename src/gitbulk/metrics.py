@@ -0,0 +1,353 @@
+"""
+Per-endpoint instrumentation of the GitHub API requests of a session.
+
+Requests are grouped by endpoint template, like "GET /repos/{owner}/{repo}/collaborators",
+so an N+1 pattern such as one get_user() per roster row shows up as one line
+with as many requests as rows. GraphQL requests are grouped by their top-level field.
+
+Per endpoint: requests by status, latency histogram, response bytes,
+retries (rate limit retries by the session middleware and urllib3 retries),
+304 Not Modified answers (free with the response cache), and rate limit units consumed.
+
+The Metrics middleware goes last in the session middleware, closest to the network,
+so it sees every attempt and the real status of cached 304 responses.
+Enable it for any script with environment variable GITBULK_METRICS, see gitbulk.session().
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+import json
+import re
+import sys
+import threading
+import time
+import typing as T
+import urllib.parse
+import weakref
+
+import requests
+
+from .ratelimit import identity, resource
+
+# latency histogram bucket upper bounds, seconds
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+# path segment rules: a segment following the key is a parameter; "+" takes the rest of the path
+PARAMS = {
+    "repos": ["{owner}", "{repo}"],
+    "orgs": ["{org}"],
+    "users": ["{username}"],
+    "teams": ["{team}"],
+    "memberships": ["{username}"],
+    "members": ["{username}"],
+    "collaborators": ["{username}"],
+    "public_members": ["{username}"],
+    "invitations": ["{invitation_id}"],
+    "branches": ["{branch}"],
+    "commits": ["{ref}"],
+    "statuses": ["{ref}"],
+    "tags": ["{tag}"],
+    "hooks": ["{hook_id}"],
+    "issues": ["{number}"],
+    "pulls": ["{number}"],
+    "releases": ["{release_id}"],
+    "labels": ["{name}"],
+    "blobs": ["{sha}"],
+    "trees": ["{sha}"],
+    "compare": ["+{basehead}"],
+    "contents": ["+{path}"],
+    "refs": ["+{ref}"],
+    "ref": ["+{ref}"],
+}
+
+
+def endpoint(url: str, body: T.Any = None) -> str:
+    """
+    endpoint template of a request URL, like /repos/{owner}/{repo}/branches/{branch}.
+    GraphQL requests are named by their first top-level field, like /graphql {repositoryOwner}.
+    """
+
+    path = urllib.parse.urlsplit(url).path
+    # GitHub Enterprise Server prefix
+    path = re.sub(r"^/api/v3(?=/)", "", path).rstrip("/") or "/"
+
+    if path.endswith("/graphql"):
+        return f"/graphql {{{_graphql_field(body)}}}"
+
+    parts = path.strip("/").split("/")
+    out: list[str] = []
+    i = 0
+    while i < len(parts):
+        seg = parts[i]
+        out.append(seg)
+        i += 1
+        # /users/{username}/repos but not /user/repos; /search/users is a fixed path
+        if seg not in PARAMS or (seg == "users" and out[:1] == ["search"]):
+            continue
+        for p in PARAMS[seg]:
+            if i >= len(parts):
+                break
+            if p.startswith("+"):
+                out.append(p[1:])
+                i = len(parts)
+            else:
+                out.append(p)
+                i += 1
+
+    return "/" + "/".join(out)
+
+
+def _graphql_field(body: T.Any) -> str:
+    if isinstance(body, bytes):
+        body = body.decode(errors="replace")
+    try:
+        query = json.loads(body)["query"] if body else ""
+    except (ValueError, KeyError, TypeError):
+        return "?"
+
+    # skip "query Name($a: String!)" or "mutation", then an optional alias
+    m = re.search(r"\{\s*(?:\w+\s*:\s*)?(\w+)", query)
+    return m[1] if m else "?"
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    status: dict[int, int] = field(default_factory=dict)
+    retries: int = 0
+    not_modified: int = 0
+    units: int = 0
+    nbytes: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+
+    def add(self, status: int, seconds: float, nbytes: int, units: int, retry: int) -> None:
+        self.requests += 1
+        self.status[status] = self.status.get(status, 0) + 1
+        self.retries += retry
+        self.not_modified += status == 304
+        self.units += units
+        self.nbytes += nbytes
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.buckets[next(i for i, b in enumerate(BUCKETS) if seconds <= b)] += 1
+
+
+class Metrics:
+    """
+    session middleware recording per-endpoint request metrics
+
+    Parameters
+    ----------
+    report : bool or pathlib.Path, optional
+        at interpreter exit, print a summary to stderr.
+        Path: also write the metrics to this .json, or .prom for Prometheus text format.
+    """
+
+    def __init__(self, report: bool | Path = False):
+        self.stats: dict[tuple[str, str], EndpointStats] = {}
+        self.started = time.time()
+
+        self._lock = threading.Lock()
+        self._seen: weakref.WeakSet = weakref.WeakSet()
+        # last X-RateLimit-Used of each token and resource, for GraphQL query costs
+        self._used: dict[tuple[str, str], tuple[float, int]] = {}
+
+        if report:
+            import atexit
+
+            atexit.register(self.report, None if report is True else Path(report))
+
+    def send(self, request, send_next) -> requests.Response:
+        tic = time.perf_counter()
+        response = send_next(request)
+        seconds = time.perf_counter() - tic
+
+        retry = 0
+        with self._lock:
+            if request in self._seen:
+                retry = 1
+            self._seen.add(request)
+
+        history = getattr(getattr(response.raw, "retries", None), "history", None)
+        retry += len(history or ())
+
+        self.record(request, response, seconds, retry)
+
+        return response
+
+    def record(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+        seconds: float,
+        retry: int = 0,
+    ) -> None:
+        key = (request.method or "GET", endpoint(request.url or "", request.body))
+        units = self._units(request, response)
+        nbytes = len(response.content or b"")
+
+        with self._lock:
+            self.stats.setdefault(key, EndpointStats()).add(
+                response.status_code, seconds, nbytes, units, retry
+            )
+
+    def _units(self, request: requests.PreparedRequest, response: requests.Response) -> int:
+        """
+        rate limit units a response consumed: none for 304, one per REST request,
+        and the increase of X-RateLimit-Used for GraphQL, whose queries cost one or more points
+        """
+        h = response.headers
+        if response.status_code == 304 or "x-ratelimit-used" not in h:
+            return 0
+
+        res = h.get("x-ratelimit-resource", resource(request))
+        if res != "graphql":
+            return 1
+
+        key = (identity(request), res)
+        reset, used = float(h.get("x-ratelimit-reset", 0)), int(h["x-ratelimit-used"])
+        with self._lock:
+            last = self._used.get(key)
+            self._used[key] = (reset, used)
+
+        if last and last[0] == reset and used > last[1]:
+            return used - last[1]
+        return 1
+
+    def totals(self) -> EndpointStats:
+        t = EndpointStats()
+        with self._lock:
+            for s in self.stats.values():
+                t.requests += s.requests
+                t.retries += s.retries
+                t.not_modified += s.not_modified
+                t.units += s.units
+                t.nbytes += s.nbytes
+                t.seconds += s.seconds
+        return t
+
+    def to_dict(self) -> dict[str, T.Any]:
+        """
+        metrics as JSON-serializable dict, endpoints in descending order of requests
+        """
+        with self._lock:
+            items = sorted(self.stats.items(), key=lambda kv: -kv[1].requests)
+            endpoints = [
+                {
+                    "method": method,
+                    "endpoint": ep,
+                    "requests": s.requests,
+                    "status": {str(k): v for k, v in sorted(s.status.items())},
+                    "retries": s.retries,
+                    "not_modified": s.not_modified,
+                    "units": s.units,
+                    "bytes": s.nbytes,
+                    "seconds": round(s.seconds, 6),
+                    "max_seconds": round(s.max_seconds, 6),
+                    "buckets": dict(zip(map(str, BUCKETS), s.buckets)),
+                }
+                for (method, ep), s in items
+            ]
+
+        return {"started": self.started, "elapsed": time.time() - self.started, "endpoints": endpoints}
+
+    def prometheus(self) -> str:
+        """
+        metrics in Prometheus text exposition format
+        """
+
+        def escape(v: str) -> str:
+            return v.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+        def labels(method: str, ep: str, **extra: str) -> str:
+            kv = {"method": method, "endpoint": ep} | extra
+            return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in kv.items()) + "}"
+
+        counters = [
+            ("retries", "retries", "request retries"),
+            ("not_modified", "not_modified", "304 Not Modified responses"),
+            ("ratelimit_units", "units", "rate limit units consumed"),
+            ("response_bytes", "nbytes", "response body bytes"),
+        ]
+
+        lines = [
+            "# HELP gitbulk_requests_total GitHub API requests by endpoint and status",
+            "# TYPE gitbulk_requests_total counter",
+        ]
+        with self._lock:
+            stats = sorted(self.stats.items())
+
+        for (method, ep), s in stats:
+            for status, n in sorted(s.status.items()):
+                lines.append(f"gitbulk_requests_total{labels(method, ep, status=str(status))} {n}")
+
+        for name, attr, text in counters:
+            lines += [f"# HELP gitbulk_{name}_total {text}", f"# TYPE gitbulk_{name}_total counter"]
+            for (method, ep), s in stats:
+                lines.append(f"gitbulk_{name}_total{labels(method, ep)} {getattr(s, attr)}")
+
+        lines += [
+            "# HELP gitbulk_request_duration_seconds GitHub API request latency",
+            "# TYPE gitbulk_request_duration_seconds histogram",
+        ]
+        for (method, ep), s in stats:
+            cumulative = 0
+            for b, n in zip(BUCKETS, s.buckets):
+                cumulative += n
+                le = "+Inf" if b == float("inf") else str(b)
+                lines.append(
+                    f"gitbulk_request_duration_seconds_bucket{labels(method, ep, le=le)} {cumulative}"
+                )
+            lines.append(f"gitbulk_request_duration_seconds_sum{labels(method, ep)} {s.seconds:.6f}")
+            lines.append(f"gitbulk_request_duration_seconds_count{labels(method, ep)} {s.requests}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self, top: int = 20) -> str:
+        """
+        table of the endpoints with the most requests
+        """
+
+        t = self.totals()
+        lines = [
+            f"GitHub API: {t.requests} requests, {t.units} rate limit units, {t.retries} retries, "
+            f"{t.not_modified} not modified, {t.nbytes / 2**20:.1f} MiB",
+            f"{'requests':>8} {'units':>6} {'retries':>7} {'304':>5} {'KiB':>8} {'mean ms':>8} "
+            f"{'max ms':>8}  endpoint",
+        ]
+
+        with self._lock:
+            items = sorted(self.stats.items(), key=lambda kv: -kv[1].requests)
+
+        for (method, ep), s in items[:top]:
+            lines.append(
+                f"{s.requests:8d} {s.units:6d} {s.retries:7d} {s.not_modified:5d} "
+                f"{s.nbytes / 1024:8.1f} {1000 * s.seconds / s.requests:8.1f} "
+                f"{1000 * s.max_seconds:8.1f}  {method} {ep}"
+            )
+        if len(items) > top:
+            lines.append(f"... {len(items) - top} more endpoints")
+
+        return "\n".join(lines)
+
+    def write(self, fn: Path) -> None:
+        """
+        write metrics to .json, or Prometheus text format for other suffixes like .prom
+        """
+        fn = Path(fn).expanduser()
+        fn.parent.mkdir(parents=True, exist_ok=True)
+
+        if fn.suffix == ".json":
+            fn.write_text(json.dumps(self.to_dict(), indent=2))
+        else:
+            fn.write_text(self.prometheus())
+
+    def report(self, fn: Path | None = None) -> None:
+        if not self.stats:
+            return
+
+        print(self.summary(), file=sys.stderr)
+        if fn:
+            self.write(fn)
@@ -0,0 +1,155 @@
+"""
+Persistent local bare mirrors of all repos (and wikis) of a user or organization, for backup.
+
+Mirrors live under root/owner/name.git and root/owner/name.wiki.git.
+Each sync:
+
+* lists repos in bulk with get_inventory(), about one request per 100 repos
+* clones new repos with git clone --mirror
+* runs git remote update --prune on mirrors of repos whose pushed_at changed since the last sync
+* skips the rest without any network traffic
+
+git runs concurrently in a bounded pool of worker threads, one git process each.
+The pushed_at of each mirrored repo is kept in root/owner/mirror.json.
+Wiki edits don't change pushed_at, so with wikis=True existing wiki mirrors are
+updated every sync.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import json
+import logging
+import subprocess
+import time
+import typing as T
+
+import github
+import pandas
+
+from .duplicator import git
+from .graphql import RepoInfo, get_inventory
+
+URL = "ssh://git@github.com/{}.git"
+
+
+def mirror_path(root: Path, full_name: str, wiki: bool = False) -> Path:
+    return Path(root).expanduser() / (full_name + (".wiki.git" if wiki else ".git"))
+
+
+def update_mirror(url: str, path: Path) -> str:
+    """
+    clone or update one mirror
+    """
+    if path.is_dir():
+        git(["remote", "update", "--prune"], cwd=path)
+        return "updated"
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    git(["clone", "--mirror", "--quiet", url, str(path)])
+    return "cloned"
+
+
+def sync_mirrors(
+    sess: github.Github,
+    login: str,
+    root: Path,
+    workers: int = 8,
+    wikis: bool = True,
+    stem: str = "",
+    url: str = URL,
+) -> pandas.DataFrame:
+    """
+    clone or update local bare mirrors of a user or organization's repos
+
+    Parameters
+    ----------
+    sess : github.Github
+        GitHub session
+    login : str
+        user or organization name
+    root : pathlib.Path
+        directory holding the mirrors
+    workers : int, optional
+        git processes run concurrently
+    wikis : bool, optional
+        also mirror wikis
+    stem : str, optional
+        only repos whose name starts with stem
+    url : str, optional
+        clone URL template, formatted with owner/name
+
+    Results
+    -------
+    results : pandas.DataFrame
+        per repo: repo and wiki action, error, seconds
+    """
+
+    root = Path(root).expanduser()
+    state_fn = root / login / "mirror.json"
+    state: dict[str, T.Any] = json.loads(state_fn.read_text()) if state_fn.is_file() else {}
+
+    def sync(r: RepoInfo) -> dict[str, T.Any]:
+        tic = time.monotonic()
+        row: dict[str, T.Any] = {"repo": "", "wiki": "", "error": ""}
+        pushed = r.pushed_at.isoformat() if r.pushed_at else ""
+        prev = state.get(r.full_name, {})
+        changed = prev.get("pushed_at") != pushed or not mirror_path(root, r.full_name).is_dir()
+        try:
+            if changed:
+                path = mirror_path(root, r.full_name)
+                row["repo"] = update_mirror(url.format(r.full_name), path)
+            else:
+                row["repo"] = "unchanged"
+
+            if wikis:
+                wiki = mirror_path(root, r.full_name, wiki=True)
+                if not (wiki.is_dir() or changed or prev.get("wiki", True)):
+                    # known to have no wiki, rechecked when the repo changes
+                    row["wiki"] = "no wiki"
+                else:
+                    try:
+                        row["wiki"] = update_mirror(url.format(r.full_name + ".wiki"), wiki)
+                    except subprocess.CalledProcessError:
+                        if wiki.is_dir():
+                            raise
+                        row["wiki"] = "no wiki"
+
+            state[r.full_name] = {"pushed_at": pushed, "wiki": row["wiki"] != "no wiki"}
+        except subprocess.CalledProcessError as e:
+            row["error"] = (e.stderr or str(e)).strip().splitlines()[-1]
+
+        row["seconds"] = round(time.monotonic() - tic, 1)
+        return row
+
+    repos = get_inventory(sess, login, stem)
+
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(sync, r): r.full_name for r in repos}
+            try:
+                for i, f in enumerate(as_completed(futures), start=1):
+                    name = futures[f]
+                    row = results[name] = f.result()
+                    if row["repo"] != "unchanged" or row["error"]:
+                        status = f"{row['repo']} {row['wiki']} {row['error']}"
+                        print(f"{i}/{len(futures)} {name}: {status}")
+            except KeyboardInterrupt:
+                # don't start the queued clones, only wait for the running ones
+                pool.shutdown(cancel_futures=True)
+                raise
+    finally:
+        # progress is kept even if interrupted
+        state_fn.parent.mkdir(parents=True, exist_ok=True)
+        state_fn.write_text(json.dumps(state, indent=1))
+
+    listed = {n for n in state if n.split("/")[-1].startswith(stem)}
+    if gone := listed.difference(results):
+        logging.info(f"kept {len(gone)} mirrors of repos no longer listed: {' '.join(sorted(gone))}")
+
+    columns = ["repo", "wiki", "error", "seconds"]
+    return (
+        pandas.DataFrame.from_dict(results, orient="index", columns=columns)
+        .rename_axis("name")
+        .sort_index()
+    )
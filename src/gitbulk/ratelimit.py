@@ -0,0 +1,221 @@
+"""
+Rate limit scheduler driven by the X-RateLimit-* headers of every response,
+so no extra /rate_limit requests are needed.
+
+https://docs.github.com/en/rest/using-the-rest-api/rate-limits-for-the-rest-api
+
+* primary limit: when the budget is low, requests are spread evenly over the time
+  left until reset; when it's exhausted, requests wait until reset.
+* secondary limit: 403 / 429 responses are retried after Retry-After,
+  or with exponential backoff.
+* content-creating requests (POST, PATCH, PUT, DELETE, GraphQL mutations) are
+  additionally paced to one per write_interval seconds, as GitHub recommends.
+"""
+
+from dataclasses import dataclass
+import hashlib
+import logging
+import threading
+import time
+import urllib.parse
+
+import requests
+
+WRITE_METHODS = {"POST", "PATCH", "PUT", "DELETE"}
+
+
+@dataclass
+class Budget:
+    remaining: int
+    limit: int
+    reset: float
+    # last send time handed out while spreading, so concurrent requests get successive slots
+    next_send: float = 0.0
+
+
+def auth_identity(authorization: str) -> str:
+    """
+    short hash of an Authorization header, as rate limits are per token
+    """
+    return hashlib.sha256(authorization.encode()).hexdigest()[:16]
+
+
+def identity(request: requests.PreparedRequest) -> str:
+    return auth_identity(request.headers.get("Authorization", ""))
+
+
+def resource(request: requests.PreparedRequest) -> str:
+    """
+    rate limit resource a request counts against
+    """
+    path = urllib.parse.urlsplit(request.url or "").path
+    if path.endswith("/graphql"):
+        return "graphql"
+    if "/search/" in path:
+        return "search"
+    return "core"
+
+
+def is_write(request: requests.PreparedRequest) -> bool:
+    if resource(request) == "graphql":
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode()
+        return b"mutation" in body
+
+    return request.method in WRITE_METHODS
+
+
+def is_secondary(response: requests.Response) -> bool:
+    if response.status_code not in {403, 429}:
+        return False
+    if "retry-after" in response.headers:
+        return True
+
+    return "secondary rate limit" in response.text.lower()
+
+
+def is_primary(response: requests.Response) -> bool:
+    return (
+        response.status_code in {403, 429}
+        and response.headers.get("x-ratelimit-remaining") == "0"
+    )
+
+
+class RateLimiter:
+    """
+    session middleware pacing requests from the rate limit response headers
+
+    Parameters
+    ----------
+    spread : float, optional
+        below this fraction of the limit remaining, spread requests evenly until reset
+    write_interval : float, optional
+        minimum seconds between content-creating requests
+    max_retries : int, optional
+        retries of a request hitting a rate limit
+    backoff : float, optional
+        first wait in seconds for secondary rate limits without Retry-After, doubling on each retry
+    wait_exhausted : bool, optional
+        wait for reset when a token's budget is exhausted.
+        False returns the rate limit response, for a TokenPool to fail over to another token.
+    """
+
+    handles_rate_limit = True
+
+    def __init__(
+        self,
+        spread: float = 0.1,
+        write_interval: float = 1.0,
+        max_retries: int = 5,
+        backoff: float = 60.0,
+        wait_exhausted: bool = True,
+    ):
+        self.spread = spread
+        self.write_interval = write_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.wait_exhausted = wait_exhausted
+
+        self.budgets: dict[tuple[str, str], Budget] = {}
+        self.waited = 0.0
+
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._last_write = 0.0
+
+    def budget(self, ident: str, res: str = "core") -> Budget | None:
+        return self.budgets.get((ident, res))
+
+    def delay(self, ident: str, res: str) -> float:
+        """
+        seconds to wait before sending, reserving one request of the budget
+
+        While spreading, each request reserves the next free slot,
+        so concurrent threads are staggered rather than sleeping alike and sending together.
+        """
+
+        with self._lock:
+            b = self.budgets.get((ident, res))
+            if b is None:
+                return 0.0
+
+            now = time.time()
+            if now >= b.reset:
+                # window passed, the next response tells the new budget
+                return 0.0
+
+            wait = 0.0
+            if b.remaining <= 0:
+                if not self.wait_exhausted:
+                    return 0.0
+                wait = b.reset - now + 1
+            elif b.remaining < self.spread * b.limit:
+                start = max(now, b.next_send)
+                b.next_send = start + (b.reset - start) / b.remaining
+                wait = b.next_send - now
+
+            b.remaining -= 1
+
+        return wait
+
+    def update(self, ident: str, res: str, response: requests.Response) -> None:
+        h = response.headers
+        if "x-ratelimit-remaining" not in h:
+            return
+
+        res = h.get("x-ratelimit-resource", res)
+        with self._lock:
+            b = Budget(
+                int(h["x-ratelimit-remaining"]),
+                int(h.get("x-ratelimit-limit", 0)),
+                float(h.get("x-ratelimit-reset", 0)),
+            )
+            if (old := self.budgets.get((ident, res))) and old.reset == b.reset:
+                # slots already handed out in this window still hold
+                b.next_send = old.next_send
+            self.budgets[(ident, res)] = b
+
+    def sleep(self, seconds: float, why: str) -> None:
+        if seconds <= 0:
+            return
+        if seconds > 5:
+            logging.warning(f"{why}: waiting {seconds:.0f} seconds")
+        self.waited += seconds
+        time.sleep(seconds)
+
+    def pace_write(self) -> None:
+        with self._write_lock:
+            wait = self._last_write + self.write_interval - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_write = time.time()
+
+    def send(self, request, send_next) -> requests.Response:
+        ident = identity(request)
+        res = resource(request)
+        write = is_write(request)
+
+        for attempt in range(self.max_retries + 1):
+            self.sleep(self.delay(ident, res), f"GitHub {res} API rate limit low")
+            if write:
+                self.pace_write()
+
+            response = send_next(request)
+            self.update(ident, res, response)
+
+            if attempt == self.max_retries:
+                break
+
+            if is_primary(response):
+                if not self.wait_exhausted:
+                    break
+                b = self.budgets[(ident, response.headers.get("x-ratelimit-resource", res))]
+                self.sleep(b.reset - time.time() + 1, f"GitHub {res} API rate limit exhausted")
+            elif is_secondary(response):
+                wait = float(response.headers.get("retry-after", self.backoff * 2**attempt))
+                self.sleep(wait, "GitHub secondary rate limit")
+            else:
+                break
+
+        return response
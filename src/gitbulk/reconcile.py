@@ -0,0 +1,345 @@
+"""
+Declarative reconciliation of organization repos, teams, team repo permissions and team members.
+
+Instead of checking and changing one spreadsheet row at a time:
+
+1. the desired state comes from a roster spreadsheet (spec_from_roster) or YAML (load_spec)
+2. the current state is fetched in bulk with GraphQL (fetch_state):
+   one query per 100 repos and one per 50 teams with their members and repos
+3. plan() computes the changes needed, which are printed for review
+4. apply() makes only those changes, in parallel
+
+Re-running a converged roster costs only the bulk fetch.
+Reconciliation is additive: repos, teams, permissions and members not in the spec are left alone,
+team permissions are only raised unless downgrades are asked for,
+and pending team invitations count as members.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+import logging
+import typing as T
+
+import github
+import pandas
+
+from .directory import OrgDirectory
+from .graphql import get_inventory, graphql
+from .users import resolve_users
+
+# GraphQL repository permission: REST permission
+PERMISSIONS = {
+    "READ": "pull",
+    "TRIAGE": "triage",
+    "WRITE": "push",
+    "MAINTAIN": "maintain",
+    "ADMIN": "admin",
+}
+
+# REST permissions, lowest first
+RANKS = ["pull", "triage", "push", "maintain", "admin"]
+
+TEAMS_QUERY = """
+query($login: String!, $cursor: String) {
+  organization(login: $login) {
+    teams(first: 50, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        slug
+        members(first: 100, membership: IMMEDIATE) {
+          pageInfo { hasNextPage }
+          nodes { login }
+        }
+        invitations(first: 100) {
+          pageInfo { hasNextPage }
+          nodes { invitee { login } }
+        }
+        repositories(first: 100) {
+          pageInfo { hasNextPage }
+          edges { permission node { name } }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+@dataclass
+class TeamSpec:
+    members: set[str] = field(default_factory=set)
+    # repo name: permission pull, triage, push, maintain or admin
+    repos: dict[str, str] = field(default_factory=dict)
+    # logins with a pending invitation to the team, in fetched state only
+    invited: set[str] = field(default_factory=set)
+
+
+@dataclass
+class OrgSpec:
+    # repo name: private
+    repos: dict[str, bool] = field(default_factory=dict)
+    teams: dict[str, TeamSpec] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Change:
+    action: str
+    team: str = ""
+    repo: str = ""
+    login: str = ""
+    permission: str = ""
+    private: bool = False
+
+    def __str__(self) -> str:
+        match self.action:
+            case "create_repo":
+                return f"+ repo {self.repo} ({'private' if self.private else 'public'})"
+            case "create_team":
+                return f"+ team {self.team}"
+            case "set_permission":
+                return f"~ team {self.team}: repo {self.repo} {self.permission}"
+            case "add_member":
+                return f"+ team {self.team}: member {self.login}"
+        return f"{self.action} {self.team} {self.repo} {self.login}"
+
+
+def load_spec(fn: Path) -> OrgSpec:
+    """
+    desired state from YAML like:
+
+        repos:
+          sw01-robots: {private: true}
+        teams:
+          sw01-robots:
+            members: [alice, bob]
+            repos: {sw01-robots: push}
+
+    Requires PyYAML.
+    """
+
+    import yaml
+
+    raw = yaml.safe_load(Path(fn).expanduser().read_text()) or {}
+
+    spec = OrgSpec()
+    for name, opts in (raw.get("repos") or {}).items():
+        spec.repos[name] = bool((opts or {}).get("private", False))
+    for name, opts in (raw.get("teams") or {}).items():
+        opts = opts or {}
+        spec.teams[name] = TeamSpec(set(opts.get("members", [])), dict(opts.get("repos", {})))
+
+    return spec
+
+
+def spec_from_roster(
+    rows: pandas.DataFrame,
+    stem: str = "",
+    private: bool = True,
+    permission: str = "push",
+    username: str = "GitHub",
+    team: str = "Team",
+    name: str | None = "Name",
+) -> OrgSpec:
+    """
+    desired state from a roster spreadsheet as used by AddRepoMembers.py:
+    each team has one repo of the same name, and each row adds a member to a team.
+
+    Parameters
+    ----------
+    rows : pandas.DataFrame
+        roster with columns username, team number and optionally team name
+    stem : str, optional
+        beginning of repo and team names
+    private : bool, optional
+        repos are private
+    permission : str, optional
+        team permission on its repo
+    username, team, name : str, optional
+        column names of username, team number and team name. name None: no team names
+    """
+
+    spec = OrgSpec()
+
+    for _, row in rows.iterrows():
+        if name is not None and name in row:
+            repo_name = f"{stem}{row[team]:02.0f}-{row[name]}"
+        else:
+            repo_name = f"{stem}{row[team]}"
+
+        spec.repos[repo_name] = private
+        t = spec.teams.setdefault(repo_name, TeamSpec())
+        t.members.add(row[username].strip())
+        t.repos[repo_name] = permission
+
+    return spec
+
+
+def fetch_state(sess: github.Github, orgname: str) -> OrgSpec:
+    """
+    current state of an organization, fetched in bulk
+
+    Teams with more than 100 members, invitations or repos fall back to REST listing for that team.
+    """
+
+    state = OrgSpec()
+    for r in get_inventory(sess, orgname):
+        state.repos[r.name] = r.private
+
+    org = None
+    cursor = None
+    while True:
+        data = graphql(sess, TEAMS_QUERY, {"login": orgname, "cursor": cursor})
+        if not data["organization"]:
+            raise ValueError(f"organization {orgname} not found on GitHub")
+
+        page = data["organization"]["teams"]
+        for t in page["nodes"]:
+            members = {m["login"] for m in t["members"]["nodes"]}
+            # invitations by email have no invitee
+            invited = {i["invitee"]["login"] for i in t["invitations"]["nodes"] if i["invitee"]}
+            repos = {e["node"]["name"]: PERMISSIONS[e["permission"]] for e in t["repositories"]["edges"]}
+
+            paged = ("members", "invitations", "repositories")
+            if any(t[k]["pageInfo"]["hasNextPage"] for k in paged):
+                org = org or sess.get_organization(orgname)
+                team = org.get_team_by_slug(t["slug"])
+                members = {m.login for m in team.get_members(role="all")}
+                invited = {u.login for u in team.invitations() if u.login}
+                repos = {r.name: _rest_permission(r.permissions) for r in team.get_repos()}
+
+            state.teams[t["name"]] = TeamSpec(members, repos, invited)
+
+        if not page["pageInfo"]["hasNextPage"]:
+            break
+        cursor = page["pageInfo"]["endCursor"]
+
+    return state
+
+
+def _rank(permission: str | None) -> int:
+    return RANKS.index(permission) if permission in RANKS else -1
+
+
+def _rest_permission(p: T.Any) -> str:
+    for perm in ("admin", "maintain", "push", "triage", "pull"):
+        if getattr(p, perm, False):
+            return perm
+    return ""
+
+
+def plan(current: OrgSpec, desired: OrgSpec, downgrade: bool = False) -> list[Change]:
+    """
+    changes that bring the current state to the desired state.
+    Names and logins compare case-insensitively, as on GitHub.
+
+    Parameters
+    ----------
+    current : OrgSpec
+        from fetch_state()
+    desired : OrgSpec
+        from spec_from_roster() or load_spec()
+    downgrade : bool, optional
+        also lower team permissions above the desired ones, else only raise them
+    """
+
+    changes: list[Change] = []
+
+    have_repos = {r.casefold() for r in current.repos}
+    for repo, private in desired.repos.items():
+        if repo.casefold() not in have_repos:
+            changes.append(Change("create_repo", repo=repo, private=private))
+
+    have_teams = {n.casefold(): t for n, t in current.teams.items()}
+    for name, want in desired.teams.items():
+        have = have_teams.get(name.casefold())
+        if have is None:
+            changes.append(Change("create_team", team=name))
+            have = TeamSpec()
+
+        have_perm = {r.casefold(): p for r, p in have.repos.items()}
+        for repo, perm in want.repos.items():
+            cur = have_perm.get(repo.casefold())
+            if cur == perm or (not downgrade and _rank(cur) > _rank(perm)):
+                continue
+            changes.append(Change("set_permission", team=name, repo=repo, permission=perm))
+
+        # an invited login becomes a member on accepting, so isn't invited again
+        have_members = {m.casefold() for m in have.members | have.invited}
+        for login in sorted(want.members):
+            if login.casefold() not in have_members:
+                changes.append(Change("add_member", team=name, login=login))
+
+    return changes
+
+
+def apply(
+    op: github.Organization.Organization,
+    sess: github.Github,
+    changes: T.Sequence[Change],
+    workers: int = 4,
+) -> list[tuple[Change, str]]:
+    """
+    make the planned changes.
+    Repos are created first, then teams, then permissions and members, each step in parallel.
+
+    Parameters
+    ----------
+    op : github.Organization.Organization
+        organization handle
+    sess : github.Github
+        GitHub session
+    changes : list of Change
+        from plan()
+    workers : int, optional
+        number of changes made concurrently
+
+    Results
+    -------
+    failed : list of tuple of Change, str
+        changes that failed, with the error
+    """
+
+    if not changes:
+        return []
+
+    directory = OrgDirectory(op, ttl=None)
+    directory.refresh()
+
+    users, unknown = resolve_users(sess, (c.login for c in changes if c.action == "add_member"))
+    unknown_users = {u.casefold() for u in unknown}
+
+    def make(c: Change) -> tuple[Change, str] | None:
+        try:
+            match c.action:
+                case "create_repo":
+                    directory.create_repo(c.repo, private=c.private)
+                case "create_team":
+                    directory.create_team(c.team, privacy="closed")
+                case "set_permission":
+                    # returns False instead of raising on failure
+                    if not directory.team(c.team).update_team_repository(
+                        f"{op.login}/{c.repo}", c.permission
+                    ):
+                        logging.error(f"{c}: permission not set")
+                        return c, "permission not set"
+                case "add_member":
+                    if c.login.casefold() in unknown_users:
+                        return c, "unknown GitHub username"
+                    directory.team(c.team).add_membership(users[c.login.casefold()], role="member")
+        except (github.GithubException, KeyError) as e:
+            logging.error(f"{c}: {e}")
+            return c, str(e)
+
+        print(c)
+        return None
+
+    failed: list[tuple[Change, str]] = []
+    steps = (("create_repo",), ("create_team",), ("set_permission", "add_member"))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for actions in steps:
+            step = [c for c in changes if c.action in actions]
+            failed += [f for f in pool.map(make, step) if f]
+
+    return failed
@@ -1,14 +1,22 @@
 """
 How many total GitHub stars do you have?
+
+Also per-repo commit statistics from GitHub's precomputed statistics endpoints,
+one or two requests per repo instead of one per commit.
 """
 
 
-from time import sleep
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import github
+import json
 import logging
+import time
+import typing as T
+
+import pandas
 
-from .base import check_api_limit, session, get_repos, user_or_org
+from .base import api_pace, check_api_limit, session, get_repos, user_or_org
 
 
 def repo_prober(
@@ -17,6 +25,7 @@ def repo_prober(
     branch: str | None = None,
     starsonly: bool = False,
     verbose: bool = False,
+    workers: int = 1,
 ) -> tuple[list[tuple[str, int, int]], list[tuple[str, int]]]:
     """
     probe all GitHub repos for a user to see how much forks of each repo are ahead.
@@ -34,6 +43,8 @@ def repo_prober(
         far faster to only count forks and stars
     verbose : bool, optional
         verbosity
+    workers : int, optional
+        number of forks to probe concurrently
 
     Results
     -------
@@ -54,12 +65,12 @@ def repo_prober(
 
     for repo in repos:
         if not starsonly:
-            ahead += fork_prober(repo, sess, ahead, branch, verbose)
+            fork_prober(repo, sess, ahead, branch, verbose, workers)
 
         counts.append((repo.name, repo.forks_count, repo.stargazers_count))  # type: ignore
         # FIXME: bug in PyGithub fixed by https://github.com/PyGithub/PyGithub/pull/1513
 
-        check_api_limit(sess)
+        api_pace(sess)
 
     return counts, ahead
 
@@ -70,10 +81,16 @@ def fork_prober(
     ahead: list[tuple[str, int]],
     branch: str | None = None,
     verbose: bool = False,
+    workers: int = 1,
 ) -> list[tuple[str, int]]:
     """
     check a GitHub repo for forks
 
+    Forks are probed concurrently by "workers" threads, pacing from the rate limit
+    headers of the responses rather than fixed sleeps.
+    Results are appended to "ahead" in the order GitHub lists the forks,
+    regardless of the number of workers.
+
     Parameters
     ----------
     repo :
@@ -86,13 +103,15 @@ def fork_prober(
         Git branch to examine
     verbose : bool, optional
         verbosity
+    workers : int, optional
+        number of forks to probe concurrently
 
     Results
     -------
     ahead : list of tuple of str, int
         forked with repos with number of commits they're ahead of your repo
     """
-    check_api_limit(sess)
+    api_pace(sess)
 
     b = repo.default_branch if not branch else branch
 
@@ -102,11 +121,9 @@ def fork_prober(
         logging.error(f"{repo.full_name}  {e}")
         return ahead
 
-    forks = repo.get_forks()
-    for fork in forks:
-        sleep(0.1)  # don't hammer the API, avoiding 502 errors
-
-        check_api_limit(sess)
+    def probe(fork: github.Repository.Repository) -> tuple[str, int, int] | None:
+        # each probe makes two requests
+        api_pace(sess, 2 * workers)
 
         try:
             fmaster = fork.get_branch(b)
@@ -114,25 +131,161 @@ def fork_prober(
             if (
                 e.data["message"] == "Not Found"
             ):  # repo/branch that they deleted  FIXME: should we check their default branch?
-                continue
+                return None
 
             logging.error(f"{repo.full_name} {fork.full_name}  {e}")
-            continue
+            return None
 
         try:
             comp = repo.compare(master.commit.sha, fmaster.commit.sha)
         except github.GithubException as excp:
             # if excp.data["message"].startswith("No common ancestor"):
-            #     continue
+            #     return None
 
             logging.error(f"{repo.full_name} {fork.full_name}  {excp}")
-            continue
+            return None
 
-        if comp.ahead_by:
-            ahead.append((fork.full_name, comp.ahead_by))
-            print(f"{fork.full_name} ahead by {comp.ahead_by}", end="")
-            if verbose and comp.behind_by:
-                print(f"behind by {comp.behind_by}", end="")
-            print()
+        return fork.full_name, comp.ahead_by, comp.behind_by
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # map() yields in submission order, so output is deterministic
+        for probed in pool.map(probe, repo.get_forks()):
+            if not probed:
+                continue
+
+            name, ahead_by, behind_by = probed
+            if ahead_by:
+                ahead.append((name, ahead_by))
+                print(f"{name} ahead by {ahead_by}", end="")
+                if verbose and behind_by:
+                    print(f"behind by {behind_by}", end="")
+                print()
 
     return ahead
+
+
+def fetch_stats(
+    sess: github.Github,
+    repos: T.Iterable[str],
+    endpoint: str = "contributors",
+    workers: int = 8,
+    max_wait: float = 300.0,
+    backoff: float = 2.0,
+) -> dict[str, T.Any]:
+    """
+    GitHub repository statistics of many repos
+
+    GitHub answers 202 while it computes statistics that aren't cached.
+    All repos are requested concurrently, which starts computation for all of them,
+    then the pending ones are polled with exponential backoff.
+
+    Parameters
+    ----------
+    sess : github.Github
+        GitHub session
+    repos : iterable of str
+        owner/name of repos
+    endpoint : str, optional
+        "contributors", "commit_activity", "code_frequency", "participation" or "punch_card"
+    workers : int, optional
+        concurrent requests
+    max_wait : float, optional
+        seconds to keep polling pending repos
+    backoff : float, optional
+        first wait between polls in seconds, doubling up to a minute
+
+    Results
+    -------
+    stats : dict of str, list
+        repo: decoded statistics. Empty list for empty repos.
+        Repos still pending after max_wait, or failing, are logged and left out.
+    """
+
+    req = sess.requester
+
+    def fetch(name: str) -> tuple[int, T.Any]:
+        # raw request, to tell 202 "computing" from 204 "empty repo"
+        status, _, output = req.requestJson("GET", f"/repos/{name}/stats/{endpoint}")
+        if status >= 400:
+            # one missing or blocked repo doesn't abort the others
+            logging.error(f"{name} {endpoint} statistics: {status} {output}")
+        return status, json.loads(output) if status == 200 and output else []
+
+    stats: dict[str, T.Any] = {}
+    pending = list(repos)
+    deadline = time.monotonic() + max_wait
+    delay = backoff
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending:
+            still = []
+            for name, (status, data) in zip(pending, pool.map(fetch, pending)):
+                if status == 202:
+                    still.append(name)
+                elif status < 400:
+                    stats[name] = data
+            pending = still
+
+            if not pending:
+                break
+            if time.monotonic() + delay > deadline:
+                logging.error(f"{endpoint} statistics still computing: {' '.join(pending)}")
+                break
+
+            logging.info(f"{len(pending)} repos computing {endpoint} statistics, retry in {delay:.0f} s")
+            time.sleep(delay)
+            delay = min(2 * delay, 60.0)
+
+    return stats
+
+
+def contributor_stats(
+    sess: github.Github, repos: T.Iterable[str], workers: int = 8, max_wait: float = 300.0
+) -> pandas.DataFrame:
+    """
+    weekly additions, deletions and commits per author of many repos,
+    from /stats/contributors
+
+    Results
+    -------
+    table : pandas.DataFrame
+        columns repo, author, time (start of week, UTC), additions, deletions, commits,
+        one row per author-week with activity
+    """
+
+    stats = fetch_stats(sess, repos, "contributors", workers, max_wait)
+
+    records = [
+        (repo, c["author"]["login"] if c.get("author") else "", w["w"], w["a"], w["d"], w["c"])
+        for repo, contributors in stats.items()
+        for c in contributors
+        for w in c["weeks"]
+        if w["a"] or w["d"] or w["c"]
+    ]
+    table = pandas.DataFrame.from_records(
+        records, columns=["repo", "author", "time", "additions", "deletions", "commits"]
+    )
+    table["time"] = pandas.to_datetime(table["time"], unit="s", utc=True)
+
+    return table.astype({"repo": "category", "author": "category"})
+
+
+def commit_activity(
+    sess: github.Github, repos: T.Iterable[str], workers: int = 8, max_wait: float = 300.0
+) -> pandas.DataFrame:
+    """
+    weekly commits of the last year of many repos, from /stats/commit_activity
+
+    Results
+    -------
+    table : pandas.DataFrame
+        columns repo, time (start of week, UTC), commits
+    """
+
+    stats = fetch_stats(sess, repos, "commit_activity", workers, max_wait)
+
+    records = [(repo, w["week"], w["total"]) for repo, weeks in stats.items() for w in weeks]
+    table = pandas.DataFrame.from_records(records, columns=["repo", "time", "commits"])
+    table["time"] = pandas.to_datetime(table["time"], unit="s", utc=True)
+
+    return table.astype({"repo": "category"})
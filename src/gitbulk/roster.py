@@ -0,0 +1,184 @@
+"""
+Roster spreadsheet loader shared by the scripts.
+
+Parsing a large .xlsx with openpyxl can take tens of seconds, every run.
+read_roster() parses only the requested sheet and columns, normalizes them (whitespace
+stripped, empty rows dropped) and keeps a pickled copy under cache_dir()/roster,
+keyed by sheet and columns, reused until the file's modification time or size changes.
+GitHub logins are validated and deduplicated with vectorized string operations.
+"""
+
+from pathlib import Path
+import functools
+import hashlib
+import logging
+import pickle
+import re
+import typing as T
+
+import pandas
+
+from .base import cache_dir
+
+# alphanumeric or single hyphens, not at either end, up to 39 characters.
+# No lookahead, which the pyarrow string engine (RE2) doesn't support.
+LOGIN = r"[A-Za-z0-9](?:-?[A-Za-z0-9])*"
+
+
+def _letters(spec: str) -> list[int] | None:
+    """
+    positions of Excel column letters like "A, D" or "C:E", None if spec isn't letters
+    """
+
+    def pos(col: str) -> int:
+        n = 0
+        for ch in col:
+            n = n * 26 + ord(ch) - ord("A") + 1
+        return n - 1
+
+    cols: list[int] = []
+    for part in spec.upper().replace(" ", "").split(","):
+        if not (m := re.fullmatch(r"([A-Z]{1,3})(?::([A-Z]{1,3}))?", part)):
+            return None
+        first = pos(m[1])
+        cols += range(first, pos(m[2]) + 1) if m[2] else [first]
+
+    return cols
+
+
+def _positions(columns: pandas.Index, usecols: T.Any) -> list[int]:
+    """
+    positions of columns by name, position, or Excel letters, as pandas.read_excel usecols
+    """
+    if isinstance(usecols, (str, int)):
+        usecols = [usecols]
+
+    positions: list[int] = []
+    for c in usecols:
+        if isinstance(c, int):
+            positions.append(c)
+        elif c in columns:
+            positions.append(columns.get_loc(c))
+        elif (letters := _letters(c)) is not None:
+            positions += letters
+        else:
+            raise KeyError(f"column {c} not in roster columns {list(columns)}")
+
+    return positions
+
+
+def _normalize(df: pandas.DataFrame) -> pandas.DataFrame:
+    for c in df.columns:
+        s = df[c]
+        if s.dtype == object or pandas.api.types.is_string_dtype(s):
+            df[c] = s.str.strip().where(s.map(type).eq(str), s)
+    return df.dropna(how="all").reset_index(drop=True)
+
+
+def _read(fn: Path, usecols: T.Any, sheet: str | int, cache: bool) -> pandas.DataFrame:
+    """
+    selected columns of one sheet, or of a .csv, parsed once per file version and selection
+    """
+
+    stat = fn.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    key = f"{fn}|{sheet!r}|{usecols!r}"
+    cfn = cache_dir() / "roster" / (hashlib.sha256(key.encode()).hexdigest()[:16] + ".pkl")
+
+    if cache and cfn.is_file():
+        try:
+            cached = pickle.loads(cfn.read_bytes())
+            if cached["version"] == version:
+                return cached["roster"]
+        except Exception as e:
+            # e.g. written by another pandas version: parse the spreadsheet again
+            logging.info(f"roster cache {cfn}: {e}")
+
+    read: T.Callable[..., pandas.DataFrame]
+    match fn.suffix.lower():
+        case ".xls" | ".xlsx" | ".xlsm" | ".ods":
+            read = functools.partial(pandas.read_excel, fn, sheet_name=sheet)
+        case ".csv":
+            read = functools.partial(pandas.read_csv, fn)
+        case _:
+            raise ValueError(f"Unknown file type {fn}")
+
+    if usecols is None:
+        df = read()
+    else:
+        # the header row resolves names and letters, then only those columns are parsed
+        positions = _positions(read(nrows=0).columns, usecols)
+        parsed = sorted(set(positions))
+        df = read(usecols=parsed).iloc[:, [parsed.index(i) for i in positions]]
+
+    df = _normalize(df)
+
+    if cache:
+        cfn.parent.mkdir(parents=True, exist_ok=True)
+        cfn.write_bytes(pickle.dumps({"key": key, "version": version, "roster": df}))
+
+    return df
+
+
+def read_roster(
+    fn: Path,
+    usecols: T.Any = None,
+    sheet: str | int = 0,
+    login: str | int | None = None,
+    dropna: bool = True,
+    cache: bool = True,
+) -> pandas.DataFrame:
+    """
+    read roster spreadsheet (.xlsx, .xls, .ods or .csv)
+
+    Parameters
+    ----------
+    fn : pathlib.Path
+        spreadsheet file
+    usecols : str or int or list, optional
+        columns by header name, 0-based position, or Excel letters like "A, D" or "C:E"
+    sheet : str or int, optional
+        sheet name or 0-based position, ignored for .csv
+    login : str or int, optional
+        column of GitHub usernames, by name or position among the selected columns.
+        Logins must be valid GitHub usernames, and rows that repeat
+        another row except for login case are dropped.
+    dropna : bool, optional
+        drop rows with any empty selected column
+    cache : bool, optional
+        reuse the parsed copy under cache_dir() while the file is unchanged
+
+    Results
+    -------
+    roster : pandas.DataFrame
+        selected columns; use .squeeze(axis=1) for a single column as Series
+
+    Raises
+    ------
+    ValueError
+        for invalid GitHub usernames, listing all of them
+    """
+
+    fn = Path(fn).expanduser().resolve()
+    df = _read(fn, usecols, 0 if fn.suffix.lower() == ".csv" else sheet, cache)
+
+    if dropna:
+        df = df.dropna(how="any")
+
+    if login is None:
+        return df.reset_index(drop=True)
+
+    col = df.columns[login] if isinstance(login, int) else login
+    logins = df[col].astype(str)
+
+    valid = logins.str.fullmatch(LOGIN) & (logins.str.len() <= 39)
+    if bad := logins[~valid].tolist():
+        raise ValueError(f"invalid GitHub usernames in {fn}: {' '.join(bad)}")
+
+    df = df.copy()
+    df[col] = logins
+    # GitHub logins are case-insensitive
+    key = df.copy()
+    key[col] = logins.str.casefold()
+
+    return df[~key.duplicated()].reset_index(drop=True)
@@ -0,0 +1,163 @@
+"""
+Sync template files, like CI workflows, into many repos.
+
+Instead of downloading each file to compare it, the git blob SHA of each template file
+is computed locally and compared with the repo's tree listing: two requests per repo,
+no content transfer for repos that are up to date.
+Changed files of a repo are written in one commit through the Git Data API
+(blobs, tree, commit, ref) rather than one Contents API commit per file.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import base64
+import hashlib
+import logging
+import typing as T
+
+import github
+
+from .base import lazy_repo
+
+
+def blob_sha(data: bytes) -> str:
+    """
+    git blob SHA of data, as git hash-object
+    """
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def template_files(src: Path, target: str) -> dict[str, bytes]:
+    """
+    files to put in repos
+
+    Parameters
+    ----------
+    src : pathlib.Path
+        template file, or directory of template files
+    target : str
+        path in repos of the file, or of the directory
+
+    Results
+    -------
+    files : dict of str, bytes
+        path in repo: content
+    """
+
+    src = Path(src).expanduser()
+    target = target.strip("/")
+
+    if src.is_file():
+        return {target: src.read_bytes()}
+
+    return {
+        f"{target}/{f.relative_to(src).as_posix()}".lstrip("/"): f.read_bytes()
+        for f in sorted(src.rglob("*"))
+        if f.is_file()
+    }
+
+
+def _element(repo: github.Repository.Repository, path: str, data: bytes, mode: str) -> T.Any:
+    try:
+        return github.InputGitTreeElement(path, mode, "blob", content=data.decode("utf8"))
+    except UnicodeDecodeError:
+        blob = repo.create_git_blob(base64.b64encode(data).decode("ascii"), "base64")
+        return github.InputGitTreeElement(path, mode, "blob", sha=blob.sha)
+
+
+def sync_template(
+    repo: github.Repository.Repository,
+    files: dict[str, bytes],
+    message: str,
+    branch: str | None = None,
+) -> str:
+    """
+    make files in a repo branch match the template, in one commit
+
+    Parameters
+    ----------
+    repo : github.Repository.Repository
+        repo handle, can be lazy
+    files : dict of str, bytes
+        path in repo: content, from template_files()
+    message : str
+        commit message
+    branch : str, optional
+        branch to commit to, default: the repo default branch
+
+    Results
+    -------
+    status : str
+        "up to date", "committed N files" or "created N files" for an empty repo
+    """
+
+    try:
+        head = repo.get_branch(branch or repo.default_branch).commit.commit
+    except github.GithubException as e:
+        if e.status not in {404, 409}:
+            raise
+        # empty repo: the Git Data API needs an existing commit
+        for path, data in files.items():
+            repo.create_file(path, message, data)
+        return f"created {len(files)} files"
+
+    tree = repo.get_git_tree(head.tree.sha, recursive=True)
+    if tree.truncated:
+        logging.warning(f"{repo.full_name}: tree listing truncated, unlisted files are rewritten")
+
+    remote = {e.path: (e.sha, e.mode) for e in tree.tree if e.type == "blob"}
+    changed = {p: d for p, d in files.items() if remote.get(p, ("", ""))[0] != blob_sha(d)}
+    if not changed:
+        return "up to date"
+
+    elements = [_element(repo, p, d, remote.get(p, ("", "100644"))[1]) for p, d in changed.items()]
+    new_tree = repo.create_git_tree(elements, tree)
+    if new_tree.sha == tree.sha:
+        return "up to date"
+
+    commit = repo.create_git_commit(message, new_tree, [head])
+    repo.get_git_ref(f"heads/{branch or repo.default_branch}").edit(commit.sha)
+
+    return f"committed {len(changed)} files"
+
+
+def sync_templates(
+    sess: github.Github,
+    repos: T.Iterable[tuple[str, str]],
+    files: dict[str, bytes],
+    message: str,
+    workers: int = 4,
+) -> T.Iterator[tuple[str, str]]:
+    """
+    sync_template() across many repos concurrently, yielding each repo as it completes
+
+    Parameters
+    ----------
+    sess : github.Github
+        GitHub session
+    repos : iterable of tuple of str, str
+        owner/name and branch of repos, such as RepoInfo full_name and default_branch
+    files : dict of str, bytes
+        path in repo: content, from template_files()
+    message : str
+        commit message
+    workers : int, optional
+        repos synced concurrently
+
+    Yields
+    ------
+    full_name, status : str, str
+        status from sync_template(), or the error
+    """
+
+    def sync(full_name: str, branch: str) -> str:
+        return sync_template(lazy_repo(sess, full_name), files, message, branch)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(sync, name, branch): name for name, branch in repos}
+        for f in as_completed(futures):
+            try:
+                yield futures[f], f.result()
+            except github.GithubException as e:
+                logging.error(f"{futures[f]}: {e}")
+                yield futures[f], f"error: {e.status}"
@@ -0,0 +1,80 @@
+"""
+offline check of the asyncio client against a local HTTP server
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import asyncio
+import json
+import threading
+import urllib.parse
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+import github  # noqa: E402
+
+from gitbulk import aio  # noqa: E402
+
+PAGES = 5
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        u = urllib.parse.urlsplit(self.path)
+        page = int(urllib.parse.parse_qs(u.query).get("page", ["1"])[0])
+
+        if u.path == "/users/myorg":
+            body = {"login": "myorg", "id": 1, "type": "Organization"}
+            link = ""
+        elif u.path == "/orgs/myorg/repos":
+            body = [
+                {"name": f"repo{page}-{i}", "full_name": f"myorg/repo{page}-{i}"} for i in range(3)
+            ]
+            base = f"http://{self.headers['Host']}{u.path}?per_page=3"
+            link = f'<{base}&page={page + 1}>; rel="next", <{base}&page={PAGES}>; rel="last"'
+        else:
+            self.send_response(404)
+            self.end_headers()
+            self.wfile.write(b'{"message": "Not Found"}')
+            return
+
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-RateLimit-Remaining", "4999")
+        self.send_header("X-RateLimit-Reset", "9999999999")
+        if link and page < PAGES:
+            self.send_header("Link", link)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def test_aio_repos(server, monkeypatch):
+    # as the sync session, the API URL defaults to GITHUB_API_URL
+    monkeypatch.setenv("GITHUB_API_URL", server)
+
+    async def main():
+        async with aio.AsyncSession(concurrency=4, per_page=3) as sess:
+            repos = [r async for r in aio.get_repos(sess, "myorg")]
+            exists = await aio.repo_exists(sess, "myorg/nothere")
+            return repos, exists, sess.requests
+
+    repos, exists, requests = asyncio.run(main())
+
+    assert isinstance(repos[0], github.Repository.Repository)
+    assert [r.name for r in repos[::3]] == [f"repo{p}-0" for p in range(1, PAGES + 1)]
+    assert not exists
+    assert requests == 1 + PAGES + 1
@@ -0,0 +1,109 @@
+"""
+offline check of a batch of operations, and the batch daemon, against the fake GitHub server
+"""
+
+import sys
+import threading
+
+import github
+import pytest
+
+import gitbulk as gb
+from gitbulk import fakehub
+from gitbulk.batch import Batch, server, submit
+from gitbulk.fakehub import FakeOrg
+
+OPS = [
+    {"op": "list", "owner": "fakeorg", "pattern": "repo000", "archived": True},
+    {"op": "archive", "owner": "fakeorg", "pattern": "repo001"},
+    {"op": "private", "owner": "fakeorg", "pattern": "repo001"},
+    {"op": "list", "owner": "fakeorg", "pattern": "repo00", "archived": True},
+    {"op": "add_members", "owner": "fakeorg", "logins": ["user1", "User50", " user51 "]},
+    {"op": "add_members", "owner": "fakeorg", "logins": ["user52"]},
+    {"op": "add_members", "owner": "fakeorg", "logins": ["user1", "user7"], "team": "team2"},
+    {"op": "copy_files", "owner": "fakeorg", "src": "nonexistent", "target": "ci.yml"},
+    {"op": "rename", "owner": "fakeorg"},
+]
+
+
+class Deny:
+    """
+    sends edits of repo00105 to a repo that doesn't exist, so they fail
+    """
+
+    def send(self, request, send_next):
+        if request.method == "PATCH":
+            request.url = request.url.replace("repo00105", "nosuch")
+        return send_next(request)
+
+
+def test_batch(tmp_path, monkeypatch):
+    monkeypatch.setenv("GITBULK_CACHE", str(tmp_path / "cache"))
+
+    with fakehub.serve(FakeOrg(repos=150, teams=4, members=20)) as url:
+        # without the write pacing of gitbulk.session()
+        sess = gb.Session(
+            github.Auth.Token("x"),
+            [Deny()],
+            base_url=url,
+            seconds_between_requests=None,
+            seconds_between_writes=None,
+        )
+        batch = Batch(sess)
+        r = list(batch.run_all(OPS))
+
+        # every 10th fake repo is archived, every 3rd private
+        assert r[0]["repos"] == [f"fakeorg/repo000{i}0" for i in range(10)]
+        archived = [f"fakeorg/repo001{i}{j}" for i in range(5) for j in range(1, 10)]
+        archived.remove("fakeorg/repo00105")
+        assert r[1]["changed"] == archived
+        assert list(r[1]["failed"]) == ["fakeorg/repo00105"]
+        assert len(r[2]["changed"]) == 50 - 16 and not r[2]["failed"]
+        assert r[3]["repos"] == r[0]["repos"] + [
+            f"fakeorg/repo001{i:02d}" for i in range(50) if i != 5
+        ]
+        assert r[4]["invited"] == ["user50", "user51"]
+        assert r[5]["invited"] == ["user52"]
+        assert r[6]["added"] == ["user1", "user7"]
+        assert "error" in r[7] and "error" in r[8]
+
+        calls = fakehub.calls(url)
+        # 2 inventory pages, the owner resolved once, users looked up by each add_members
+        assert calls["POST /graphql"] == 2 + 1 + 3
+        assert calls["PATCH /repos/{owner}/{repo}"] == 45 + 34
+        assert calls["GET /orgs/{org}/members"] == 1
+        assert calls["GET /orgs/{org}/teams"] == 1
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix socket")
+def test_daemon(tmp_path, monkeypatch):
+    monkeypatch.setenv("GITBULK_CACHE", str(tmp_path / "cache"))
+
+    with fakehub.serve(FakeOrg(repos=150)) as url:
+        batch = Batch(gb.session(base_url=url), dry_run=True)
+        (tmp_path / "file").touch()
+        with pytest.raises(FileExistsError):
+            server(batch, tmp_path / "file")
+
+        srv = server(batch, tmp_path / "gitbulk.sock")
+        assert (tmp_path / "gitbulk.sock").stat().st_mode & 0o077 == 0
+        t = threading.Thread(target=srv.serve_forever)
+        t.start()
+        try:
+            with pytest.raises(FileExistsError):
+                server(batch, tmp_path / "gitbulk.sock")
+            ops = [{"op": "archive", "owner": "fakeorg", "pattern": "repo001"}]
+            for _ in range(2):
+                (r,) = submit(tmp_path / "gitbulk.sock", ops)
+                assert len(r["changed"]) == 45
+            (r,) = submit(tmp_path / "gitbulk.sock", [{"op": "list"}])
+            assert "owner" in r["error"]
+            ops = [{"op": "refresh", "owner": "fakeorg"}, {"op": "list", "owner": "fakeorg"}]
+            assert len(list(submit(tmp_path / "gitbulk.sock", ops))[1]["repos"]) == 150
+        finally:
+            srv.shutdown()
+            srv.server_close()
+            t.join()
+
+        # the second batch used the warm inventory, the refresh listed again
+        assert fakehub.calls(url) == {"POST /graphql": 2 + 2}
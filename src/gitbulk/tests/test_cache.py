@@ -0,0 +1,86 @@
+"""
+offline check of the conditional-request response cache
+through PyGithub against a local HTTP server
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+import pytest
+import requests
+
+import gitbulk as gb
+from gitbulk.cache import ResponseCache
+
+
+class Handler(BaseHTTPRequestHandler):
+    statuses: list[int] = []
+
+    def do_GET(self):
+        body = json.dumps({"login": "myorg", "id": 1, "url": "/orgs/myorg"}).encode()
+        headers = {"ETag": '"abc"', "X-RateLimit-Remaining": "4999", "X-RateLimit-Limit": "5000"}
+
+        if self.headers.get("If-None-Match") == '"abc"':
+            self.statuses.append(304)
+            self.send_response(304)
+            body = b""
+        else:
+            self.statuses.append(200)
+            self.send_response(200)
+            headers["Content-Type"] = "application/json"
+            headers["Content-Length"] = str(len(body))
+
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    Handler.statuses = []
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def test_conditional(server, tmp_path):
+    cache = ResponseCache(tmp_path / "http.sqlite3")
+
+    for _ in range(3):
+        sess = gb.Session(middleware=[cache], base_url=server)
+        org = sess.get_organization("myorg")
+        assert org.login == "myorg"
+
+    assert Handler.statuses == [200, 304, 304]
+    assert cache.hits == 2
+    assert sess.rate_limiting == (4999, 5000)
+
+
+def test_evict(server, tmp_path):
+    cache = ResponseCache(tmp_path / "http.sqlite3", max_bytes=1)
+
+    sess = gb.Session(middleware=[cache], base_url=server)
+    sess.get_organization("myorg").login
+    sess.get_organization("myorg").login
+
+    assert Handler.statuses == [200, 200]
+
+
+def test_request_unchanged(server, tmp_path):
+    cache = ResponseCache(tmp_path / "http.sqlite3")
+    session = requests.Session()
+
+    for token in ("a", "a", "b"):
+        req = requests.Request("GET", f"{server}/orgs/myorg", headers={"Authorization": token}).prepare()
+        cache.send(req, session.send)
+        # a retry of the request, e.g. with another token, carries no stale conditional headers
+        assert "If-None-Match" not in req.headers
+
+    # each token has its own responses
+    assert Handler.statuses == [200, 304, 200]
@@ -0,0 +1,50 @@
+"""
+offline check of recording a session's traffic from the fake GitHub server and replaying it
+"""
+
+import time
+
+import pytest
+
+import gitbulk as gb
+from gitbulk import fakehub
+from gitbulk.cassette import Cassette
+from gitbulk.fakehub import FakeOrg
+
+
+def listing(sess):
+    org = sess.get_organization("fakeorg")
+    return (
+        [r.full_name for r in gb.get_inventory(sess, "fakeorg")],
+        gb.get_collabs(org, sess, workers=4),
+        sess.get_rate_limit().resources.core.remaining,
+    )
+
+
+def test_record_replay(tmp_path):
+    oauth = tmp_path / "oauth"
+    oauth.write_text("fake-token")
+    archive = tmp_path / "run.sqlite3"
+
+    with fakehub.serve(FakeOrg(repos=150), latency=0.01) as url:
+        sess = gb.session(oauth, base_url=url, record=archive)
+        recorded = listing(sess)
+        # a repeated request is replayed in recorded order
+        assert sess.get_rate_limit().resources.core.remaining == recorded[2] - 1
+
+    cassette = Cassette(archive)
+    # 2 GraphQL pages, the organization, 5 listing pages, 150 repos, 2 rate limits
+    assert len(cassette) == 2 + 1 + 5 + 150 + 2
+
+    # the server is gone: no network, no token
+    sess = gb.session(base_url=url, replay=archive)
+    assert listing(sess) == recorded
+    assert sess.get_rate_limit().resources.core.remaining == recorded[2] - 1
+    assert sess.get_rate_limit().resources.core.remaining == recorded[2] - 1
+
+    with pytest.raises(KeyError, match="/orgs/otherorg"):
+        sess.get_organization("otherorg")
+
+    tic = time.monotonic()
+    listing(gb.session(base_url=url, replay=archive, replay_latency=1))
+    assert time.monotonic() - tic > 0.01 * 150 / 4
@@ -0,0 +1,38 @@
+"""
+offline check that sessions keep their HTTP connection between requests
+"""
+
+import github
+import pytest
+
+import gitbulk as gb
+from gitbulk import fakehub
+
+
+@pytest.mark.parametrize("kind", ["github", "gitbulk"])
+def test_connection_reuse(kind):
+    with fakehub.serve() as url:
+        if kind == "github":
+            sess = github.Github(base_url=url, seconds_between_requests=None)
+        else:
+            sess = gb.session(base_url=url)
+
+        start = fakehub.connections(url)
+        for i in range(20):
+            sess.get_repo(f"fakeorg/repo{i:05d}")
+
+        # one connection for the session, one for this query
+        assert fakehub.connections(url) - start == 2
+
+
+def test_session_requester():
+    from gitbulk.client import SessionRequester
+
+    sess = gb.Session(github.Auth.Token("x"))
+    assert isinstance(sess.requester, SessionRequester)
+    # lazy objects keep the middleware
+    assert isinstance(sess.requester.withLazy(True), SessionRequester)
+    assert isinstance(sess.requester.withAuth(None), SessionRequester)
+
+    # other sessions in the process are left to PyGithub
+    assert type(github.Github().requester) is github.Requester.Requester
@@ -0,0 +1,71 @@
+"""
+offline check of local-git commit statistics and their cache
+"""
+
+import pytest
+
+from gitbulk.commits import commit_stats, commit_table, read_table, rollup, write_table
+from gitbulk.duplicator import git
+
+
+def test_commit_stats(tmp_path):
+    src = tmp_path / "src" / "org" / "a"
+    git(["init", "--quiet", str(src)])
+    (tmp_path / "src/org/b").mkdir()
+    git(["init", "--quiet", str(tmp_path / "src/org/b")])
+
+    def commit(author, text):
+        (src / "f.txt").write_text(text)
+        git(["add", "f.txt"], cwd=src)
+        git(["-c", f"user.name={author}", "-c", "user.email=a@b", "commit", "-qm", "x"], cwd=src)
+
+    commit("alice", "1\n2\n3\n")
+    commit("bob", "1\n2\n")
+
+    url = str(tmp_path / "src") + "/{}"
+    cache = tmp_path / "cache"
+
+    stats = dict(commit_stats(["org/a", "org/b"], 2, url, cache=cache))
+    assert stats["org/b"] == []
+    assert rollup(commit_table(stats.items()), freq=None).to_dict() == {"alice": 3, "bob": 1}
+    assert (cache / "commits/org/a.json").is_file()
+
+    commit("alice", "1\n")
+    stats = dict(commit_stats(["org/a"], 1, url, cache=cache))
+    table = commit_table(stats.items())
+    assert len(table) == 3
+    assert rollup(table, freq=None).to_dict() == {"alice": 4, "bob": 1}
+    assert rollup(table, ("repo",), "W", "commits").sum() == 3
+
+
+@pytest.mark.parametrize("suffix", [".pkl", ".parquet"])
+def test_table(tmp_path, suffix):
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+
+    def c(sha, author, time, additions, deletions):
+        return {
+            "sha": sha,
+            "author": author,
+            "email": f"{author}@b",
+            "time": time,
+            "additions": additions,
+            "deletions": deletions,
+        }
+
+    stats = [
+        ("org/a", [c("1", "al", "2024-01-01T10:00:00+01:00", 5, 1), c("2", "bo", "2024-01-09T10:00:00Z", 2, 0)]),
+        ("org/b", [c("3", "al", "2024-01-10T10:00:00Z", 1, 1)]),
+    ]
+    table = commit_table(stats)
+    write_table(table, tmp_path / f"commits{suffix}")
+    table = read_table(tmp_path / f"commits{suffix}")
+
+    weekly = rollup(table, ("author",), "W").unstack("author", fill_value=0)
+    assert weekly.shape == (2, 2)
+    assert weekly["al"].tolist() == [6, 2]
+    assert rollup(table, ("repo", "author"), None, "additions").to_dict() == {
+        ("org/a", "al"): 5,
+        ("org/a", "bo"): 2,
+        ("org/b", "al"): 1,
+    }
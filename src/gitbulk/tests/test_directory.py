@@ -0,0 +1,48 @@
+"""
+offline check that OrgDirectory lists once and tracks creations
+"""
+
+from types import SimpleNamespace
+
+import gitbulk as gb
+
+
+class Op:
+    def __init__(self):
+        self.listings = 0
+
+    def get_teams(self):
+        self.listings += 1
+        return [SimpleNamespace(name=f"Team{i}") for i in range(300)]
+
+    def get_repos(self):
+        self.listings += 1
+        return [SimpleNamespace(name=f"repo{i}") for i in range(300)]
+
+    def create_team(self, name, repos=None):
+        return SimpleNamespace(name=name)
+
+    def create_repo(self, name, private):
+        return SimpleNamespace(name=name)
+
+
+def test_directory(monkeypatch):
+    monkeypatch.setattr(gb.directory.github.Organization, "Organization", Op)
+    op = Op()
+    directory = gb.OrgDirectory(op, ttl=None)
+
+    for _ in range(600):
+        assert directory.has_team("team7")
+        assert directory.has_repo("REPO9")
+    assert not directory.has_team("new")
+    assert op.listings == 2
+
+    directory.create_team("New")
+    directory.create_repo("new", private=True)
+    assert directory.has_team("new")
+    assert directory.repo("New").name == "new"
+    assert op.listings == 2
+
+    directory.ttl = 0
+    directory.has_repo("repo1")
+    assert op.listings == 4
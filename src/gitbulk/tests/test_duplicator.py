@@ -0,0 +1,146 @@
+"""
+offline check of the concurrent duplicator's result table
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+import subprocess
+
+import gitbulk.duplicator as gu
+
+
+def test_repo_dupe(monkeypatch):
+    def gitdupe(oldurl, oldtime, username, mirrorname, op, iswiki=False, api=None, refdiff=False):
+        if mirrorname == "hw-bad":
+            raise subprocess.CalledProcessError(128, "git", stderr="fatal: could not read\n")
+        if mirrorname == "hw-full":
+            raise OSError(28, "No space left on device")
+        return "no wiki" if iswiki else "duplicated"
+
+    monkeypatch.setattr(gu, "connect", lambda oauth, orgname: (SimpleNamespace(login="me"), None))
+    monkeypatch.setattr(gu, "check_api_limit", lambda sess: None)
+    monkeypatch.setattr(
+        gu, "last_commit_date", lambda sess, name: None if name.endswith("empty") else datetime.now()
+    )
+    monkeypatch.setattr(gu, "gitdupe", gitdupe)
+
+    repos = {
+        "a": "https://github.com/a/hw.git",
+        "b": "https://github.com/b/empty.git",
+        "bad": "https://github.com/c/hw.git",
+        "full": "https://github.com/d/hw.git",
+    }
+    results = gu.repo_dupe(repos, None, stem="hw-", workers=3)
+
+    assert list(results.index) == ["a", "b", "bad", "full"]
+    assert results.loc["a", "dest"] == "me/hw-a"
+    assert results.loc["a", "repo"] == "duplicated"
+    assert results.loc["a", "wiki"] == "no wiki"
+    assert results.loc["b", "repo"] == "empty"
+    assert results.loc["bad", "error"] == "fatal: could not read"
+    assert results.loc["full", "error"] == "[Errno 28] No space left on device"
+
+
+def test_sync_refs(tmp_path):
+    src = tmp_path / "src"
+    dst = tmp_path / "dst.git"
+
+    def git(*args, cwd=src):
+        return gu.git(["-c", "user.name=a", "-c", "user.email=a@b", *args], cwd=cwd)
+
+    git("init", "--quiet", "-b", "main", str(src), cwd=tmp_path)
+    git("commit", "--allow-empty", "-m", "one")
+    git("branch", "old")
+    git("init", "--quiet", "--bare", str(dst), cwd=tmp_path)
+
+    assert gu.sync_refs(str(src), str(tmp_path / "nothere")) is None
+    assert gu.sync_refs(str(src), str(dst)) == "updated 2 refs"
+    assert gu.sync_refs(str(src), str(dst)) == "up to date"
+
+    git("commit", "--allow-empty", "-m", "two")
+    git("tag", "v1")
+    git("branch", "-D", "old")
+    assert gu.sync_refs(str(src), str(dst)) == "updated 3 refs"
+    assert gu.ls_remote(str(dst)) == gu.ls_remote(str(src))
+
+
+def test_fan_out(monkeypatch):
+    calls = []
+
+    def git(args, cwd=None):
+        calls.append(args[0])
+        if args[0] == "clone" and args[-2].endswith(".wiki.git"):
+            raise subprocess.CalledProcessError(128, "git", stderr="no wiki")
+        return ""
+
+    class Op:
+        login = "me"
+
+        def get_repos(self):
+            return [SimpleNamespace(name="hw-a", pushed_at=datetime(2000, 1, 1))]
+
+        def create_repo(self, name, **kwargs):
+            calls.append("create")
+            return SimpleNamespace(name=name, pushed_at=datetime.now())
+
+    monkeypatch.setattr(gu, "git", git)
+    monkeypatch.setattr(gu, "last_commit_date", lambda sess, name: datetime(2020, 1, 1))
+
+    repos = {e: "https://github.com/prof/template.git" for e in ("a", "b", "c", "d")}
+    repos["e"] = "https://github.com/prof/other.git"
+    rows = gu.fan_out(repos, Op(), None, stem="hw-", workers=3)
+
+    assert calls.count("clone") == 4
+    assert calls.count("create") == 4
+    assert calls.count("push") == 5
+    assert {r["repo"] for r in rows.values()} == {"duplicated"}
+    assert rows["e"]["wiki"] == "no wiki"
+
+
+def test_fan_out_refdiff(monkeypatch):
+    calls = []
+    refs = {
+        "ssh://github.com/prof/template.git": {"refs/heads/main": "1"},
+        "ssh://github.com/prof/empty.git": {},
+        "ssh://github.com/prof/empty.git.wiki.git": {"refs/heads/master": "9"},
+        "ssh://github.com/me/hw-a": {"refs/heads/main": "1"},
+        "ssh://github.com/me/hw-b": {"refs/heads/main": "0"},
+    }
+
+    def ls_remote(url):
+        if url.endswith("repo.git"):
+            url = "ssh://github.com/prof/template.git"
+        if url not in refs:
+            raise subprocess.CalledProcessError(128, "git", stderr="not found")
+        return refs[url]
+
+    def git(args, cwd=None):
+        calls.append(args[0])
+        if args[0] == "clone" and args[-2].endswith(".wiki.git"):
+            raise subprocess.CalledProcessError(128, "git", stderr="no wiki")
+        return ""
+
+    class Op:
+        login = "me"
+
+        def get_repos(self):
+            return [SimpleNamespace(name=n, pushed_at=datetime(2000, 1, 1)) for n in ("hw-a", "hw-b")]
+
+        def create_repo(self, name, **kwargs):
+            calls.append("create")
+            return SimpleNamespace(name=name, pushed_at=datetime.now())
+
+    monkeypatch.setattr(gu, "git", git)
+    monkeypatch.setattr(gu, "ls_remote", ls_remote)
+
+    repos = {e: "https://github.com/prof/template.git" for e in ("a", "b", "c")}
+    repos["e"] = "https://github.com/prof/empty.git"
+    rows = gu.fan_out(repos, Op(), None, stem="hw-", workers=3, refdiff=True)
+
+    # only the template is cloned, as hw-a is current and the other source is empty
+    assert calls.count("clone") == 2
+    assert calls.count("create") == 1
+    assert rows["a"]["repo"] == "up to date" and rows["a"]["wiki"] == "no wiki"
+    assert rows["b"]["repo"] == "updated 1 refs"
+    assert rows["c"]["repo"] == "duplicated"
+    assert rows["e"]["repo"] == "empty" and rows["e"]["wiki"] == ""
@@ -0,0 +1,73 @@
+"""
+offline fake GitHub server and the benchmark suite running on it
+"""
+
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+import gitbulk as gb
+from gitbulk import benchmark, fakehub
+from gitbulk.fakehub import FakeOrg
+
+
+def test_fakehub(tmp_path):
+    oauth = tmp_path / "oauth"
+    oauth.write_text("fake-token")
+
+    org = FakeOrg(repos=250, forks=3, teams=4, members=20)
+    with fakehub.serve(org) as url:
+        sess = gb.session(oauth, base_url=url)
+
+        repos = list(gb.get_inventory(sess, "fakeorg"))
+        assert len(repos) == 250
+        assert repos[20].archived and repos[20].license is None
+
+        listed = list(sess.get_organization("fakeorg").get_repos())
+        assert [r.name for r in listed[::100]] == ["repo00000", "repo00100", "repo00200"]
+
+        forks = list(sess.get_repo("fakeorg/repo00007").get_forks())
+        assert [f.full_name for f in forks] == [f"user{j}/repo00007" for j in range(3)]
+
+        teams = gb.get_team_repos(sess, "fakeorg")
+        assert teams["repo00001"] == {"team1"} and "repo00005" not in teams
+
+        assert fakehub.calls(url) == {
+            "POST /graphql": 4,
+            "GET /orgs/{org}": 1,
+            "GET /orgs/{org}/repos": 9,
+            "GET /repos/{owner}/{repo}": 1,
+            "GET /repos/{owner}/{repo}/forks": 1,
+        }
+        fakehub.reset(url)
+        assert fakehub.calls(url) == {}
+
+
+def test_fakehub_rate_limit():
+    with fakehub.serve(rate_limit=2) as url:
+        for remaining in (1, 0):
+            with urllib.request.urlopen(f"{url}/orgs/fakeorg") as f:
+                assert f.headers["X-RateLimit-Remaining"] == str(remaining)
+                assert json.load(f)["type"] == "Organization"
+
+        with pytest.raises(urllib.error.HTTPError) as e:
+            urllib.request.urlopen(f"{url}/orgs/fakeorg")
+        assert e.value.code == 403
+
+
+def test_benchmark(tmp_path, capsys):
+    results = benchmark.run_benchmarks(
+        select=["inventory", "get_collabs", "ListNonArchived.py"], jobs=4, scripts=tmp_path / "missing"
+    )
+
+    assert "skipping script benchmarks" in capsys.readouterr().err
+    assert list(results.index) == ["inventory", "get_collabs"]
+
+    assert results.loc["inventory", "calls"] == 3
+    # one listing page per 30 repos, then one request per repo
+    assert results.loc["get_collabs", "routes"]["GET /repos/{owner}/{repo}/collaborators"] == 300
+    assert (results.peak_mib > 0).all()
+
+    assert not benchmark.compare(results, results)["regression"].any()
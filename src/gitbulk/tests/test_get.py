@@ -0,0 +1,43 @@
+"""
+offline check of collaborator collection
+"""
+
+from types import SimpleNamespace
+
+import gitbulk as gb
+
+
+class Repo:
+    def __init__(self, name: str):
+        self.name = name
+
+    def get_collaborators(self, affiliation: str):
+        assert affiliation == "outside"
+        return [SimpleNamespace(login=f"{self.name}-guest")]
+
+
+def test_get_collabs():
+    op = SimpleNamespace(get_repos=lambda: [Repo(f"sw{i:02d}") for i in range(20)] + [Repo("other")])
+
+    collabs = gb.get_collabs(op, None, stem="sw", workers=4)
+
+    assert list(collabs) == [f"sw{i:02d}" for i in range(20)]
+    assert collabs["sw07"] == ["sw07-guest"]
+    assert dict(gb.iter_collabs(op, None, regex="oth")) == {"other": ["other-guest"]}
+
+
+def test_iter_collabs_bounded():
+    listed = []
+
+    def get_repos():
+        for i in range(50):
+            listed.append(i)
+            yield Repo(f"sw{i:02d}")
+
+    op = SimpleNamespace(get_repos=get_repos)
+    it = gb.iter_collabs(op, None, workers=2)
+
+    # the first result arrives before the whole listing is consumed
+    next(it)
+    assert len(listed) <= 2 * 2
+    assert len(list(it)) == 49
@@ -18,10 +18,14 @@ def test_bad_username():
 
 
 def test_get_repos():
-    try:
-        userorg = pgu.user_or_org(pgu.session(), OK_username)
-        repos = pgu.get_repos(userorg)
-    except ConnectionRefusedError:
+    sess = pgu.session()
+    # the session waits out an exhausted rate limit, so skip rather than hang.
+    # /rate_limit itself doesn't count against the limit
+    sess.get_rate_limit()
+    if sess.requester.rate_limiting[0] < 3:
         pytest.skip("GitHub API limit exceeded")
 
+    userorg = pgu.user_or_org(sess, OK_username)
+    repos = pgu.get_repos(userorg)
+
     assert repos[0]
@@ -0,0 +1,65 @@
+"""
+offline check of GraphQL inventory paging, with a stand-in requester
+"""
+
+from types import SimpleNamespace
+
+import gitbulk as gb
+
+
+def repo_node(i: int) -> dict:
+    return {
+        "name": f"repo{i:03d}",
+        "nameWithOwner": f"myorg/repo{i:03d}",
+        "owner": {"login": "myorg"},
+        "isArchived": i % 2 == 0,
+        "isPrivate": False,
+        "isFork": False,
+        "licenseInfo": {"spdxId": "MIT"} if i % 3 else None,
+        "stargazerCount": i,
+        "forkCount": 0,
+        "pushedAt": "2024-01-02T03:04:05Z",
+        "updatedAt": None,
+        "defaultBranchRef": {"name": "main"},
+        "languages": {"edges": [{"size": 10, "node": {"name": "Python"}}]},
+    }
+
+
+class Requester:
+    graphql_url = "/graphql"
+
+    def __init__(self, N: int):
+        self.nodes = [repo_node(i) for i in range(N)]
+        self.calls = 0
+
+    def requestJsonAndCheck(self, verb, url, input):  # noqa: A002
+        self.calls += 1
+        start = int(input["variables"]["cursor"] or 0)
+        end = start + 100
+        page = {
+            "pageInfo": {"hasNextPage": end < len(self.nodes), "endCursor": str(end)},
+            "nodes": self.nodes[start:end],
+        }
+        return {}, {"data": {"repositoryOwner": {"repositories": page}}}
+
+
+def test_inventory_paging():
+    sess = SimpleNamespace(requester=Requester(250))
+
+    repos = list(gb.get_inventory(sess, "myorg"))  # type: ignore
+
+    assert sess.requester.calls == 3
+    assert len(repos) == 250
+    assert repos[3].license is None
+    assert repos[4].license == "MIT"
+    assert repos[4].archived
+    assert repos[4].languages == {"Python": 10}
+    assert repos[4].pushed_at.year == 2024
+
+
+def test_inventory_stem():
+    sess = SimpleNamespace(requester=Requester(150))
+
+    repos = list(gb.get_inventory(sess, "myorg", stem="repo1"))  # type: ignore
+
+    assert [r.name for r in repos] == [f"repo{i}" for i in range(100, 150)]
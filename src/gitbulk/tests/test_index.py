@@ -0,0 +1,107 @@
+"""
+offline check of incremental index sync, with stand-in PyGithub objects
+"""
+
+from types import SimpleNamespace
+
+import github
+
+import gitbulk as gb
+
+
+def repo_node(name: str, updated: str) -> dict:
+    return {
+        "name": name,
+        "nameWithOwner": f"myorg/{name}",
+        "owner": {"login": "myorg"},
+        "isArchived": False,
+        "isPrivate": True,
+        "isFork": False,
+        "licenseInfo": None,
+        "stargazerCount": 0,
+        "forkCount": 0,
+        "pushedAt": updated,
+        "updatedAt": updated,
+        "defaultBranchRef": {"name": "main"},
+        "languages": {"edges": []},
+    }
+
+
+class Requester:
+    graphql_url = "/graphql"
+
+    def __init__(self):
+        self.nodes = [repo_node(f"foo{i}", "2024-01-01T00:00:00Z") for i in range(3)]
+
+    def requestJsonAndCheck(self, verb, url, input):  # noqa: A002
+        done = {"hasNextPage": False, "endCursor": None}
+        if "repositoryOwner" in input["query"]:
+            data = {"repositoryOwner": {"repositories": {"pageInfo": done, "nodes": self.nodes}}}
+        else:
+            team = {"slug": "t0", "repositories": {"pageInfo": done, "nodes": [{"name": "foo0"}]}}
+            data = {"organization": {"teams": {"pageInfo": done, "nodes": [team]}}}
+        return {}, {"data": data}
+
+
+class Session:
+    def __init__(self):
+        self.requester = Requester()
+        self.fetched: list[str] = []
+        self.fail: set[str] = set()
+
+    def get_organization(self, login):
+        member = SimpleNamespace(login="member")
+        return SimpleNamespace(
+            login=login,
+            get_teams=lambda: [SimpleNamespace(slug="t0", name="T0")],
+            get_members=lambda: [member],
+            get_outside_collaborators=lambda: [],
+        )
+
+    def get_repo(self, full_name):
+        self.fetched.append(full_name)
+        users = [SimpleNamespace(login="member"), SimpleNamespace(login="student")]
+
+        def get_collaborators(affiliation):
+            if full_name in self.fail:
+                raise github.GithubException(502, {"message": "Server Error"}, {})
+            return users
+
+        return SimpleNamespace(get_collaborators=get_collaborators)
+
+
+def test_incremental(tmp_path, monkeypatch):
+    monkeypatch.setattr(gb.index, "lazy_repo", lambda sess, name: sess.get_repo(name))
+    sess = Session()
+
+    with gb.OrgIndex("myorg", tmp_path / "index.sqlite3") as index:
+        assert index.sync(sess) == {"repos": 3, "changed": 3, "removed": 0}  # type: ignore
+
+        sess.fetched.clear()
+        sess.requester.nodes[1] = repo_node("foo1", "2024-02-01T00:00:00Z")
+        del sess.requester.nodes[2]
+
+        assert index.sync(sess) == {"repos": 2, "changed": 1, "removed": 1}  # type: ignore
+        assert sess.fetched == ["myorg/foo1"]
+
+        assert [r.name for r in index.repos("foo")] == ["foo0", "foo1"]
+        assert index.team_repos() == {"foo0": {"t0"}}
+        assert index.collabs("foo") == {"foo0": ["student"], "foo1": ["student"]}
+
+
+def test_failed_details(tmp_path, monkeypatch):
+    monkeypatch.setattr(gb.index, "lazy_repo", lambda sess, name: sess.get_repo(name))
+    sess = Session()
+
+    with gb.OrgIndex("myorg", tmp_path / "index.sqlite3") as index:
+        index.sync(sess)  # type: ignore
+
+        sess.requester.nodes[1] = repo_node("foo1", "2024-02-01T00:00:00Z")
+        sess.fail = {"myorg/foo1"}
+        index.sync(sess)  # type: ignore
+
+        # collaborators of foo1 weren't fetched, so it's still changed on the next sync
+        sess.fail.clear()
+        sess.fetched.clear()
+        assert index.sync(sess)["changed"] == 1  # type: ignore
+        assert sess.fetched == ["myorg/foo1"]
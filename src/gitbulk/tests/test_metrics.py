@@ -0,0 +1,95 @@
+"""
+offline check of per-endpoint request metrics against the fake GitHub server
+"""
+
+from pathlib import Path
+import json
+
+import github
+import pytest
+
+import gitbulk as gb
+from gitbulk import fakehub
+from gitbulk.fakehub import FakeOrg
+from gitbulk.base import _metrics_env
+from gitbulk.metrics import Metrics, endpoint
+from gitbulk.ratelimit import RateLimiter
+
+
+@pytest.mark.parametrize(
+    "url,template",
+    [
+        ("https://api.github.com/repos/o/r/forks?page=2", "/repos/{owner}/{repo}/forks"),
+        ("https://ghe.example/api/v3/orgs/o/teams/t/memberships/u", "/orgs/{org}/teams/{team}/memberships/{username}"),
+        ("https://api.github.com/repos/o/r/contents/a/b", "/repos/{owner}/{repo}/contents/{path}"),
+        ("https://api.github.com/search/users?q=user:x", "/search/users"),
+        ("https://api.github.com/user/repos", "/user/repos"),
+    ],
+)
+def test_endpoint(url, template):
+    assert endpoint(url) == template
+
+
+@pytest.mark.parametrize(
+    "env,on",
+    [("", False), ("0", False), ("false", False), ("No", False), ("1", True), ("yes", True)],
+)
+def test_metrics_env(monkeypatch, env, on):
+    monkeypatch.setenv("GITBULK_METRICS", env)
+    assert (gb.session().find_middleware(Metrics) is not None) == on
+
+
+def test_metrics_env_path(monkeypatch, tmp_path):
+    monkeypatch.setenv("GITBULK_METRICS", str(tmp_path / "m.prom"))
+    assert gb.session().find_middleware(Metrics)
+    assert _metrics_env("metrics.json") == Path("metrics.json")
+
+
+class RetryOnce:
+    """
+    sends the first collaborators request twice, as the RateLimiter retries a rate limited request
+    """
+
+    retried = False
+
+    def send(self, request, send_next):
+        response = send_next(request)
+        if not self.retried and "/collaborators" in request.url:
+            self.retried = True
+            response = send_next(request)
+        return response
+
+
+def test_metrics(tmp_path):
+    with fakehub.serve(FakeOrg(repos=120)) as url:
+        metrics = Metrics()
+        middleware = [RateLimiter(), RetryOnce(), metrics]
+        sess = gb.Session(
+            github.Auth.Token("x"), middleware, base_url=url, seconds_between_requests=None
+        )
+
+        assert len(list(gb.get_inventory(sess, "fakeorg"))) == 120
+        # one request per repo, one retried
+        collabs = gb.get_collabs(sess.get_organization("fakeorg"), sess, workers=1)
+        assert len(collabs) == 120
+
+    d = {(e["method"], e["endpoint"]): e for e in metrics.to_dict()["endpoints"]}
+
+    graphql = d[("POST", "/graphql {repositoryOwner}")]
+    assert graphql["requests"] == 2 and graphql["units"] == 2
+
+    collab = d[("GET", "/repos/{owner}/{repo}/collaborators")]
+    assert collab["status"] == {"200": 121}
+    assert collab["retries"] == 1
+    assert collab["bytes"] > 0
+
+    assert metrics.totals().requests == 2 + 1 + 4 + 121
+
+    prom = metrics.prometheus()
+    labels = 'method="GET",endpoint="/repos/{owner}/{repo}/collaborators"'
+    assert f'gitbulk_requests_total{{{labels},status="200"}} 121' in prom
+    assert f'gitbulk_request_duration_seconds_bucket{{{labels},le="+Inf"}} 121' in prom
+
+    metrics.write(tmp_path / "metrics.json")
+    assert json.loads((tmp_path / "metrics.json").read_text())["endpoints"][0] == collab
+    assert "/repos/{owner}/{repo}/collaborators" in metrics.summary()
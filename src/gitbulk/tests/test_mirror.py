@@ -0,0 +1,47 @@
+"""
+offline check of the mirror farm against local source repos
+"""
+
+from datetime import datetime
+
+import gitbulk.mirror as gm
+from gitbulk.duplicator import git
+
+
+def test_sync_mirrors(tmp_path, monkeypatch):
+    src = tmp_path / "src"
+    for name in ("a", "b"):
+        git(["init", "--quiet", str(src / "org" / name)])
+        git(
+            ["-c", "user.name=a", "-c", "user.email=a@b", "commit", "--allow-empty", "-m", "one"],
+            cwd=src / "org" / name,
+        )
+
+    pushed = {"org/a": datetime(2020, 1, 1), "org/b": datetime(2020, 1, 1)}
+
+    def inventory(sess, login, stem=""):
+        for name, t in pushed.items():
+            if name.split("/")[1].startswith(stem):
+                yield gm.RepoInfo(
+                    name.split("/")[1], name, "org", False, False, False, "", 0, 0, t, t, "main", ()
+                )
+
+    monkeypatch.setattr(gm, "get_inventory", inventory)
+    root = tmp_path / "mirrors"
+    url = str(src) + "/{}"
+
+    r = gm.sync_mirrors(None, "org", root, workers=2, url=url)
+    assert list(r.repo) == ["cloned", "cloned"]
+    assert list(r.wiki) == ["no wiki", "no wiki"]
+    assert (root / "org/a.git/HEAD").is_file()
+
+    pushed["org/b"] = datetime(2020, 1, 2)
+    r = gm.sync_mirrors(None, "org", root, workers=2, url=url)
+    assert r.loc["org/a", "repo"] == "unchanged"
+    assert r.loc["org/b", "repo"] == "updated"
+    assert (r.error == "").all()
+
+    # no repo matches: same columns, no rows
+    r = gm.sync_mirrors(None, "org", root, workers=2, url=url, stem="zzz")
+    assert r.empty and list(r.columns) == ["repo", "wiki", "error", "seconds"]
+    assert r.value_counts("repo").empty
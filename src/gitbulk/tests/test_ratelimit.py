@@ -0,0 +1,87 @@
+"""
+offline check of the header-driven rate limit scheduler
+"""
+
+import time
+
+import pytest
+import requests
+
+from gitbulk.ratelimit import RateLimiter, identity, is_write
+
+
+def prepare(method: str = "GET", url: str = "https://api.github.com/orgs/myorg", body=None):
+    return requests.Request(
+        method, url, headers={"Authorization": "token abc"}, json=body
+    ).prepare()
+
+
+def response(status: int, **headers: str) -> requests.Response:
+    r = requests.Response()
+    r.status_code = status
+    r.headers.update({k.replace("_", "-"): v for k, v in headers.items()})
+    r._content = b"{}"
+    return r
+
+
+def test_secondary_retry():
+    limiter = RateLimiter()
+    replies = [response(403, retry_after="0"), response(429, retry_after="0"), response(200)]
+    sent = []
+
+    def send_next(req):
+        sent.append(req)
+        return replies[len(sent) - 1]
+
+    r = limiter.send(prepare(), send_next)
+
+    assert r.status_code == 200
+    assert len(sent) == 3
+
+
+def test_primary_wait():
+    limiter = RateLimiter()
+    req = prepare()
+    reset = time.time() + 10
+    limiter.update(
+        identity(req),
+        "core",
+        response(200, x_ratelimit_remaining="0", x_ratelimit_limit="5000", x_ratelimit_reset=str(reset)),
+    )
+
+    assert limiter.delay(identity(req), "core") == pytest.approx(11, abs=0.1)
+    # other tokens have their own budget
+    assert limiter.delay("other", "core") == 0
+
+
+def test_spread():
+    limiter = RateLimiter()
+    reset = time.time() + 100
+    limiter.update(
+        "me",
+        "core",
+        response(200, x_ratelimit_remaining="5", x_ratelimit_limit="5000", x_ratelimit_reset=str(reset)),
+    )
+
+    assert limiter.delay("me", "core") == pytest.approx(20, abs=0.1)
+    assert limiter.budget("me").remaining == 4  # type: ignore
+
+    # concurrent requests are staggered, one slot each
+    assert limiter.delay("me", "core") == pytest.approx(40, abs=0.1)
+    assert limiter.delay("me", "core") == pytest.approx(60, abs=0.1)
+    # a response in the same window keeps the slots handed out
+    limiter.update(
+        "me",
+        "core",
+        response(200, x_ratelimit_remaining="2", x_ratelimit_limit="5000", x_ratelimit_reset=str(reset)),
+    )
+    assert limiter.delay("me", "core") == pytest.approx(80, abs=0.1)
+
+
+def test_is_write():
+    gql = "https://api.github.com/graphql"
+
+    assert not is_write(prepare())
+    assert is_write(prepare("PUT", "https://api.github.com/orgs/myorg/memberships/me"))
+    assert not is_write(prepare("POST", gql, {"query": "query { viewer { login } }"}))
+    assert is_write(prepare("POST", gql, {"query": "mutation { x }"}))
@@ -0,0 +1,85 @@
+"""
+offline check of reconciliation planning
+"""
+
+from types import SimpleNamespace
+
+import github
+import pandas
+
+import gitbulk as gb
+from gitbulk.reconcile import Change, apply, plan, spec_from_roster
+
+
+def test_plan():
+    roster = pandas.DataFrame(
+        {"GitHub": ["alice", "Bob ", "carol", "dave"], "Team": [1, 1, 2, 3], "Name": ["a", "a", "b", "c"]}
+    )
+    desired = spec_from_roster(roster, stem="sw", private=True)
+    assert set(desired.repos) == {"sw01-a", "sw02-b", "sw03-c"}
+    assert desired.teams["sw01-a"].members == {"alice", "Bob"}
+
+    current = gb.OrgSpec(
+        repos={"SW01-a": True, "sw02-b": True},
+        teams={
+            "sw01-A": gb.TeamSpec({"ALICE", "bob"}, {"sw01-a": "push"}),
+            "sw02-b": gb.TeamSpec({"carol"}, {"sw02-b": "pull"}),
+            # dave's invitation is still pending
+            "sw03-c": gb.TeamSpec(set(), {"sw03-c": "admin"}, {"Dave"}),
+        },
+    )
+
+    changes = [str(c) for c in plan(current, desired)]
+    assert changes == [
+        "+ repo sw03-c (private)",
+        "~ team sw02-b: repo sw02-b push",
+    ]
+
+    # admin is lowered to push only when asked
+    changes = [str(c) for c in plan(current, desired, downgrade=True)]
+    assert changes[-1] == "~ team sw03-c: repo sw03-c push"
+
+    del current.teams["sw03-c"]
+    assert [str(c) for c in plan(current, desired)][2:] == [
+        "+ team sw03-c",
+        "~ team sw03-c: repo sw03-c push",
+        "+ team sw03-c: member dave",
+    ]
+
+    assert plan(desired, desired) == []
+
+
+def test_roster_columns():
+    roster = pandas.DataFrame({"login": ["alice", "bob"], "group": [1, 2]})
+    desired = spec_from_roster(roster, "sw", username="login", team="group", name=None)
+    assert desired.teams["sw2"].members == {"bob"}
+
+
+class Team(SimpleNamespace):
+    def update_team_repository(self, repo, permission):
+        # PyGithub returns False instead of raising
+        return repo.endswith("ok")
+
+
+class Op(github.Organization.Organization):
+    # an Organization to OrgDirectory, without a requester
+    login = "myorg"  # type: ignore[assignment]
+
+    def __init__(self):
+        pass
+
+    def get_teams(self):
+        return [Team(name="t")]
+
+    def get_repos(self):
+        return []
+
+
+def test_apply_permission_failed():
+    changes = [
+        Change("set_permission", team="t", repo="ok", permission="push"),
+        Change("set_permission", team="t", repo="denied", permission="push"),
+    ]
+
+    failed = apply(Op(), None, changes)
+    assert [(c.repo, err) for c, err in failed] == [("denied", "permission not set")]
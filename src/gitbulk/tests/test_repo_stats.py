@@ -0,0 +1,81 @@
+"""
+offline check of concurrent fork probing and statistics polling with stand-in PyGithub objects
+"""
+
+import json
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from gitbulk.repo_stats import contributor_stats, fork_prober
+
+
+class Fork:
+    def __init__(self, i: int):
+        self.full_name = f"user{i}/repo"
+        self.sha = str(i)
+
+    def get_branch(self, branch: str):
+        time.sleep(random.random() * 0.01)
+        return SimpleNamespace(commit=SimpleNamespace(sha=self.sha))
+
+
+class Repo:
+    full_name = "me/repo"
+    default_branch = "main"
+
+    def __init__(self, N: int):
+        self.forks = [Fork(i) for i in range(N)]
+
+    def get_branch(self, branch: str):
+        return SimpleNamespace(commit=SimpleNamespace(sha="0"))
+
+    def get_forks(self):
+        return self.forks
+
+    def compare(self, base: str, head: str):
+        time.sleep(random.random() * 0.01)
+        return SimpleNamespace(ahead_by=int(head) % 3, behind_by=0)
+
+
+@pytest.mark.parametrize("workers", [1, 8])
+def test_fork_prober_order(workers):
+    requester = SimpleNamespace(rate_limiting=(5000, 5000), rate_limiting_resettime=time.time() + 3600)
+    sess = SimpleNamespace(requester=requester)
+    repo = Repo(50)
+
+    ahead = fork_prober(repo, sess, [], workers=workers)  # type: ignore
+
+    assert ahead == [(f.full_name, int(f.sha) % 3) for f in repo.forks if int(f.sha) % 3]
+
+
+class StatsRequester:
+    def __init__(self):
+        self.calls = []
+
+    def requestJson(self, verb, url):
+        self.calls.append(url)
+        if url == "/repos/org/empty/stats/contributors":
+            return 204, {}, ""
+        if url == "/repos/org/blocked/stats/contributors":
+            return 451, {}, '{"message": "Repository access blocked"}'
+        if self.calls.count(url) < 3:
+            return 202, {}, "{}"
+
+        weeks = [{"w": 1704067200, "a": 5, "d": 1, "c": 2}, {"w": 1704672000, "a": 0, "d": 0, "c": 0}]
+        return 200, {}, json.dumps([{"author": {"login": "al"}, "total": 2, "weeks": weeks}])
+
+
+def test_contributor_stats(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    req = StatsRequester()
+
+    table = contributor_stats(SimpleNamespace(requester=req), ["org/a", "org/empty", "org/blocked"])
+
+    assert sleeps == [2.0, 4.0]
+    assert len(req.calls) == 5
+    assert table.repo.tolist() == ["org/a"]
+    assert table.iloc[0][["author", "additions", "deletions", "commits"]].tolist() == ["al", 5, 1, 2]
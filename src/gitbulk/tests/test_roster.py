@@ -0,0 +1,61 @@
+"""
+offline check of roster loading and caching
+"""
+
+import pytest
+
+import gitbulk as gb
+import gitbulk.roster
+
+
+def test_read_roster(tmp_path, monkeypatch):
+    monkeypatch.setenv("GITBULK_CACHE", str(tmp_path / "cache"))
+
+    fn = tmp_path / "roster.csv"
+    fn.write_text(
+        "Email,Name,GitHub,Team\n"
+        "a@x.edu, Ann ,alice,1\n"
+        "b@x.edu,Bob,Alice,1\n"
+        "c@x.edu,Cy,carol,\n"
+        ",,,\n"
+        "d@x.edu,Di,dave-2,3\n"
+    )
+
+    teams = gb.read_roster(fn, ["GitHub", "Team"], login="GitHub")
+    assert teams["GitHub"].tolist() == ["alice", "dave-2"]
+    assert teams["Team"].tolist() == [1, 3]
+
+    names = gb.read_roster(fn, "A:B")
+    assert names.columns.tolist() == ["Email", "Name"]
+    assert names["Name"].tolist() == ["Ann", "Bob", "Cy", "Di"]
+
+    logins = gb.read_roster(fn, 2, login=0).squeeze(axis=1)
+    assert logins.tolist() == ["alice", "carol", "dave-2"]
+
+    # only the selected columns are parsed
+    parsed = []
+    read_csv = gitbulk.roster.pandas.read_csv
+    monkeypatch.setattr(
+        gitbulk.roster.pandas, "read_csv", lambda *a, **kw: parsed.append(kw) or read_csv(*a, **kw)
+    )
+    assert gb.read_roster(fn, ["Team", "C"], cache=False).columns.tolist() == ["Team", "GitHub"]
+    assert parsed[-1]["usecols"] == [2, 3]
+
+    # parsed once per selection, reused until the file changes
+    def fail(*args, **kwargs):
+        raise AssertionError("cached roster was parsed again")
+
+    monkeypatch.setattr(gitbulk.roster.pandas, "read_csv", fail)
+    assert gb.read_roster(fn, 2, login=0).shape == (3, 1)
+
+    monkeypatch.undo()
+    monkeypatch.setenv("GITBULK_CACHE", str(tmp_path / "cache"))
+    fn.write_text("GitHub\nbad_name\n-dash\nok\n")
+    with pytest.raises(ValueError, match="bad_name -dash"):
+        gb.read_roster(fn, "GitHub", login="GitHub")
+
+    # a cache pickled by another pandas version is parsed again
+    gb.read_roster(fn, "GitHub")
+    for cfn in (tmp_path / "cache" / "roster").glob("*.pkl"):
+        cfn.write_bytes(b"cno_such_module\nDataFrame\n.")
+    assert gb.read_roster(fn, "GitHub")["GitHub"].tolist() == ["bad_name", "-dash", "ok"]
@@ -0,0 +1,66 @@
+"""
+offline check of template sync by blob SHA with a stand-in repo
+"""
+
+from types import SimpleNamespace
+import subprocess
+
+from gitbulk.template import blob_sha, sync_template, template_files
+
+
+class Repo:
+    full_name = "org/a"
+    default_branch = "main"
+
+    def __init__(self, remote: dict[str, bytes]):
+        self.remote = remote
+        self.commits: list[str] = []
+        self.ref = None
+
+    def get_branch(self, branch):
+        tree = SimpleNamespace(sha="t0")
+        return SimpleNamespace(commit=SimpleNamespace(commit=SimpleNamespace(sha="c0", tree=tree)))
+
+    def get_git_tree(self, sha, recursive=False):
+        entries = [
+            SimpleNamespace(path=p, sha=blob_sha(d), mode="100644", type="blob")
+            for p, d in self.remote.items()
+        ]
+        return SimpleNamespace(sha=sha, tree=entries, truncated=False)
+
+    def create_git_tree(self, elements, base_tree):
+        self.elements = elements
+        return SimpleNamespace(sha="t1")
+
+    def create_git_commit(self, message, tree, parents):
+        self.commits.append(message)
+        return SimpleNamespace(sha="c1")
+
+    def get_git_ref(self, ref):
+        return SimpleNamespace(edit=lambda sha: setattr(self, "ref", (ref, sha)))
+
+
+def test_blob_sha(tmp_path):
+    fn = tmp_path / "a.txt"
+    fn.write_bytes(b"hello\n")
+    out = subprocess.run(["git", "hash-object", str(fn)], capture_output=True, text=True)
+    if out.returncode == 0:
+        assert blob_sha(b"hello\n") == out.stdout.strip()
+
+
+def test_sync_template(tmp_path):
+    (tmp_path / "wf").mkdir()
+    (tmp_path / "wf/ci.yml").write_text("on: push\n")
+    (tmp_path / "wf/lint.yml").write_text("on: pull_request\n")
+
+    files = template_files(tmp_path / "wf", ".github/workflows/")
+    assert list(files) == [".github/workflows/ci.yml", ".github/workflows/lint.yml"]
+
+    repo = Repo(dict(files))
+    assert sync_template(repo, files, "update CI") == "up to date"
+    assert not repo.commits
+
+    repo = Repo({".github/workflows/ci.yml": b"on: push\n", "README.md": b"hi"})
+    assert sync_template(repo, files, "update CI") == "committed 1 files"
+    assert [e._identity["path"] for e in repo.elements] == [".github/workflows/lint.yml"]
+    assert repo.ref == ("heads/main", "c1")
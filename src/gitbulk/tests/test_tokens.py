@@ -0,0 +1,98 @@
+"""
+offline check of token pool failover
+"""
+
+import json
+import time
+
+import pytest
+import requests
+
+import gitbulk as gb
+from gitbulk.cache import ResponseCache
+
+from gitbulk.ratelimit import RateLimiter
+from gitbulk.tokens import TokenPool
+
+
+class Server:
+    def __init__(self, budgets: dict[str, int], users: dict[str, str] | None = None):
+        self.budgets = budgets
+        self.users = users or {}
+        self.reset = str(time.time() + 3600)
+
+    def send(self, req: requests.PreparedRequest) -> requests.Response:
+        token = req.headers["Authorization"].split()[1]
+
+        r = requests.Response()
+        r._content = json.dumps({"login": self.users.get(token, "me")}).encode()
+        if self.budgets[token] == 0:
+            r.status_code = 403
+        else:
+            r.status_code = 200
+            self.budgets[token] -= 1
+        r.headers.update(
+            {
+                "x-ratelimit-remaining": str(self.budgets[token]),
+                "x-ratelimit-limit": "5000",
+                "x-ratelimit-reset": self.reset,
+            }
+        )
+        return r
+
+
+def send(pool: TokenPool, limiter: RateLimiter, server: Server) -> requests.Response:
+    req = requests.Request("GET", "https://api.github.com/user").prepare()
+    return pool.send(req, lambda r: limiter.send(r, server.send))
+
+
+def test_most_remaining():
+    server = Server({"aaaa1111": 2, "bbbb2222": 4})
+    limiter = RateLimiter(spread=0)
+    pool = TokenPool(["aaaa1111", "bbbb2222"], limiter)
+
+    for _ in range(6):
+        assert send(pool, limiter, server).status_code == 200
+
+    assert server.budgets == {"aaaa1111": 0, "bbbb2222": 0}
+
+    use = pool.usage()
+    assert use["...1111"] == {"requests": 2, "remaining": 0, "limit": 5000, "reset": float(server.reset)}
+    assert use["...2222"]["requests"] == 4
+
+
+def test_failover():
+    server = Server({"aaaa1111": 0, "bbbb2222": 1})
+    limiter = RateLimiter(spread=0)
+    pool = TokenPool(["aaaa1111", "bbbb2222"], limiter)
+
+    r = send(pool, limiter, server)
+
+    assert r.status_code == 200
+    assert pool.requests == {"token aaaa1111": 1, "token bbbb2222": 1}
+
+
+def test_users():
+    server = Server({"aaaa1111": 5, "bbbb2222": 5}, {"bbbb2222": "other"})
+    limiter = RateLimiter(spread=0)
+    pool = TokenPool(["aaaa1111", "bbbb2222"], limiter, "https://api.github.com")
+
+    with pytest.raises(ValueError, match="different users"):
+        send(pool, limiter, server)
+
+    server = Server({"aaaa1111": 5, "bbbb2222": 5})
+    pool = TokenPool(["aaaa1111", "bbbb2222"], limiter, "https://api.github.com")
+    assert send(pool, limiter, server).status_code == 200
+    assert pool.login == "me"
+    # one /user check per token, then the request itself
+    assert sum(server.budgets.values()) == 10 - 3
+
+
+def test_session_order(tmp_path):
+    oauth = [tmp_path / "a", tmp_path / "b"]
+    for fn in oauth:
+        fn.write_text("fake-token")
+
+    sess = gb.session(oauth, cache=tmp_path / "http.sqlite3", metrics=False)
+    # responses are cached under the token the pool actually sends
+    assert [type(m) for m in sess.middleware] == [TokenPool, ResponseCache, RateLimiter]
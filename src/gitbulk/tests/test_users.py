@@ -0,0 +1,89 @@
+"""
+offline check of batched user resolution and its cache
+"""
+
+from types import SimpleNamespace
+
+import github
+import pytest
+
+import gitbulk as gb
+from gitbulk import fakehub
+
+
+class Requester:
+    graphql_url = "/graphql"
+    base_url = "https://api.github.com"
+    is_not_lazy = True
+
+    def __init__(self):
+        self.calls = 0
+
+    def check_me(self, obj):
+        pass
+
+    def requestJsonAndCheck(self, verb, url, input):  # noqa: A002
+        self.calls += 1
+        data = {}
+        for alias, login in input["variables"].items():
+            u = "u" + alias[1:]
+            if login.lower().startswith("bad"):
+                data[u] = None
+            else:
+                data[u] = {"login": login.lower(), "databaseId": len(login), "name": login.upper()}
+        return {}, {"data": data}
+
+
+def test_resolve(tmp_path):
+    sess = SimpleNamespace(requester=Requester())
+    logins = [f"student{i}" for i in range(250)] * 2 + [" Student1 ", "bad1", "bad2"]
+
+    users, unknown = gb.resolve_users(sess, logins, tmp_path / "users.json")  # type: ignore
+
+    assert sess.requester.calls == 3
+    assert unknown == ["bad1", "bad2"]
+    assert len(users) == 250
+    assert users["student1"].login == "student1"
+    assert users["student1"].name == "STUDENT1"
+
+    users, unknown = gb.resolve_users(sess, logins[:250], tmp_path / "users.json")  # type: ignore
+    assert sess.requester.calls == 3
+    assert len(users) == 250
+
+    # another API host doesn't share the cache
+    sess.requester.base_url = "https://github.example.edu/api/v3"
+    gb.resolve_users(sess, ["student1"], tmp_path / "users.json")  # type: ignore
+    assert sess.requester.calls == 4
+
+    # a corrupt cache is looked up again
+    (tmp_path / "users.json").write_text("{")
+    users, _ = gb.resolve_users(sess, ["student1"], tmp_path / "users.json")  # type: ignore
+    assert sess.requester.calls == 5
+    assert users["student1"].login == "student1"
+
+
+def test_resolve_owner(tmp_path):
+    oauth = tmp_path / "oauth"
+    oauth.write_text("fake-token")
+    cache = tmp_path / "owners.json"
+
+    with fakehub.serve() as url:
+        sess = gb.session(oauth, base_url=url)
+
+        org = gb.user_or_org(sess, "fakeorg", cache)
+        assert isinstance(org, github.Organization.Organization)
+        user = gb.resolve_owner(sess, " user3 ", cache)
+        assert isinstance(user, github.NamedUser.NamedUser) and user.login == "user3"
+
+        with pytest.raises(ValueError):
+            gb.user_or_org(sess, "nobody", cache)
+
+        assert fakehub.calls(url) == {"POST /graphql": 3}
+
+        # later runs use the cache, until it expires
+        assert gb.user_or_org(sess, "FakeOrg", cache).id == org.id
+        assert fakehub.calls(url) == {"POST /graphql": 3}
+        assert len(list(org.get_repos())) == 100
+
+        gb.resolve_owner(sess, "fakeorg", cache, ttl=0)
+        assert fakehub.calls(url)["POST /graphql"] == 4
@@ -0,0 +1,165 @@
+"""
+Pool of several OAuth tokens for one session.
+
+Each request goes out with the token that has the most remaining rate limit budget,
+as tracked by the session RateLimiter from the response headers.
+When a token's budget is exhausted, the request fails over to the next token;
+only when all tokens are exhausted does it wait for the earliest reset.
+A run with N tokens thus gets up to N times the hourly request budget.
+
+All tokens must belong to one user: identity-dependent requests like /user/repos,
+and the pages of one listing, may each go out with a different token.
+Given the API URL, the pool checks this with GET /user per token before its first request.
+"""
+
+import logging
+import math
+import threading
+import time
+import typing as T
+
+import requests
+
+from .ratelimit import RateLimiter, auth_identity, is_primary, resource
+
+
+class TokenPool:
+    """
+    session middleware spreading requests over several tokens.
+    Must come before the RateLimiter in the session middleware.
+
+    Parameters
+    ----------
+    tokens : list of str
+        OAuth tokens
+    limiter : RateLimiter
+        session rate limiter, which tracks the budget of each token
+    base_url : str, optional
+        REST API URL, to check that all tokens belong to one user. None: not checked
+    """
+
+    def __init__(self, tokens: T.Sequence[str], limiter: RateLimiter, base_url: str | None = None):
+        if not tokens:
+            raise ValueError("TokenPool needs at least one token")
+
+        self.tokens = [f"token {t}" for t in tokens]
+        self.limiter = limiter
+        # exhausted tokens fail over here rather than waiting in the limiter
+        limiter.wait_exhausted = False
+
+        self.requests = {t: 0 for t in self.tokens}
+        self._lock = threading.Lock()
+
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.login: str | None = None
+        self._checked = base_url is None
+        self._check_lock = threading.Lock()
+
+    def check_users(self, request: requests.PreparedRequest, send_next) -> None:
+        """
+        GET /user with each token, as the session's own requests
+
+        Raises
+        ------
+        ValueError
+            if the tokens belong to different users, or one is not accepted
+        """
+
+        logins = {}
+        for t in self.tokens:
+            headers = {k: v for k, v in request.headers.items() if k.lower() in {"user-agent", "accept"}}
+            req = requests.Request("GET", f"{self.base_url}/user", headers=headers).prepare()
+            req.headers["Authorization"] = t
+
+            r = send_next(req)
+            if r.status_code == 200:
+                logins[mask(t)] = r.json()["login"]
+            elif is_primary(r):
+                logging.warning(f"token {mask(t)} exhausted its rate limit, its user wasn't checked")
+            else:
+                raise ValueError(f"token {mask(t)} not accepted: {r.status_code} {r.reason}")
+
+        if len(set(logins.values())) > 1:
+            raise ValueError(f"pooled tokens belong to different users: {logins}")
+
+        self.login = next(iter(logins.values()), None)
+
+    def remaining(self, token: str, res: str) -> float:
+        b = self.limiter.budget(auth_identity(token), res)
+        if b is None:
+            # not used yet, try it before spending known budgets
+            return math.inf
+        if time.time() >= b.reset:
+            return b.limit
+
+        return b.remaining
+
+    def _wait_reset(self, res: str) -> None:
+        resets = [
+            b.reset
+            for t in self.tokens
+            if (b := self.limiter.budget(auth_identity(t), res)) is not None
+        ]
+        wait = min(resets, default=time.time()) - time.time() + 1
+        self.limiter.sleep(wait, f"all {len(self.tokens)} tokens exhausted their {res} rate limit")
+
+    def send(self, request, send_next) -> requests.Response:
+        if not self._checked:
+            with self._check_lock:
+                if not self._checked:
+                    self.check_users(request, send_next)
+                    self._checked = True
+
+        res = resource(request)
+        tried: set[str] = set()
+
+        while True:
+            with self._lock:
+                token = max(
+                    (t for t in self.tokens if t not in tried), key=lambda t: self.remaining(t, res)
+                )
+                self.requests[token] += 1
+
+            if self.remaining(token, res) <= 0:
+                self._wait_reset(res)
+
+            request.headers["Authorization"] = token
+            response = send_next(request)
+
+            if not is_primary(response):
+                return response
+
+            tried.add(token)
+            logging.info(f"token {mask(token)} exhausted its {res} rate limit")
+            if len(tried) == len(self.tokens):
+                self._wait_reset(res)
+                tried.clear()
+
+    def usage(self) -> dict[str, dict[str, T.Any]]:
+        """
+        requests sent and last known core rate limit budget of each token
+
+        Results
+        -------
+        usage : dict
+            masked token: {"requests", "remaining", "limit", "reset"}
+        """
+
+        use = {}
+        for t in self.tokens:
+            b = self.limiter.budget(auth_identity(t), "core")
+            use[mask(t)] = {
+                "requests": self.requests[t],
+                "remaining": b.remaining if b else None,
+                "limit": b.limit if b else None,
+                "reset": b.reset if b else None,
+            }
+
+        return use
+
+
+def mask(token: str) -> str:
+    """
+    token shown only by its last four characters
+    """
+    return "..." + token[-4:]
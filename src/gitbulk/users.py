@@ -0,0 +1,211 @@
+"""
+Batched GitHub user lookup for spreadsheet rosters.
+
+Instead of one get_user() request per row, logins are deduplicated and resolved
+100 per GraphQL request with aliased user(login:) queries.
+Resolved login, id and name are kept in a JSON cache between runs,
+so a re-run of the same roster makes no lookups.
+
+Owners (user or organization) given to scripts are resolved likewise with one
+repositoryOwner(login:) query, cached with a time to live.
+"""
+
+from pathlib import Path
+import json
+import logging
+import time
+import typing as T
+
+import github
+
+from .base import cache_dir
+from .graphql import graphql
+
+BATCH = 100
+
+# seconds a resolved owner stays in the cache
+OWNER_TTL = 7 * 86400
+
+OWNER_QUERY = """
+query($login: String!) {
+  repositoryOwner(login: $login) {
+    __typename
+    login
+    ... on User { databaseId }
+    ... on Organization { databaseId }
+  }
+}
+"""
+
+
+def _query(n: int) -> str:
+    args = ", ".join(f"$l{i}: String!" for i in range(n))
+    fields = "\n".join(f"  u{i}: user(login: $l{i}) {{ login databaseId name }}" for i in range(n))
+    return f"query({args}) {{\n{fields}\n}}"
+
+
+def named_user(sess: github.Github, info: dict[str, T.Any]) -> github.NamedUser.NamedUser:
+    """
+    NamedUser from known attributes, without a request.
+    Other attributes are fetched on first access as usual.
+    """
+    req = sess.requester
+    attributes = {
+        "login": info["login"],
+        "id": info["id"],
+        "name": info["name"],
+        "url": f"{req.base_url}/users/{info['login']}",
+    }
+
+    return github.NamedUser.NamedUser(req, {}, attributes, completed=False)
+
+
+def resolve_users(
+    sess: github.Github, logins: T.Iterable[str], cache: bool | Path = True
+) -> tuple[dict[str, github.NamedUser.NamedUser], list[str]]:
+    """
+    look up many GitHub users at once
+
+    Parameters
+    ----------
+    sess : github.Github
+        GitHub session
+    logins : iterable of str
+        GitHub usernames, repeats and surrounding whitespace are fine
+    cache : bool or pathlib.Path, optional
+        JSON cache of resolved users. True: under gitbulk.cache_dir()
+
+    Results
+    -------
+    users : dict of str, github.NamedUser.NamedUser
+        login.strip().casefold(): user, as GitHub logins are case-insensitive
+    unknown : list of str
+        logins that don't exist on GitHub
+    """
+
+    wanted: dict[str, str] = {}
+    for login in logins:
+        login = login.strip()
+        wanted.setdefault(login.casefold(), login)
+    if not wanted:
+        return {}, []
+
+    # the same login may be a different user on GitHub Enterprise Server
+    host = sess.requester.base_url.split("://")[-1]
+
+    fn = cache_dir() / "users.json" if cache is True else Path(cache).expanduser() if cache else None
+    known: dict[str, dict[str, T.Any]] = {}
+    if fn and fn.is_file():
+        try:
+            known = json.loads(fn.read_text())
+        except ValueError as e:
+            logging.info(f"user cache {fn}: {e}")
+
+    todo = [k for k in wanted if f"{host}/{k}" not in known]
+    unknown: list[str] = []
+
+    for i in range(0, len(todo), BATCH):
+        batch = todo[i:i + BATCH]
+        data = graphql(sess, _query(len(batch)), {f"l{j}": wanted[k] for j, k in enumerate(batch)})
+
+        for j, k in enumerate(batch):
+            if u := data.get(f"u{j}"):
+                known[f"{host}/{k}"] = {"login": u["login"], "id": u["databaseId"], "name": u["name"]}
+            else:
+                unknown.append(wanted[k])
+
+    if fn and todo:
+        fn.parent.mkdir(parents=True, exist_ok=True)
+        fn.write_text(json.dumps(known))
+
+    logging.info(f"{len(wanted)} users: {len(todo)} looked up, {len(unknown)} unknown")
+
+    users = {k: named_user(sess, known[f"{host}/{k}"]) for k in wanted if f"{host}/{k}" in known}
+
+    return users, unknown
+
+
+def _owner(sess: github.Github, info: dict[str, T.Any]) -> T.Any:
+    req = sess.requester
+    org = info["type"] == "Organization"
+    attributes = {
+        "login": info["login"],
+        "id": info["id"],
+        "type": info["type"],
+        "url": f"{req.base_url}/{'orgs' if org else 'users'}/{info['login']}",
+    }
+    cls = github.Organization.Organization if org else github.NamedUser.NamedUser
+
+    return cls(req, {}, attributes, completed=False)
+
+
+def resolve_owner(
+    sess: github.Github, login: str, cache: bool | Path = True, ttl: float = OWNER_TTL
+) -> T.Any:
+    """
+    look up whether a login is a GitHub user or organization, in one request
+
+    Parameters
+    ----------
+    sess : github.Github
+        GitHub session
+    login : str
+        username or organization name
+    cache : bool or pathlib.Path, optional
+        JSON cache of resolved owners. True: under gitbulk.cache_dir()
+    ttl : float, optional
+        seconds a cached owner is used before it is looked up again
+
+    Results
+    -------
+    h : github.NamedUser.NamedUser or github.Organization.Organization
+        handle to the user or organization, other attributes are fetched on first access
+
+    Raises
+    ------
+    ValueError
+        if the login doesn't exist on GitHub
+    """
+
+    req = sess.requester
+    # the same login may be a different owner on GitHub Enterprise Server
+    key = f"{req.base_url.split('://')[-1]}/{login.strip().casefold()}"
+
+    fn = cache_dir() / "owners.json" if cache is True else Path(cache).expanduser() if cache else None
+    known: dict[str, dict[str, T.Any]] = {}
+    if fn and fn.is_file():
+        try:
+            known = json.loads(fn.read_text())
+        except ValueError as e:
+            logging.info(f"owner cache {fn}: {e}")
+
+    now = time.time()
+    if (info := known.get(key)) and now - info["time"] < ttl:
+        return _owner(sess, info)
+
+    if req.auth is None:
+        # GraphQL requires authentication; the REST user endpoint also gives type and id
+        try:
+            _, u = req.requestJsonAndCheck("GET", f"/users/{login.strip()}")
+        except github.UnknownObjectException as e:
+            raise ValueError(f"{login} not found on GitHub\n{e}")
+        owner = {"__typename": u["type"], "login": u["login"], "databaseId": u["id"]}
+    else:
+        owner = graphql(sess, OWNER_QUERY, {"login": login.strip()})["repositoryOwner"]
+        if not owner:
+            raise ValueError(f"{login} not found on GitHub")
+
+    info = {
+        "login": owner["login"],
+        "id": owner["databaseId"],
+        "type": owner["__typename"],
+        "time": now,
+    }
+
+    if fn:
+        known = {k: v for k, v in known.items() if now - v["time"] < ttl}
+        known[key] = info
+        fn.parent.mkdir(parents=True, exist_ok=True)
+        fn.write_text(json.dumps(known))
+
+    return _owner(sess, info)